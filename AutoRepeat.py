@@ -0,0 +1,104 @@
+from time import monotonic
+
+
+class AutoRepeatProfile(object):
+    """
+        Describes how a held button repeats, in seconds (not display ticks):
+        - initial_delay: time between the press and the first repeat
+        - interval: time between repeats right after the initial delay
+        - min_interval: the interval never gets shorter than this
+        - rate_acceleration: how much faster the repeats get per second held
+          (interval = interval / (1 + rate_acceleration * seconds_repeating))
+        - step_acceleration: how much bigger each repeat step gets per second held
+          (steps = 1 + int(step_acceleration * seconds_repeating))
+    """
+
+    def __init__(self, initial_delay, interval, min_interval=None,
+                 rate_acceleration=0.0, step_acceleration=0.0):
+        self.initial_delay = initial_delay
+        self.interval = interval
+        self.min_interval = interval if min_interval is None else min_interval
+        self.rate_acceleration = rate_acceleration
+        self.step_acceleration = step_acceleration
+
+    def interval_at(self, held_time):
+        repeating_time = max(0.0, held_time - self.initial_delay)
+        interval = self.interval / (1.0 + self.rate_acceleration * repeating_time)
+        return max(self.min_interval, interval)
+
+    def steps_at(self, held_time):
+        repeating_time = max(0.0, held_time - self.initial_delay)
+        return 1 + int(self.step_acceleration * repeating_time)
+
+
+class AutoRepeater(object):
+    """
+        Auto-repeat for held buttons, based on a monotonic clock so that the repeat
+        speed does not depend on how often (or how regularly) Live calls
+        'update_display'. Call 'update' once per tick: every repeat that became due
+        since the last call invokes the buttons callback with the time the button
+        has been held so far. When a tick ran very late, at most 'max_catch_up'
+        repeats are done and the remaining backlog is dropped.
+
+        The initial action on press is up to the caller, 'press' only starts timing.
+    """
+
+    def __init__(self, max_catch_up=4, clock=monotonic):
+        self.__clock = clock
+        self.__max_catch_up = max_catch_up
+        self.__profiles = {}
+        self.__callbacks = {}
+        self.__pressed_at = {}
+        self.__next_repeat_at = {}
+
+    def add_button(self, button_id, profile, callback):
+        self.__profiles[button_id] = profile
+        self.__callbacks[button_id] = callback
+
+    def press(self, button_id):
+        now = self.__clock()
+        self.__pressed_at[button_id] = now
+        self.__next_repeat_at[button_id] = now + self.__profiles[button_id].initial_delay
+
+    def release(self, button_id):
+        self.__pressed_at.pop(button_id, None)
+        self.__next_repeat_at.pop(button_id, None)
+
+    def release_all(self):
+        self.__pressed_at.clear()
+        self.__next_repeat_at.clear()
+
+    def is_pressed(self, button_id):
+        return button_id in self.__pressed_at
+
+    def any_pressed(self):
+        return len(self.__pressed_at) > 0
+
+    def held_time(self, button_id):
+        if button_id in self.__pressed_at:
+            return self.__clock() - self.__pressed_at[button_id]
+        return 0.0
+
+    def update(self):
+        if not self.__pressed_at:
+            return
+        now = self.__clock()
+        for button_id in list(self.__pressed_at.keys()):
+            if button_id not in self.__pressed_at:
+                continue
+            pressed_at = self.__pressed_at[button_id]
+            next_repeat_at = self.__next_repeat_at[button_id]
+            profile = self.__profiles[button_id]
+            callback = self.__callbacks[button_id]
+            repeats = 0
+            while next_repeat_at <= now and repeats < self.__max_catch_up:
+                held_time = next_repeat_at - pressed_at
+                next_repeat_at += profile.interval_at(held_time)
+                repeats += 1
+                callback(held_time)
+                if button_id not in self.__pressed_at:
+                    break
+            if next_repeat_at <= now:
+                next_repeat_at = now + profile.interval_at(now - pressed_at)
+            if button_id in self.__pressed_at:
+                self.__next_repeat_at[button_id] = next_repeat_at
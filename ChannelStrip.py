@@ -7,13 +7,19 @@ from ableton.v2.base import liveobj_valid
 import Live
 
 from .ChannelStripController import ChannelStripController
+from .EncoderProfiles import profile_for
 from .P1NanoTGEComponent import *
-from .settings import encoder_sensitivity
 
 
 class ChannelStrip(P1NanoTGEComponent):
     # """ Represets a Channel Strip of the Mackie Control, which consists out of the """
 
+    __slots__ = ('__is_touched', '__strip_index', '__stack_offset',
+                 '__bank_and_channel_offset', '__assigned_track', '__v_pot_parameter',
+                 '__v_pot_display_mode', '__fader_parameter', '__meters_enabled',
+                 '__last_meter_value', '__meter_task', '__within_destroy',
+                 '__channel_strip_controller', '__v_pot_profile', '__v_pot_profile_parameter',
+                 '__accelerated_v_pot_parameter')
 
     def __init__(self, main_script, strip_index):
         P1NanoTGEComponent.__init__(self, main_script)
@@ -25,20 +31,25 @@ class ChannelStrip(P1NanoTGEComponent):
         self.__assigned_track = None
         self.__v_pot_parameter = None
         self.__v_pot_display_mode = VPOT_DISPLAY_SINGLE_DOT
+        self.__v_pot_profile = None
+        self.__v_pot_profile_parameter = None
+        self.__accelerated_v_pot_parameter = None
         self.__fader_parameter = None
         self.__meters_enabled = False
         self.__last_meter_value = -1
+        self.__meter_task = self.add_tick_task(self.on_update_display_timer,
+                                               sleeping=True)
         self.__send_meter_mode()
-        self.__within_track_added_or_deleted = False
         self.__within_destroy = False
         self.set_bank_and_channel_offset(offset=0, show_return_tracks=False,
                                          within_track_added_or_deleted=False)
 
     def destroy(self):
         self.__within_destroy = True
-        if self.__assigned_track:
-            self.__remove_listeners()
+        self.__remove_listeners()
         self.__assigned_track = None
+        self.__v_pot_profile_parameter = None
+        self.__accelerated_v_pot_parameter = None
         self.send_midi((208, 0 + (self.__strip_index << 4)))
         self.__meters_enabled = False
         self.__send_meter_mode()
@@ -52,6 +63,9 @@ class ChannelStrip(P1NanoTGEComponent):
     def strip_index(self):
         return self.__strip_index
 
+    def component_name(self):
+        return 'ChannelStrip {}'.format(self.__strip_index + 1)
+
     def assigned_track(self):
         return self.__assigned_track
 
@@ -74,11 +88,10 @@ class ChannelStrip(P1NanoTGEComponent):
     def set_bank_and_channel_offset(self, offset, show_return_tracks,
         within_track_added_or_deleted):
         final_track_index = self.__strip_index + self.__stack_offset + offset
-        self.__within_track_added_or_deleted = within_track_added_or_deleted
         if show_return_tracks:
-            tracks = self.song().return_tracks
+            tracks = self.return_tracks()
         else:
-            tracks = self.song().visible_tracks
+            tracks = self.visible_tracks()
         if final_track_index < len(tracks):
             new_track = tracks[final_track_index]
         else:
@@ -89,8 +102,10 @@ class ChannelStrip(P1NanoTGEComponent):
             self.__assigned_track = new_track
             if self.__assigned_track:
                 self.__add_listeners()
-        self.refresh_state()
-        self.__within_track_added_or_deleted = False
+        # after tracks were added or deleted the controller repaints all strips
+        # on a later tick
+        if not within_track_added_or_deleted:
+            self.refresh_state()
 
     def v_pot_parameter(self):
         return self.__v_pot_parameter
@@ -102,9 +117,18 @@ class ChannelStrip(P1NanoTGEComponent):
         if not parameter:
             self.unlight_vpot_leds()
 
+    def reset_v_pot_profile(self):
+        """ The encoder profiles changed: resolved again by the next 'build_midi_map' """
+        self.__v_pot_profile_parameter = None
+
     def fader_parameter(self):
         return self.__fader_parameter
 
+    def mapped_parameters(self):
+        """ The parameters Live moves itself, see 'build_midi_map' """
+        return tuple(p for p in (self.__fader_parameter, self.__v_pot_parameter)
+                     if p and p != self.__accelerated_v_pot_parameter)
+
     def set_fader_parameter(self, parameter):
         self.__fader_parameter = parameter
         if not parameter:
@@ -112,6 +136,8 @@ class ChannelStrip(P1NanoTGEComponent):
 
     def enable_meter_mode(self, Enabled, needs_to_send_meter_mode=True):
         self.__meters_enabled = Enabled
+        if Enabled:
+            self.__meter_task.wake()
         if needs_to_send_meter_mode or Enabled:
             self.__send_meter_mode()
 
@@ -168,16 +194,21 @@ class ChannelStrip(P1NanoTGEComponent):
                             self.__strip_index, self.__stack_offset, touched)
 
     def is_selected(self):
-        return self.__assigned_track and self.__assigned_track == self.song().view.selected_track
+        return self.__assigned_track and self.__assigned_track == self.selected_track()
 
     def handle_vpot_rotation(self, strip_index, cc_value):
-        if strip_index is self.__strip_index and self.__channel_strip_controller != None:
+        if strip_index is not self.__strip_index:
+            return
+        if self.__accelerated_v_pot_parameter != None:
+            if liveobj_valid(self.__accelerated_v_pot_parameter) and \
+                    self.__accelerated_v_pot_parameter.is_enabled:
+                self.__v_pot_profile.apply(self.__accelerated_v_pot_parameter, cc_value)
+        elif self.__channel_strip_controller != None:
             self.__channel_strip_controller.handle_vpot_rotation(
                 self.__strip_index, self.__stack_offset, cc_value)
 
     def refresh_state(self):
-        if not self.__within_track_added_or_deleted:
-            self.__update_track_is_selected_led()
+        self.__update_track_is_selected_led()
         self.__update_solo_led()
         self.__update_mute_led()
         self.__update_arm_led()
@@ -208,6 +239,8 @@ class ChannelStrip(P1NanoTGEComponent):
             if self.__last_meter_value != meter_value or meter_value != 0.0:
                 self.__last_meter_value = meter_value
                 self.send_midi((208, meter_byte))
+        else:
+            self.__meter_task.sleep()
 
     def build_midi_map(self, midi_map_handle):
         needs_takeover = False
@@ -239,17 +272,31 @@ class ChannelStrip(P1NanoTGEComponent):
                 [self.__v_pot_display_mode * 16 + x for x in
                  range(1, range_end)])
             feeback_rule.delay_in_ms = 0.0
+            if self.__v_pot_parameter != self.__v_pot_profile_parameter:
+                self.__v_pot_profile_parameter = self.__v_pot_parameter
+                self.__v_pot_profile = profile_for(self.__v_pot_parameter)
+            if self.__v_pot_profile.is_accelerated():
+                # Live can't accelerate: the turns go to the script, Live only
+                # sends the ring feedback
+                self.__accelerated_v_pot_parameter = self.__v_pot_parameter
+                mapped_channel = VPOT_FEEDBACK_ONLY_CHANNEL
+                Live.MidiMap.forward_midi_cc(self.script_handle(), midi_map_handle,
+                                             0, FID_PANNING_BASE + self.__strip_index)
+            else:
+                self.__accelerated_v_pot_parameter = None
+                mapped_channel = 0
             Live.MidiMap.map_midi_cc_with_feedback_map(midi_map_handle,
                                                        self.__v_pot_parameter,
-                                                       0,
+                                                       mapped_channel,
                                                        FID_PANNING_BASE + self.__strip_index,
                                                        Live.MidiMap.MapMode.relative_smooth_signed_bit,
                                                        feeback_rule,
                                                        needs_takeover,
-                                                       encoder_sensitivity)
+                                                       self.__v_pot_profile.sensitivity)
             Live.MidiMap.send_feedback_for_parameter(midi_map_handle,
                                                      self.__v_pot_parameter)
         else:
+            self.__accelerated_v_pot_parameter = None
             channel = 0
             cc_no = FID_PANNING_BASE + self.__strip_index
             Live.MidiMap.forward_midi_cc(self.script_handle(), midi_map_handle,
@@ -258,7 +305,7 @@ class ChannelStrip(P1NanoTGEComponent):
     def __assigned_track_index(self):
         index = 0
         if self.__assigned_track:
-            for t in chain(self.song().visible_tracks, self.song().return_tracks):
+            for t in chain(self.visible_tracks(), self.return_tracks()):
                 if t == self.__assigned_track:
                     return index
                 index += 1
@@ -266,7 +313,7 @@ class ChannelStrip(P1NanoTGEComponent):
 
     def __add_listeners(self):
 
-        if self.__assigned_track and self.__assigned_track in self.song().tracks:
+        if self.__assigned_track and self.__assigned_track in self.tracks():
             self.__assigned_track.add_input_routing_type_listener(
                 self.__update_arm_led)
             if self.__assigned_track.can_be_armed:
@@ -283,7 +330,7 @@ class ChannelStrip(P1NanoTGEComponent):
 
     def __remove_listeners(self):
         if liveobj_valid(self.__assigned_track):
-            if self.__assigned_track in self.song().tracks:
+            if self.__assigned_track in self.tracks():
                 self.__remove_listener(self.__assigned_track,
                                        'input_routing_type',
                                        self.__update_arm_led)
@@ -294,8 +341,8 @@ class ChannelStrip(P1NanoTGEComponent):
                                    self.__update_mute_led)
             self.__remove_listener(self.__assigned_track, 'solo',
                                    self.__update_solo_led)
-            self.__remove_listener(self.song().view, 'selected_track',
-                                   self.__update_track_is_selected_led)
+        self.__remove_listener(self.song().view, 'selected_track',
+                               self.__update_track_is_selected_led)
 
     def __remove_listener(self, object, property, listener):
         if getattr(object, u'{}_has_listener'.format(property))(listener):
@@ -321,7 +368,7 @@ class ChannelStrip(P1NanoTGEComponent):
         if self.__assigned_track and self.__assigned_track.can_be_armed:
             self.__assigned_track.arm = not self.__assigned_track.arm
             if exclusive:
-                for t in self.song().tracks:
+                for t in self.tracks():
                     if t != self.__assigned_track and t.can_be_armed:
                         t.arm = False
 
@@ -333,7 +380,7 @@ class ChannelStrip(P1NanoTGEComponent):
         if self.__assigned_track:
             self.__assigned_track.solo = not self.__assigned_track.solo
             if exclusive:
-                for t in chain(self.song().tracks, self.song().return_tracks):
+                for t in chain(self.tracks(), self.return_tracks()):
                     if t != self.__assigned_track:
                         t.solo = False
     def select_track(self):
@@ -341,9 +388,9 @@ class ChannelStrip(P1NanoTGEComponent):
 
     def __select_track(self):
         if self.__assigned_track:
-            all_tracks = tuple(self.song().visible_tracks) + tuple(
-                self.song().return_tracks)
-            if self.song().view.selected_track != all_tracks[
+            all_tracks = tuple(self.visible_tracks()) + tuple(
+                self.return_tracks())
+            if self.selected_track() != all_tracks[
                 self.__assigned_track_index()]:
                 self.song().view.selected_track = all_tracks[
                     self.__assigned_track_index()]
@@ -381,7 +428,7 @@ class ChannelStrip(P1NanoTGEComponent):
                             BUTTON_STATE_OFF))
 
     def __update_track_is_selected_led(self):
-        if self.song().view.selected_track == self.__assigned_track:
+        if self.selected_track() == self.__assigned_track:
             self.send_midi((
                            NOTE_ON_STATUS, SID_SELECT_BASE + self.__strip_index,
                            BUTTON_STATE_ON))
@@ -393,12 +440,16 @@ class ChannelStrip(P1NanoTGEComponent):
 
 class MasterChannelStrip(P1NanoTGEComponent):
 
+    __slots__ = ('__last_meter_value', '__strip_index', '__assigned_track',
+                 '__last_display_strings')
+
     def __init__(self, main_script):
         P1NanoTGEComponent.__init__(self, main_script)
         self.__last_meter_value = None
         self.__strip_index = MASTER_CHANNEL_STRIP_INDEX
         self.__assigned_track = self.song().master_track
         self.__last_display_strings =[[], [], [], []]
+        self.add_tick_task(self.on_update_display_timer)
 
     def destroy(self):
         self.reset_fader()
@@ -407,6 +458,11 @@ class MasterChannelStrip(P1NanoTGEComponent):
     def set_channel_strip_controller(self, channel_strip_controller):
         pass
 
+    def mapped_parameters(self):
+        if self.__assigned_track:
+            return (self.__assigned_track.mixer_device.volume,)
+        return ()
+
     def handle_channel_strip_switch_ids(self, sw_id, value):
         if sw_id - SID_FADER_TOUCH_SENSE_BASE is self.__strip_index:
 
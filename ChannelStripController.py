@@ -1,10 +1,8 @@
 from itertools import chain
 
-
-from _Generic.Devices import *
-
-from .settings import auto_arm_on_track_select_on_by_default
+from .DeviceBanks import bank_parameter_names, parameters_by_original_name
 from .P1NanoTGEComponent import *
+from ableton.v2.base import liveobj_valid
 from ableton.v3.live import track_index
 
 flatten_target = lambda routing_target: routing_target.display_name
@@ -68,9 +66,19 @@ class ChannelStripController(P1NanoTGEComponent):
        because its always mapped to the master_volume.
     """
 
+    __slots__ = ('__auto_arm', '__left_extensions', '__right_extensions',
+                 '__own_channel_strips', '__master_strip', '__channel_strips',
+                 '__main_display_controller', '__meters_enabled', '__assignment_mode',
+                 '__sub_mode_in_io_mode', '__plugin_mode', '__plugin_mode_offsets',
+                 '__chosen_plugin', '__ordered_plugin_parameters', '__displayed_plugins',
+                 '__last_attached_selected_track', '__send_mode_offset', '__flip',
+                 '__view_returns', '__bank_cha_offset', '__bank_cha_offset_returns',
+                 '__within_track_added_or_deleted', '__strings_task',
+                 '_last_assignment_mode')
+
     def __init__(self, main_script, channel_strips, master_strip, main_display_controller):
         P1NanoTGEComponent.__init__(self, main_script)
-        self.__auto_arm = auto_arm_on_track_select_on_by_default
+        self.__auto_arm = main_script.config().auto_arm_on_track_select_on_by_default
         self.__left_extensions = []
         self.__right_extensions = []
         self.__own_channel_strips = channel_strips
@@ -92,11 +100,14 @@ class ChannelStripController(P1NanoTGEComponent):
         self.__bank_cha_offset = 0
         self.__bank_cha_offset_returns = 0
         self.__within_track_added_or_deleted = False
+        self.__strings_task = self.add_tick_task(self.on_update_display_timer,
+                                                 sleeping=True, deferrable=True)
         self.song().add_visible_tracks_listener(
             self.__on_tracks_added_or_deleted)
+        self.song().add_return_tracks_listener(self.__wake_strings_task)
         self.song().view.add_selected_track_listener(
             self.__on_selected_track_changed)
-        for t in chain(self.song().visible_tracks, self.song().return_tracks):
+        for t in chain(self.tracks(), self.return_tracks()):
             if not t.solo_has_listener(self.__update_rude_solo_led):
                 t.add_solo_listener(self.__update_rude_solo_led)
             if not t.has_audio_output_has_listener(
@@ -113,9 +124,10 @@ class ChannelStripController(P1NanoTGEComponent):
     def destroy(self):
         self.song().remove_visible_tracks_listener(
             self.__on_tracks_added_or_deleted)
+        self.song().remove_return_tracks_listener(self.__wake_strings_task)
         self.song().view.remove_selected_track_listener(
             self.__on_selected_track_changed)
-        for t in chain(self.song().visible_tracks, self.song().return_tracks):
+        for t in chain(self.tracks(), self.return_tracks()):
             if t.solo_has_listener(self.__update_rude_solo_led):
                 t.remove_solo_listener(self.__update_rude_solo_led)
             if t.has_audio_output_has_listener(
@@ -126,6 +138,8 @@ class ChannelStripController(P1NanoTGEComponent):
         if st and st.devices_has_listener(
             self.__on_selected_device_chain_changed):
             st.remove_devices_listener(self.__on_selected_device_chain_changed)
+        self.__set_displayed_plugins([])
+        self.__set_chosen_plugin(None)
         for note in channel_strip_assignment_switch_ids:
             self.send_midi((NOTE_ON_STATUS, note, BUTTON_STATE_OFF))
         for note in channel_strip_control_switch_ids:
@@ -179,8 +193,16 @@ class ChannelStripController(P1NanoTGEComponent):
             ex.request_rebuild_midi_map()
 
     def on_update_display_timer(self):
-        
+        """
+            Sleeps until something that changes the strip strings happened. Only the
+            IO mode keeps polling, routing names change without telling us.
+        """
         self.__update_channel_strip_strings()
+        if self.__assignment_mode != CSM_IO:
+            self.__strings_task.sleep()
+
+    def __wake_strings_task(self):
+        self.__strings_task.wake()
 
     def toggle_meter_mode(self):
         u""" Called from the main script when the display toggle button was pressed """
@@ -312,6 +334,7 @@ class ChannelStripController(P1NanoTGEComponent):
     def handle_fader_touch(self, strip_offset, stack_offset, touched):
         """ Forwarded to us by the channel_strips """
         self.__reassign_channel_strip_parameters(for_display_only=True)
+        self.__wake_strings_task()
 
     def handle_pressed_v_pot(self, strip_index, stack_offset):
         u""" Forwarded to us by the channel_strips """
@@ -346,15 +369,9 @@ class ChannelStripController(P1NanoTGEComponent):
         device_index = strip_index + stack_offset + self.__plugin_mode_offsets[
             PCM_DEVICES]
         if device_index >= 0 and device_index < len(
-            self.song().view.selected_track.devices):
-            if self.__chosen_plugin != None:
-                self.__chosen_plugin.remove_parameters_listener(
-                    self.__on_parameter_list_of_chosen_plugin_changed)
-            self.__chosen_plugin = self.song().view.selected_track.devices[
-                device_index]
-            if self.__chosen_plugin != None:
-                self.__chosen_plugin.add_parameters_listener(
-                    self.__on_parameter_list_of_chosen_plugin_changed)
+            self.selected_track().devices):
+            self.__set_chosen_plugin(self.selected_track().devices[
+                device_index])
             self.__reorder_parameters()
             self.__plugin_mode_offsets[PCM_PARAMETERS] = 0
             self.__set_plugin_mode(PCM_PARAMETERS)
@@ -374,15 +391,16 @@ class ChannelStripController(P1NanoTGEComponent):
             mode or normal track mode
         """
         if self.__view_returns:
-            return len(self.song().return_tracks)
-        return len(self.song().visible_tracks)
+            return len(self.return_tracks())
+        return len(self.visible_tracks())
 
     def __send_parameter(self, strip_index, stack_index):
         """ Return the send parameter that is assigned to the given channel strip """
 
         send_index = strip_index + stack_index + self.__send_mode_offset
-        if send_index < len(self.song().view.selected_track.mixer_device.sends):
-            p = self.song().view.selected_track.mixer_device.sends[send_index]
+        sends = self.sends()
+        if send_index < len(sends):
+            p = sends[send_index]
             return (p, p.name)
         return (None, None)
 
@@ -444,14 +462,14 @@ class ChannelStripController(P1NanoTGEComponent):
 
 
         if self.__assignment_mode == CSM_PLUGINS or do_plugins:
-            sel_track = self.song().view.selected_track
+            sel_track = self.selected_track()
             if self.__plugin_mode == PCM_DEVICES:
                 return self.__plugin_mode_offsets[PCM_DEVICES] + plugin_page_size < len(sel_track.devices)
             if self.__plugin_mode == PCM_PARAMETERS:
                 parameters = self.__ordered_plugin_parameters
                 return self.__plugin_mode_offsets[PCM_PARAMETERS] + plugin_page_size < len(parameters)
         elif self.__assignment_mode == CSM_SENDS or do_sends:
-            return self.__send_mode_offset + send_page_size < len(self.song().return_tracks)
+            return self.__send_mode_offset + send_page_size < len(self.return_tracks())
         return False
 
     def __available_routing_targets(self, channel_strip):
@@ -523,10 +541,7 @@ class ChannelStripController(P1NanoTGEComponent):
         self.__set_assignment_mode(mode)
 
     def __set_assignment_mode(self, mode):
-        for plugin in self.__displayed_plugins:
-            if plugin != None:
-                plugin.remove_name_listener(self.__update_plugin_names)
-        self.__displayed_plugins = []
+        self.__set_displayed_plugins([])
         self.__main_display_controller.set_show_current_track_colors(False)
         if mode == CSM_PLUGINS:
             self.__assignment_mode = mode
@@ -565,6 +580,7 @@ class ChannelStripController(P1NanoTGEComponent):
         if mode == CSM_PLUGINS or mode == CSM_MULTI_TGE:
             self.__update_vpot_leds_in_plugins_device_choose_mode()
         self.__update_flip_led()
+        self.__wake_strings_task()
         self.request_rebuild_midi_map()
 
 
@@ -582,14 +598,11 @@ class ChannelStripController(P1NanoTGEComponent):
             if self.__plugin_mode == PCM_DEVICES:
                 self.__update_vpot_leds_in_plugins_device_choose_mode()
             else:
-                for plugin in self.__displayed_plugins:
-                    if plugin != None:
-                        plugin.remove_name_listener(self.__update_plugin_names)
-
-                self.__displayed_plugins = []
+                self.__set_displayed_plugins([])
             self.__update_page_switch_leds()
             self.__update_flip_led()
             self.__update_page_switch_leds()
+            self.__wake_strings_task()
 
 
     def __switch_to_prev_page(self):
@@ -656,6 +669,10 @@ class ChannelStripController(P1NanoTGEComponent):
     def __reassign_channel_strip_offsets(self):
         """ Update the channel strips bank_channel offset
         """
+        self.measured('ChannelStripController strip offsets',
+                      self.__assign_channel_strip_offsets)
+
+    def __assign_channel_strip_offsets(self):
         for s in self.__channel_strips:
             s.set_bank_and_channel_offset(self.__strip_offset(),
                                           self.__view_returns,
@@ -676,6 +693,10 @@ class ChannelStripController(P1NanoTGEComponent):
 
     def __reassign_channel_strip_parameters(self, for_display_only):
         """ Reevaluate all v-pot/fader -> parameter assignments """
+        self.measured('ChannelStripController strip parameters',
+                      self.__assign_channel_strip_parameters, for_display_only)
+
+    def __assign_channel_strip_parameters(self, for_display_only):
         display_parameters = []
         current_strip = self.__channel_strips[0]
         current_track = current_strip.assigned_track()
@@ -836,15 +857,15 @@ class ChannelStripController(P1NanoTGEComponent):
         elif self.__assignment_mode == CSM_PLUGINS or self.__assignment_mode == CSM_SENDS:
             if self.__last_attached_selected_track == self.song().master_track:
                 ass_string = ['M', 'A']
-            for t in self.song().return_tracks:
+            for t in self.return_tracks():
                 if t == self.__last_attached_selected_track:
                     ass_string = ['R', chr(ord('A') + list(
-                        self.song().return_tracks).index(t))]
+                        self.return_tracks()).index(t))]
                     break
-            for t in self.song().visible_tracks:
+            for t in self.visible_tracks():
                 if t == self.__last_attached_selected_track:
                     ass_string = list('%.2d' % min(99, list(
-                        self.song().visible_tracks).index(t) + 1))
+                        self.visible_tracks()).index(t) + 1))
                     break
         elif self.__assignment_mode == CSM_IO:
             if self.__sub_mode_in_io_mode == CSM_IO_MODE_INPUT_MAIN:
@@ -865,8 +886,11 @@ class ChannelStripController(P1NanoTGEComponent):
         self.send_midi((CC_STATUS, 74, g7_seg_led_conv_table[ass_string[1]]))
 
     def __update_rude_solo_led(self):
+        self.measured('ChannelStripController rude solo LED', self.__send_rude_solo_led)
+
+    def __send_rude_solo_led(self):
         any_track_soloed = False
-        for t in chain(self.song().tracks, self.song().return_tracks):
+        for t in chain(self.tracks(), self.return_tracks()):
             if t.solo:
                 any_track_soloed = True
                 break
@@ -903,7 +927,7 @@ class ChannelStripController(P1NanoTGEComponent):
             This will enlighten all poties which can be pressed to choose a device
             for editing, and unlight all poties where pressing will have no effect
         """
-        sel_track = self.song().view.selected_track
+        sel_track = self.selected_track()
         count = 0
         for s in self.__channel_strips:
             offset = self.__plugin_mode_offsets[self.__plugin_mode]
@@ -919,25 +943,20 @@ class ChannelStripController(P1NanoTGEComponent):
         if not self.__any_fader_is_touched():
 
             if self.__assignment_mode == CSM_MULTI_TGE and self.__plugin_mode == PCM_DEVICES:
-                for plugin in self.__displayed_plugins:
-                    if plugin != None:
-                        plugin.remove_name_listener(self.__update_plugin_names)
-                self.__displayed_plugins = []
-                sel_track = self.song().view.selected_track
+                sel_track = self.selected_track()
                 plugin_start = self.total_number_of_sends() + 1 #+ self.__plugin_mode_offsets[PCM_DEVICES]G
+                plugins = []
                 for i in range(len(self.__channel_strips)):
                     device_index = i - plugin_start + self.__plugin_mode_offsets[PCM_DEVICES]
                     if i >= plugin_start and i < len(sel_track.devices) + plugin_start:
 
                         if device_index < len(sel_track.devices):
-                            sel_track.devices[device_index].add_name_listener(
-                                self.__update_plugin_names)
-                            self.__displayed_plugins.append(
-                                sel_track.devices[device_index])
+                            plugins.append(sel_track.devices[device_index])
                         else:
-                            self.__displayed_plugins.append(None)
+                            plugins.append(None)
                     else:
-                        self.__displayed_plugins.append(None)
+                        plugins.append(None)
+                self.__set_displayed_plugins(plugins)
                 device_strings = {}
                 for index,plugin in enumerate(self.__displayed_plugins):
                     if plugin != None:
@@ -955,23 +974,45 @@ class ChannelStripController(P1NanoTGEComponent):
                 self.__main_display_controller.set_channel_strip_strings(
                     targets)
             elif self.__assignment_mode == CSM_PLUGINS and self.__plugin_mode == PCM_DEVICES:
-                for plugin in self.__displayed_plugins:
-                    if plugin != None:
-                        plugin.remove_name_listener(self.__update_plugin_names)
-                self.__displayed_plugins = []
-                sel_track = self.song().view.selected_track
+                sel_track = self.selected_track()
+                plugins = []
                 for i in range(len(self.__channel_strips)):
                     device_index = i + self.__plugin_mode_offsets[PCM_DEVICES]
                     if device_index >= 0 and device_index < len(
                         sel_track.devices):
-                        sel_track.devices[device_index].add_name_listener(
-                            self.__update_plugin_names)
-                        self.__displayed_plugins.append(
-                            sel_track.devices[device_index])
+                        plugins.append(sel_track.devices[device_index])
                     else:
-                        self.__displayed_plugins.append(None)
+                        plugins.append(None)
+                self.__set_displayed_plugins(plugins)
                 self.__update_plugin_names()
 
+    def __set_chosen_plugin(self, plugin):
+        """ Moves the parameter list listener to the plugin shown in PCM_PARAMETERS """
+        if liveobj_valid(self.__chosen_plugin) and \
+                self.__chosen_plugin.parameters_has_listener(
+                    self.__on_parameter_list_of_chosen_plugin_changed):
+            self.__chosen_plugin.remove_parameters_listener(
+                self.__on_parameter_list_of_chosen_plugin_changed)
+        self.__chosen_plugin = plugin
+        if liveobj_valid(plugin):
+            plugin.add_parameters_listener(
+                self.__on_parameter_list_of_chosen_plugin_changed)
+
+    def __set_displayed_plugins(self, plugins):
+        """
+            Moves the name listeners to the plugins now shown on the display. Plugins
+            that stay on the display keep their listener, deleted ones are skipped.
+        """
+        for plugin in self.__displayed_plugins:
+            if liveobj_valid(plugin) and plugin not in plugins and \
+                    plugin.name_has_listener(self.__update_plugin_names):
+                plugin.remove_name_listener(self.__update_plugin_names)
+        for plugin in plugins:
+            if liveobj_valid(plugin) and not plugin.name_has_listener(
+                    self.__update_plugin_names):
+                plugin.add_name_listener(self.__update_plugin_names)
+        self.__displayed_plugins = plugins
+
     def __update_plugin_names(self):
         device_strings = []
         for plugin in self.__displayed_plugins:
@@ -1003,14 +1044,15 @@ class ChannelStripController(P1NanoTGEComponent):
         if st and st.devices_has_listener(
             self.__on_selected_device_chain_changed):
             st.remove_devices_listener(self.__on_selected_device_chain_changed)
-        self.__last_attached_selected_track = self.song().view.selected_track
+        self.__last_attached_selected_track = self.selected_track()
         st = self.__last_attached_selected_track
         if st:
             st.add_devices_listener(self.__on_selected_device_chain_changed)
+        self.__wake_strings_task()
 
         if not self.__view_returns:
-            for i, track in enumerate(self.song().visible_tracks):
-                if track == self.song().view.selected_track:
+            for i, track in enumerate(self.visible_tracks()):
+                if track == self.selected_track():
                     if self.auto_arm_enabled():
                         if track.can_be_armed:
                             track.implicit_arm = True
@@ -1028,10 +1070,7 @@ class ChannelStripController(P1NanoTGEComponent):
 
         if do_plugin:
             self.__plugin_mode_offsets = [0 for x in range(PCM_NUMMODES)]
-            if self.__chosen_plugin != None:
-                self.__chosen_plugin.remove_parameters_listener(
-                    self.__on_parameter_list_of_chosen_plugin_changed)
-            self.__chosen_plugin = None
+            self.__set_chosen_plugin(None)
             self.__ordered_plugin_parameters = []
             self.__update_assignment_display()
             if self.__plugin_mode == PCM_DEVICES:
@@ -1053,6 +1092,7 @@ class ChannelStripController(P1NanoTGEComponent):
 
     def __on_selected_device_chain_changed(self):
         """ Notifier, called as soon as the selected device chain has changed """
+        self.__wake_strings_task()
         #TODO TEST THIS
         if self.__assignment_mode == CSM_PLUGINS or self.__assignment_mode == CSM_MULTI_TGE:
             if self.__plugin_mode == PCM_DEVICES:
@@ -1062,23 +1102,24 @@ class ChannelStripController(P1NanoTGEComponent):
                 if not self.__chosen_plugin:
                     self.__set_plugin_mode(PCM_DEVICES)
                 elif self.__chosen_plugin not in self.__last_attached_selected_track.devices:
-                    if self.__chosen_plugin != None:
-                        self.__chosen_plugin.remove_parameters_listener(
-                            self.__on_parameter_list_of_chosen_plugin_changed)
-                    self.__chosen_plugin = None
+                    self.__set_chosen_plugin(None)
                     self.__set_plugin_mode(PCM_DEVICES)
 
     def __on_tracks_added_or_deleted(self):
         """ Notifier, called as soon as tracks where added, removed or moved """
+        self.measured('ChannelStripController tracks added or deleted',
+                      self.__tracks_added_or_deleted)
+
+    def __tracks_added_or_deleted(self):
         self.__within_track_added_or_deleted = True
-        for t in chain(self.song().visible_tracks, self.song().return_tracks):
+        for t in chain(self.tracks(), self.return_tracks()):
             if not t.solo_has_listener(self.__update_rude_solo_led):
                 t.add_solo_listener(self.__update_rude_solo_led)
             if not t.has_audio_output_has_listener(
                 self.__on_any_tracks_output_type_changed):
                 t.add_has_audio_output_listener(
                     self.__on_any_tracks_output_type_changed)
-        if self.__send_mode_offset >= len(self.song().return_tracks):
+        if self.__send_mode_offset >= len(self.return_tracks()):
             self.__send_mode_offset = 0
             self.__reassign_channel_strip_parameters(for_display_only=False)
             self.__update_channel_strip_strings()
@@ -1087,6 +1128,11 @@ class ChannelStripController(P1NanoTGEComponent):
             self.__set_channel_offset(max(0,
                                           self.__controlled_num_of_tracks() - len(
                                               self.__channel_strips)))
+        # the strips get their new tracks right away, so the parameters and the
+        # MIDI map are built from them, the full LED and display repaint waits
+        # for a tick with time left
+        self.__reassign_channel_strip_offsets()
+        self.__within_track_added_or_deleted = False
         self.__reassign_channel_strip_parameters(for_display_only=False)
         self.__update_channel_strip_strings()
 
@@ -1094,9 +1140,9 @@ class ChannelStripController(P1NanoTGEComponent):
         if self.__assignment_mode == CSM_SENDS:
             self.__update_page_switch_leds()
 
-        self.refresh_state()
-        self.__main_display_controller.refresh_state()
-        self.__within_track_added_or_deleted = False
+        self.defer(self.refresh_state)
+        self.defer(self.__main_display_controller.refresh_state)
+        self.__wake_strings_task()
         self.request_rebuild_midi_map()
 
     def __on_any_tracks_output_type_changed(self):
@@ -1115,16 +1161,15 @@ class ChannelStripController(P1NanoTGEComponent):
     def __reorder_parameters(self):
         result = []
         if self.__chosen_plugin:
-            if self.__chosen_plugin.class_name in list(DEVICE_DICT.keys()):
-                device_banks = DEVICE_DICT[self.__chosen_plugin.class_name]
-                for bank in device_banks:
-                    for param_name in bank:
-                        parameter_name = ''
-                        parameter = get_parameter_by_name(self.__chosen_plugin,
-                                                          param_name)
-                        if parameter:
-                            parameter_name = parameter.name
-                        result.append((parameter, parameter_name))
+            bank_names = bank_parameter_names(self.__chosen_plugin.class_name)
+            if bank_names is not None:
+                parameters = parameters_by_original_name(self.__chosen_plugin)
+                for param_name in bank_names:
+                    parameter_name = ''
+                    parameter = parameters.get(param_name)
+                    if parameter:
+                        parameter_name = parameter.name
+                    result.append((parameter, parameter_name))
             else:
                 result = [(p, p.name) for p in
                           self.__chosen_plugin.parameters[1:]]
@@ -0,0 +1,167 @@
+import os
+import sys
+from collections import namedtuple
+from types import MappingProxyType
+
+SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'settings.py')
+
+# what it takes until a changed setting is used, see 'SettingsWatcher'
+APPLY_MIDI_MAP = 'midi map'
+APPLY_SCHEDULER = 'scheduler'
+APPLY_NEXT_REFRESH = 'next refresh'
+APPLY_RELOAD = 'reload'
+
+# name, default (when missing or invalid in settings.py), type, applied by
+_SETTINGS = (
+    ('encoder_sensitivity', 4.0, float, APPLY_MIDI_MAP),
+    ('encoder_profiles', {}, dict, APPLY_MIDI_MAP),
+    ('auto_arm_on_track_select_on_by_default', True, bool, APPLY_RELOAD),
+    ('update_display_time_budget_ms', 8.0, float, APPLY_SCHEDULER),
+    ('tick_profiler_enabled', False, bool, APPLY_RELOAD),
+    ('tick_profiler_slow_tick_ms', 20.0, float, APPLY_RELOAD),
+    ('midi_traffic_monitor_enabled', False, bool, APPLY_RELOAD),
+    ('midi_traffic_report_interval_s', 60, int, APPLY_RELOAD),
+    ('latency_tracing_enabled', False, bool, APPLY_RELOAD),
+    ('latency_tracing_slow_event_ms', 50.0, float, APPLY_RELOAD),
+    ('session_recording_enabled', False, bool, APPLY_RELOAD),
+    ('session_recording_directory', '', str, APPLY_RELOAD),
+    ('staged_startup_enabled', True, bool, APPLY_NEXT_REFRESH),
+    ('startup_sync_bytes_per_tick', 512, int, APPLY_NEXT_REFRESH),
+    ('startup_sync_handshake_timeout_ticks', 30, int, APPLY_NEXT_REFRESH),
+    ('settings_watch_interval_s', 1.0, float, APPLY_SCHEDULER),
+)
+
+APPLIED_BY = dict((name, applied_by) for name, _, _, applied_by in _SETTINGS)
+DEFAULTS = dict((name, default) for name, default, _, _ in _SETTINGS)
+
+_ENCODER_PROFILE_FIELDS = ('sensitivity', 'acceleration')
+# numbers that can't be 0 (the others can, e.g. a watch interval of 0 is off)
+_NOT_ZERO = ('encoder_sensitivity', 'sensitivity')
+
+# name: value, used instead of the value in settings.py (for the tools). When it
+# has every setting of DEFAULTS, settings.py isn't read at all.
+overrides = {}
+
+Config = namedtuple('Config', [name for name, _, _, _ in _SETTINGS])
+Config.__doc__ = """
+    The validated settings of settings.py. Immutable: a changed file gives a
+    new Config. 'encoder_profiles' is a read-only {kind: (sensitivity,
+    acceleration)}.
+"""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _encoder_profiles(value):
+    profiles = {}
+    for kind, fields in value.items():
+        if not isinstance(kind, str) or not isinstance(fields, dict) or \
+                not set(fields) <= set(_ENCODER_PROFILE_FIELDS) or \
+                not all(_is_number(v) and (v > 0 if f in _NOT_ZERO else v >= 0)
+                        for f, v in fields.items()):
+            raise ValueError('{!r}: {!r}'.format(kind, fields))
+        profiles[kind] = (fields.get('sensitivity'), float(fields.get('acceleration', 0.0)))
+    return MappingProxyType(profiles)
+
+
+def _validated(name, value, value_type):
+    """ The value as 'value_type', raises ValueError when it isn't one """
+    if value_type is bool:
+        if not isinstance(value, bool):
+            raise ValueError('not True or False')
+        return value
+    if value_type is float or value_type is int:
+        not_zero = name in _NOT_ZERO
+        if not _is_number(value) or value < 0 or (not_zero and value == 0) or \
+                (value_type is int and not isinstance(value, int)):
+            raise ValueError('not a {} {}'.format(
+                'positive' if not_zero else 'non-negative',
+                'whole number' if value_type is int else 'number'))
+        return value_type(value)
+    if value_type is str:
+        if not isinstance(value, str):
+            raise ValueError('not a text')
+        return value
+    if not isinstance(value, dict):
+        raise ValueError('not a dict')
+    return _encoder_profiles(value)
+
+
+def compile_config(values, previous=None):
+    """
+        A Config from {name: value}. Missing settings get their default, invalid
+        ones are reported to Live's Log.txt and keep their 'previous' value.
+    """
+    fields = []
+    for index, (name, default, value_type, _) in enumerate(_SETTINGS):
+        fallback = previous[index] if previous else _validated(name, default, value_type)
+        if name not in values:
+            fields.append(fallback)
+            continue
+        try:
+            fields.append(_validated(name, values[name], value_type))
+        except ValueError as e:
+            sys.stderr.write('P1NanoTGE settings: {} = {!r} ignored ({}), using {!r}\n'.format(
+                name, values[name], e, fallback))
+            fields.append(fallback)
+    return Config(*fields)
+
+
+def read_config(path=SETTINGS_PATH, previous=None):
+    """
+        Runs settings.py (not imported, so it can be read again) and compiles
+        its values. On errors in the file the 'previous' Config is kept.
+    """
+    if set(DEFAULTS) <= set(overrides):
+        return compile_config(overrides, previous)
+    namespace = {}
+    try:
+        with open(path) as f:
+            source = f.read()
+        exec(compile(source, path, 'exec'), namespace)
+    except Exception as e:
+        sys.stderr.write('P1NanoTGE settings: {} not read: {}\n'.format(path, e))
+        if previous:
+            return previous
+        namespace = {}
+    namespace.update(overrides)
+    return compile_config(namespace, previous)
+
+
+def changed_settings(old, new):
+    return tuple(name for name, a, b in zip(Config._fields, old, new) if a != b)
+
+
+class SettingsWatcher(object):
+    """
+        Reads settings.py again when its modification time or size changed,
+        'poll' is called from a (slow) tick task of the main script.
+    """
+
+    def __init__(self, path=SETTINGS_PATH):
+        self.__path = path
+        self.__file_state = self.__stat()
+        self.__config = read_config(path)
+
+    def config(self):
+        return self.__config
+
+    def __stat(self):
+        try:
+            stat = os.stat(self.__path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self):
+        """ The names of the settings that changed since the last poll """
+        file_state = self.__stat()
+        if file_state == self.__file_state or file_state is None:
+            return ()
+        self.__file_state = file_state
+        config = read_config(self.__path, self.__config)
+        changed = changed_settings(self.__config, config)
+        self.__config = config
+        return changed
@@ -0,0 +1,37 @@
+import sys
+
+# class name: parameter names of all its banks, in bank order
+_bank_parameter_names = None
+
+
+def _load():
+    """ Imports '_Generic.Devices' and keeps only a flat tuple of names per class """
+    global _bank_parameter_names
+    try:
+        from _Generic.Devices import DEVICE_DICT
+    except ImportError as e:
+        sys.stderr.write('P1NanoTGE: no device banks available: {}\n'.format(e))
+        DEVICE_DICT = {}
+    _bank_parameter_names = dict(
+        (class_name, tuple(name for bank in banks for name in bank))
+        for class_name, banks in DEVICE_DICT.items())
+
+
+def bank_parameter_names(class_name):
+    """
+        The names of the parameters Live's '_Generic.Devices' banks show for a
+        device class, or None for classes without banks. The banks are only
+        loaded when the first device is opened.
+    """
+    if _bank_parameter_names is None:
+        _load()
+    return _bank_parameter_names.get(class_name)
+
+
+def parameters_by_original_name(device):
+    """ {original name: parameter}, the first one wins like in 'get_parameter_by_name' """
+    result = {}
+    for parameter in device.parameters:
+        if parameter.original_name not in result:
+            result[parameter.original_name] = parameter
+    return result
@@ -0,0 +1,98 @@
+import sys
+
+import Live
+
+from .DeviceBanks import bank_parameter_names
+
+# part of the range of a continuous parameter one encoder step moves it at
+# sensitivity 1.0, about what Live's relative mappings do
+RANGE_PER_STEP = 1.0 / 200.0
+
+KINDS = ('pan', 'send', 'quantized', 'continuous')
+
+
+class EncoderProfile(object):
+    """
+        How far a v-pot moves a parameter: 'sensitivity' is passed to Live's
+        MIDI mapping, with an 'acceleration' the script moves the parameter
+        itself (Live only scales the encoder steps linearly).
+    """
+
+    __slots__ = ('sensitivity', 'acceleration')
+
+    def __init__(self, sensitivity, acceleration=0.0):
+        self.sensitivity = float(sensitivity)
+        self.acceleration = float(acceleration)
+
+    def is_accelerated(self):
+        return self.acceleration > 0.0
+
+    def steps(self, cc_value):
+        """ The signed number of steps an encoder message (sign bit + count) moves """
+        count = cc_value & 63
+        steps = count * self.sensitivity * (1.0 + self.acceleration * (count - 1))
+        return -steps if cc_value & 64 else steps
+
+    def apply(self, parameter, cc_value):
+        """ Moves 'parameter' by one encoder message, clamped to its range """
+        steps = self.steps(cc_value)
+        if parameter.is_quantized:
+            steps = int(steps) or (1 if steps > 0 else -1)
+        else:
+            steps *= (parameter.max - parameter.min) * RANGE_PER_STEP
+        parameter.value = max(parameter.min, min(parameter.max, parameter.value + steps))
+
+
+# kind: EncoderProfile, see 'configure'
+_profiles = {}
+_default_profile = EncoderProfile(1.0)
+# (device class, parameter name, is quantized): profile, filled on first use
+_device_profiles = {}
+
+
+def configure(config):
+    """ Takes the profiles of a Config, the cached lookups are dropped """
+    global _default_profile
+    _default_profile = EncoderProfile(config.encoder_sensitivity)
+    _profiles.clear()
+    for kind, (sensitivity, acceleration) in config.encoder_profiles.items():
+        _profiles[kind] = EncoderProfile(
+            config.encoder_sensitivity if sensitivity is None else sensitivity, acceleration)
+    _device_profiles.clear()
+
+
+def _check_device_classes():
+    """ Warns about profiles of classes '_Generic.Devices' doesn't know (typos) """
+    for key in _profiles:
+        class_name = key.split(':')[0]
+        if key not in KINDS and bank_parameter_names(class_name) is None:
+            sys.stderr.write('P1NanoTGE: encoder profile {!r}: {!r} is not a device class '
+                             'of _Generic.Devices\n'.format(key, class_name))
+
+
+def _device_profile(class_name, parameter_name, is_quantized):
+    if not _device_profiles:
+        _check_device_classes()
+    kind = 'quantized' if is_quantized else 'continuous'
+    for key in ('{}:{}'.format(class_name, parameter_name), class_name, kind):
+        if key in _profiles:
+            return _profiles[key]
+    return _default_profile
+
+
+def profile_for(parameter):
+    """ The profile of a v-pot parameter, see 'encoder_profiles' in settings.py """
+    parent = parameter.canonical_parent
+    if isinstance(parent, Live.MixerDevice.MixerDevice):
+        if parameter == parent.panning:
+            return _profiles.get('pan', _default_profile)
+        if parameter in parent.sends:
+            return _profiles.get('send', _default_profile)
+    elif isinstance(parent, Live.Device.Device):
+        key = (parent.class_name, parameter.original_name, parameter.is_quantized)
+        profile = _device_profiles.get(key)
+        if profile is None:
+            profile = _device_profiles[key] = _device_profile(*key)
+        return profile
+    return _profiles.get('quantized' if parameter.is_quantized else 'continuous',
+                         _default_profile)
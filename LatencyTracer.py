@@ -0,0 +1,223 @@
+import sys
+from array import array
+from time import perf_counter
+
+STAGE_HANDLER = 0
+STAGE_LISTENER = 1
+STAGE_TICK = 2
+STAGE_NAMES = ('handler', 'listener', 'tick')
+NUM_SAMPLES = 256
+
+
+def _percentile(samples, count, fraction):
+    values = sorted(samples[:min(count, NUM_SAMPLES)])
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class LatencyStatistics(object):
+    """
+        Latencies of one control type until the first and until the last feedback
+        message, the last NUM_SAMPLES of each in a ring buffer
+    """
+
+    def __init__(self):
+        self.samples = array('d', [0.0] * NUM_SAMPLES)
+        self.count = 0
+        self.no_feedback = 0
+        self.maximum = 0.0
+        self.stages = [0, 0, 0]
+        self.senders = {}
+        self.finish_samples = array('d', [0.0] * NUM_SAMPLES)
+        self.finish_count = 0
+        self.finish_maximum = 0.0
+        self.messages = 0
+
+    def add(self, latency, stage, sender_name):
+        self.samples[self.count % NUM_SAMPLES] = latency
+        self.count += 1
+        if latency > self.maximum:
+            self.maximum = latency
+        self.stages[stage] += 1
+        self.senders[sender_name] = self.senders.get(sender_name, 0) + 1
+
+    def add_finish(self, latency, messages):
+        self.finish_samples[self.finish_count % NUM_SAMPLES] = latency
+        self.finish_count += 1
+        if latency > self.finish_maximum:
+            self.finish_maximum = latency
+        self.messages += messages
+
+    def percentile(self, fraction):
+        return _percentile(self.samples, self.count, fraction)
+
+    def finish_percentile(self, fraction):
+        return _percentile(self.finish_samples, self.finish_count, fraction)
+
+
+class _TracedEvent(object):
+    __slots__ = ('control_type', 'start', 'dispatch_time', 'ticks', 'first', 'first_ticks',
+                 'stage', 'sender_name', 'last', 'messages')
+
+    def __init__(self, control_type, start):
+        self.control_type = control_type
+        self.start = start
+        self.dispatch_time = 0.0
+        self.ticks = 0
+        self.first = None
+        self.first_ticks = 0
+        self.stage = STAGE_HANDLER
+        self.sender_name = None
+        self.last = start
+        self.messages = 0
+
+
+class LatencyTracer(object):
+    """
+        Optional tracing of how long it takes from an incoming message until the
+        controller gets the first and the last MIDI message caused by it
+        (enabled with 'latency_tracing_enabled' in settings.py). Button releases
+        are traced as their own control type ('select release'), several buttons
+        only act when they are released.
+
+        Every traced message is timestamped when it enters 'receive_midi'. The
+        first message written to the controller after it ('feedback_sent', after
+        the staged startup let it through) is attributed to it, together with the
+        stage it was sent from:
+          handler   during the dispatch, i.e. by the handler or by a listener
+                    Live called synchronously because of the handler's API write
+          listener  later, from a listener Live called outside of our entry points
+          tick      from an 'update_display' (tick tasks, deferred work)
+        Messages without feedback after 'max_pending_ticks' ticks are counted as
+        'no feedback'. When several messages are waiting, the first feedback is
+        attributed to all of them. The messages that follow count as its
+        feedback too, until a display tick passes without any message sent, the
+        next traced message arrives or 'max_pending_ticks' ticks passed: the
+        last one of them is when the feedback finished.
+    """
+
+    def __init__(self, slow_event_ms, max_pending_ticks=10):
+        self.__slow_event = slow_event_ms / 1000.0
+        self.__max_pending_ticks = max_pending_ticks
+        self.__statistics = {}
+        self.__current_event = None
+        self.__pending_events = []
+        self.__answered_events = []
+        self.__in_tick = False
+        self.__sent_in_tick = False
+
+    def begin_event(self, control_type, midi_bytes):
+        status = midi_bytes[0] & 240
+        if status == 128 or (status == 144 and midi_bytes[2] == 0):
+            control_type += ' release'
+        if self.__answered_events:
+            for event in self.__answered_events:
+                self.__finish(event)
+            del self.__answered_events[:]
+        self.__current_event = _TracedEvent(control_type, perf_counter())
+
+    def end_event(self):
+        event = self.__current_event
+        if event is not None:
+            self.__current_event = None
+            event.dispatch_time = perf_counter() - event.start
+            if event.first is None:
+                self.__pending_events.append(event)
+            else:
+                self.__answered_events.append(event)
+
+    def feedback_sent(self, sender):
+        now = perf_counter()
+        self.__sent_in_tick = True
+        event = self.__current_event
+        if event is not None:
+            if event.first is None:
+                self.__answer(event, now, STAGE_HANDLER, sender)
+            event.last = now
+            event.messages += 1
+            return
+        if self.__pending_events:
+            stage = STAGE_TICK if self.__in_tick else STAGE_LISTENER
+            for event in self.__pending_events:
+                self.__answer(event, now, stage, sender)
+            self.__answered_events.extend(self.__pending_events)
+            del self.__pending_events[:]
+        for event in self.__answered_events:
+            event.last = now
+            event.messages += 1
+
+    def begin_tick(self):
+        self.__in_tick = True
+
+    def end_tick(self):
+        self.__in_tick = False
+        if self.__answered_events:
+            collecting = []
+            for event in self.__answered_events:
+                event.ticks += 1
+                if not self.__sent_in_tick or \
+                        event.ticks - event.first_ticks >= self.__max_pending_ticks:
+                    self.__finish(event)
+                else:
+                    collecting.append(event)
+            self.__answered_events = collecting
+        self.__sent_in_tick = False
+        if self.__pending_events:
+            waiting = []
+            for event in self.__pending_events:
+                event.ticks += 1
+                if event.ticks >= self.__max_pending_ticks:
+                    self.__statistics_for(event.control_type).no_feedback += 1
+                else:
+                    waiting.append(event)
+            self.__pending_events = waiting
+
+    def statistics(self, control_type):
+        return self.__statistics.get(control_type)
+
+    def report(self):
+        lines = ['P1NanoTGE input to feedback latency (first / last feedback message):']
+        for control_type, s in sorted(self.__statistics.items()):
+            answered = max(1, s.count)
+            senders = sorted(s.senders.items(), key=lambda item: item[1], reverse=True)
+            lines.append('  {:18} {:6d} events  p50 {:7.2f} / {:7.2f} ms  '
+                         'p99 {:7.2f} / {:7.2f} ms  max {:7.2f} / {:7.2f} ms  '
+                         '{:.1f} msgs  {}  no feedback {}  via {}'.format(
+                             control_type, s.count,
+                             s.percentile(0.5) * 1000.0, s.finish_percentile(0.5) * 1000.0,
+                             s.percentile(0.99) * 1000.0, s.finish_percentile(0.99) * 1000.0,
+                             s.maximum * 1000.0, s.finish_maximum * 1000.0,
+                             s.messages / float(max(1, s.finish_count)),
+                             ' '.join('{} {:.0%}'.format(STAGE_NAMES[i], s.stages[i] / answered)
+                                      for i in range(len(STAGE_NAMES))),
+                             s.no_feedback,
+                             ', '.join('{} ({})'.format(name, n) for name, n in senders[:3])))
+        sys.stderr.write('\n'.join(lines) + '\n')
+
+    def __statistics_for(self, control_type):
+        statistics = self.__statistics.get(control_type)
+        if statistics is None:
+            statistics = self.__statistics[control_type] = LatencyStatistics()
+        return statistics
+
+    def __answer(self, event, now, stage, sender):
+        event.first = now
+        event.first_ticks = event.ticks
+        event.stage = stage
+        event.sender_name = sender.component_name() if sender is not None else 'P1NanoTGE'
+        self.__statistics_for(event.control_type).add(now - event.start, stage,
+                                                      event.sender_name)
+
+    def __finish(self, event):
+        first = event.first - event.start
+        last = event.last - event.start
+        self.__statistics_for(event.control_type).add_finish(last, event.messages)
+        if last > self.__slow_event:
+            dispatch_time = first if event.stage == STAGE_HANDLER else event.dispatch_time
+            sys.stderr.write('P1NanoTGE slow feedback for {}: first after {:.1f} ms (dispatch '
+                             '{:.1f} ms, then {} after {} ticks, sent by {}), last after '
+                             '{:.1f} ms ({} messages)\n'.format(
+                                 event.control_type, first * 1000.0, dispatch_time * 1000.0,
+                                 STAGE_NAMES[event.stage], event.first_ticks,
+                                 event.sender_name, last * 1000.0, event.messages))
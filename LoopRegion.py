@@ -0,0 +1,65 @@
+# The loop region is (start, length) in beats, like Live's loop_start and
+# loop_length. Live clamps every write so that start + length stays within the
+# song length, so a region is computed first and written with 'write_region'.
+
+
+def _region(start, end, song_length):
+    """ (start, length) of start..end within the song, None when nothing is left """
+    start = max(0.0, start)
+    end = min(end, song_length)
+    if end <= start:
+        return None
+    return start, end - start
+
+
+def region_with_start(cursor, start, length, song_length):
+    """
+        The region after setting its start at 'cursor' (Punch In): a cursor
+        after the loop end makes the end the start and the cursor the end.
+    """
+    end = start + length
+    return _region(min(cursor, end), max(cursor, end), song_length)
+
+
+def region_with_end(cursor, start, length, song_length):
+    """
+        The region after setting its end at 'cursor' (Punch Out): a cursor
+        before the loop start makes the start the end and the cursor the start.
+    """
+    return _region(min(cursor, start), max(cursor, start), song_length)
+
+
+def moved_region(beats, start, length, song_length):
+    """ The region moved by 'beats', stopped at the song start and end """
+    return max(0.0, min(song_length - length, start + beats)), length
+
+
+def moved_start(beats, start, length, song_length):
+    """ The region with its start moved by 'beats', None when it would pass the end """
+    return _region(start + beats, start + length, song_length)
+
+
+def moved_end(beats, start, length, song_length):
+    """ The region with its end moved by 'beats', None when it would pass the start """
+    return _region(start, start + length + beats, song_length)
+
+
+def write_region(song, start, length, region):
+    """
+        Sets the loop from its current 'start' and 'length' to 'region' with at
+        most two writes. The order keeps start + length within the old or the
+        new region after each write, so Live never clamps one of them: a start
+        that moves back is written first, one that moves on after the length.
+    """
+    if region is None:
+        return
+    new_start, new_length = region
+    if new_start < start:
+        song.loop_start = new_start
+        if new_length != length:
+            song.loop_length = new_length
+    else:
+        if new_length != length:
+            song.loop_length = new_length
+        if new_start != start:
+            song.loop_start = new_start
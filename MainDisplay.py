@@ -5,6 +5,8 @@ from .P1NanoTGEComponent import *
 class MainDisplay(P1NanoTGEComponent):
     """ Representing one main 2 row display of a Mackie Control or Extension """
 
+    __slots__ = ('__stack_offset', '__last_send_messages', '__track_colors')
+
     def __init__(self, main_script):
         P1NanoTGEComponent.__init__(self, main_script)
         self.__stack_offset = 0
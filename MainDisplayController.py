@@ -17,6 +17,11 @@ class MainDisplayController(P1NanoTGEComponent):
         about the different assignment modes.
     """
 
+    __slots__ = ('__left_extensions', '__right_extensions', '__displays', '__own_display',
+                 '__parameters', '__channel_strip_strings', '__channel_strip_mode',
+                 '__show_parameter_names', '__bank_channel_offset', '__meters_enabled',
+                 '__show_return_tracks', '__show_current_track_colors', '__test')
+
     def __init__(self, main_script, display):
         P1NanoTGEComponent.__init__(self, main_script)
         self.__left_extensions = []
@@ -30,6 +35,7 @@ class MainDisplayController(P1NanoTGEComponent):
         self.__bank_channel_offset = 0
         self.__meters_enabled = False
         self.__show_return_tracks = False
+        self.add_tick_task(self.on_update_display_timer, deferrable=True)
         self.__show_current_track_colors = True #False means we show track colors for all tracks within the visible range True means all displays show the color of the selected track
 
     def destroy(self):
@@ -120,8 +126,8 @@ class MainDisplayController(P1NanoTGEComponent):
                     range(self.__bank_channel_offset + display.stack_offset(),
                           self.__bank_channel_offset + display.stack_offset() + NUM_CHANNEL_STRIPS))
                 if not self.__show_return_tracks:
-                    for i,track in enumerate(self.song().visible_tracks):
-                        if track == self.song().view.selected_track:
+                    for i,track in enumerate(self.visible_tracks()):
+                        if track == self.selected_track():
                             selected_track_index = i
                             track_index_range = list(
                                 range(selected_track_index,
@@ -129,9 +135,9 @@ class MainDisplayController(P1NanoTGEComponent):
                             break
 
                 if self.__show_return_tracks:
-                    tracks = self.song().return_tracks
+                    tracks = self.return_tracks()
                 else:
-                    tracks = self.song().visible_tracks
+                    tracks = self.visible_tracks()
 
                 for strip_index, t in enumerate(track_index_range):
                     if self.__parameters and self.__show_parameter_names:
@@ -166,7 +172,7 @@ class MainDisplayController(P1NanoTGEComponent):
                 if self.__show_current_track_colors:
                     track_colors = []
                     for i in range(NUM_CHANNEL_STRIPS):
-                        track_colors.append(liveobj_color_to_midi_rgb_values(self.song().view.selected_track))
+                        track_colors.append(liveobj_color_to_midi_rgb_values(self.selected_track()))
                     display.send_display_colors(track_colors)
                 else:
                     track_colors = []
@@ -0,0 +1,122 @@
+import sys
+from array import array
+from time import monotonic
+
+MESSAGE_CLASSES = ('note LED', 'CC ring', 'CC 7-segment', 'CC other', 'pitch bend',
+                   'channel pressure', 'sysex display', 'sysex color', 'sysex other',
+                   'other')
+NOTE_LED, CC_RING, CC_SEVEN_SEGMENT, CC_OTHER, PITCH_BEND, CHANNEL_PRESSURE, \
+    SYSEX_DISPLAY, SYSEX_COLOR, SYSEX_OTHER, OTHER = range(len(MESSAGE_CLASSES))
+NUM_CLASSES = len(MESSAGE_CLASSES)
+
+
+def classify(midi_bytes):
+    """ The MESSAGE_CLASSES index of an outgoing message """
+    status = midi_bytes[0]
+    if status == 240:
+        if len(midi_bytes) > 5:
+            if midi_bytes[3] == 0x4E:
+                return SYSEX_COLOR
+            if midi_bytes[5] == 18 or (midi_bytes[3] == 0x67 and midi_bytes[5] == 0x13):
+                return SYSEX_DISPLAY
+        return SYSEX_OTHER
+    kind = status & 240
+    if kind == 144:
+        return NOTE_LED
+    if kind == 176:
+        if 48 <= midi_bytes[1] < 56:
+            return CC_RING
+        if 64 <= midi_bytes[1] < 76:
+            return CC_SEVEN_SEGMENT
+        return CC_OTHER
+    if kind == 224:
+        return PITCH_BEND
+    if kind == 208:
+        return CHANNEL_PRESSURE
+    return OTHER
+
+
+class MidiTrafficMonitor(object):
+    """
+        Counts every message the script sends to the controller, split by the
+        sending component and by message class, to find out which part of the
+        script fills up the Nano's USB MIDI link. Enabled with
+        'midi_traffic_monitor_enabled' in settings.py.
+
+        'report' logs the traffic since the previous report as messages/s and
+        bytes/s plus the totals since the script was loaded.
+    """
+
+    def __init__(self, report_interval_s):
+        self.__report_interval = report_interval_s
+        self.__counters = {}
+        self.__start_time = monotonic()
+        self.__window_start_time = self.__start_time
+
+    def count(self, sender, midi_bytes):
+        counter = self.__counters.get(sender)
+        if counter is None:
+            counter = self.__add_counter(sender)
+        message_class = classify(midi_bytes)
+        counter[message_class] += 1
+        counter[NUM_CLASSES + message_class] += len(midi_bytes)
+
+    def __add_counter(self, sender):
+        # window messages, window bytes, total messages, total bytes per class
+        counter = array('L', [0] * (4 * NUM_CLASSES))
+        self.__counters[sender] = counter
+        return counter
+
+    def update(self):
+        """ Called every display tick, logs a report when the interval has passed """
+        if self.__report_interval > 0 and \
+                monotonic() - self.__window_start_time >= self.__report_interval:
+            self.report()
+
+    def totals(self):
+        """ {(component name, message class): (messages, bytes)} since loading """
+        result = {}
+        for sender, counter in self.__counters.items():
+            name = self.__name(sender)
+            for c in range(NUM_CLASSES):
+                messages = counter[NUM_CLASSES * 2 + c] + counter[c]
+                if messages:
+                    result[(name, MESSAGE_CLASSES[c])] = (
+                        messages, counter[NUM_CLASSES * 3 + c] + counter[NUM_CLASSES + c])
+        return result
+
+    def report(self):
+        now = monotonic()
+        seconds = max(0.001, now - self.__window_start_time)
+        rows = []
+        class_messages = [0] * NUM_CLASSES
+        class_bytes = [0] * NUM_CLASSES
+        for sender, counter in self.__counters.items():
+            messages = sum(counter[:NUM_CLASSES])
+            num_bytes = sum(counter[NUM_CLASSES:NUM_CLASSES * 2])
+            for c in range(NUM_CLASSES):
+                class_messages[c] += counter[c]
+                class_bytes[c] += counter[NUM_CLASSES + c]
+                counter[NUM_CLASSES * 2 + c] += counter[c]
+                counter[NUM_CLASSES * 3 + c] += counter[NUM_CLASSES + c]
+                counter[c] = 0
+                counter[NUM_CLASSES + c] = 0
+            if messages:
+                rows.append((num_bytes, messages, self.__name(sender)))
+        lines = ['P1NanoTGE MIDI out, last {:.1f} s ({:.0f} s since load):'.format(
+            seconds, now - self.__start_time)]
+        for num_bytes, messages, name in sorted(rows, reverse=True):
+            lines.append('  {:24} {:8.1f} msg/s {:9.1f} B/s'.format(
+                name, messages / seconds, num_bytes / seconds))
+        for c in range(NUM_CLASSES):
+            if class_messages[c]:
+                lines.append('  {:24} {:8.1f} msg/s {:9.1f} B/s'.format(
+                    '[' + MESSAGE_CLASSES[c] + ']', class_messages[c] / seconds,
+                    class_bytes[c] / seconds))
+        lines.append('  {:24} {:8.1f} msg/s {:9.1f} B/s'.format(
+            'total', sum(class_messages) / seconds, sum(class_bytes) / seconds))
+        sys.stderr.write('\n'.join(lines) + '\n')
+        self.__window_start_time = now
+
+    def __name(self, sender):
+        return sender.component_name() if sender is not None else 'P1NanoTGE'
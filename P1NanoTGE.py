@@ -1,12 +1,22 @@
 import sys
+from time import monotonic, perf_counter
 
 import Live
 
 from .ChannelStrip import ChannelStrip, MasterChannelStrip
 from .ChannelStripController import ChannelStripController
+from .Config import APPLIED_BY, APPLY_MIDI_MAP, APPLY_RELOAD, SettingsWatcher
+from .EncoderProfiles import configure as configure_encoder_profiles
 from .MainDisplay import MainDisplay
+from .LatencyTracer import LatencyTracer
 from .MainDisplayController import MainDisplayController
+from .MidiTrafficMonitor import MidiTrafficMonitor
+from .SessionRecorder import SessionRecorder
 from .SoftwareController import SoftwareController
+from .SongSnapshot import SongSnapshot
+from .StartupSync import StartupSync
+from .TickProfiler import TickProfiler
+from .TickScheduler import TickScheduler
 from .TimeDisplay import TimeDisplay
 from .Transport import Transport
 from .consts import *
@@ -25,6 +35,35 @@ class P1NanoTGE(object):
     def __init__(self, c_instance):
         
         self.__c_instance = c_instance
+        self.__clock = monotonic
+        self.__is_connected = True
+        self.__settings_watcher = SettingsWatcher()
+        config = self.__settings_watcher.config()
+        configure_encoder_profiles(config)
+        self.__tick_profiler = None
+        if config.tick_profiler_enabled:
+            self.__tick_profiler = TickProfiler(config.tick_profiler_slow_tick_ms)
+        self.__tick_scheduler = TickScheduler(config.update_display_time_budget_ms,
+                                              self.__tick_profiler)
+        self.__settings_watch_task = self.__tick_scheduler.add_task(
+            self.__reload_changed_settings, deferrable=True, name='settings watch')
+        self.__set_settings_watch_interval(config.settings_watch_interval_s)
+        self.__latency_tracer = None
+        if config.latency_tracing_enabled:
+            self.__latency_tracer = LatencyTracer(config.latency_tracing_slow_event_ms)
+        self.__session_recorder = None
+        if config.session_recording_enabled:
+            self.__session_recorder = SessionRecorder(config.session_recording_directory,
+                                                      c_instance.song(), self.clock)
+        self.__midi_traffic_monitor = None
+        if config.midi_traffic_monitor_enabled:
+            self.__midi_traffic_monitor = MidiTrafficMonitor(
+                config.midi_traffic_report_interval_s)
+        self.__startup_sync = None
+        if config.staged_startup_enabled:
+            self.__startup_sync = self.__create_startup_sync()
+        # before the components: its listeners have to run before theirs
+        self.__song_snapshot = SongSnapshot(c_instance.song())
         self.__components = []
         self.__is_master_strip_touched = False
         self.__main_display = MainDisplay(self)
@@ -59,14 +98,93 @@ class P1NanoTGE(object):
         self.__components.append(self.__channel_strip_controller)
         self.__shift_is_pressed = False
         self.__option_is_pressed = False
-        self.__ctrl_is_pressed = False
+        self.__control_is_pressed = False
         self.__alt_is_pressed = False
         self.is_pro_version = False
         self._received_firmware_version = False
         self._refresh_state_next_time = 0
         self.__selected_channel = None
+        self.__build_control_types()
+        if self.__tick_profiler:
+            self.__build_profiler_slots()
         self.__channel_strip_controller.set_assignment_mode(CSM_MULTI_TGE)
 
+    def __create_startup_sync(self):
+        config = self.config()
+        return StartupSync(self.__send_midi_now, config.startup_sync_bytes_per_tick,
+                           config.startup_sync_handshake_timeout_ticks)
+
+    def config(self):
+        """ The settings (see Config.py), may change while the script runs """
+        return self.__settings_watcher.config()
+
+    def __set_settings_watch_interval(self, interval_s):
+        if interval_s > 0:
+            self.__settings_watch_task.set_interval(max(1, int(round(interval_s * TICKS_PER_SECOND))))
+            self.__settings_watch_task.wake()
+        else:
+            self.__settings_watch_task.sleep()
+
+    def __reload_changed_settings(self):
+        """
+            Uses what changed in settings.py without loading the script again:
+            encoder settings rebuild the MIDI map, the scheduler settings are set
+            right away, the staged startup settings are read by the next refresh.
+        """
+        changed = self.__settings_watcher.poll()
+        if not changed:
+            return
+        config = self.config()
+        sys.stderr.write('P1NanoTGE: settings.py changed: {}\n'.format(', '.join(changed)))
+        if any(APPLIED_BY[name] == APPLY_MIDI_MAP for name in changed):
+            configure_encoder_profiles(config)
+            for s in self.__channel_strips:
+                s.reset_v_pot_profile()
+            self.request_rebuild_midi_map()
+        if 'update_display_time_budget_ms' in changed:
+            self.__tick_scheduler.set_time_budget_ms(config.update_display_time_budget_ms)
+        if 'settings_watch_interval_s' in changed:
+            self.__set_settings_watch_interval(config.settings_watch_interval_s)
+        needs_reload = [name for name in changed if APPLIED_BY[name] == APPLY_RELOAD]
+        if needs_reload:
+            sys.stderr.write('P1NanoTGE: used when the script is loaded again: {}\n'.format(
+                ', '.join(needs_reload)))
+
+    def __build_control_types(self):
+        """
+            Name of the control (handler group) for every note number, with the
+            same precedence as the dispatch in '__dispatch_midi'. Used to label
+            incoming messages for the profiler and the latency tracer.
+        """
+        note_control_types = ['other note'] * 128
+        for name, notes in switch_id_groups:
+            for note in notes:
+                note_control_types[note] = name
+        self.__note_control_types = note_control_types
+
+    def __control_type(self, midi_bytes):
+        status = midi_bytes[0] & 240
+        if status == NOTE_ON_STATUS or status == NOTE_OFF_STATUS:
+            return self.__note_control_types[midi_bytes[1]]
+        elif status == CC_STATUS:
+            if midi_bytes[1] == JOG_WHEEL_CC_NO:
+                return 'jog wheel'
+            return 'other cc'
+        return 'sysex'
+
+    def __build_profiler_slots(self):
+        """
+            Slot per receive_midi control type and per build_midi_map of a strip,
+            looked up without allocating while profiling.
+        """
+        profiler = self.__tick_profiler
+        control_types = set(self.__note_control_types) | {'jog wheel', 'other cc', 'sysex'}
+        self.__receive_midi_slots = dict([(name, profiler.slot('receive_midi ' + name))
+                                          for name in sorted(control_types)])
+        self.__strip_map_slots = [profiler.slot('build_midi_map {} {}'.format(
+            s.__class__.__name__, i + 1)) for i, s in enumerate(self.__channel_strips)]
+        self.__master_map_slot = profiler.slot('build_midi_map MasterChannelStrip')
+        self.__forwards_map_slot = profiler.slot('build_midi_map forwards')
 
     def set_is_master_strip_touched(self, is_master_strip_touched):
         self.__is_master_strip_touched = is_master_strip_touched
@@ -77,8 +195,21 @@ class P1NanoTGE(object):
 
 
     def disconnect(self):
+        if not self.__is_connected:
+            return
+        self.__is_connected = False
+        self.__startup_sync = None
         for c in self.__components:
             c.destroy()
+        self.__song_snapshot.destroy()
+        if self.__tick_profiler:
+            sys.stderr.write(self.__tick_profiler.report())
+        if self.__midi_traffic_monitor:
+            self.__midi_traffic_monitor.report()
+        if self.__latency_tracer:
+            self.__latency_tracer.report()
+        if self.__session_recorder:
+            self.__session_recorder.destroy()
         sys.stderr.write('P1NanoTGE script unloaded')
 
     def __del__(self):
@@ -86,6 +217,24 @@ class P1NanoTGE(object):
     def main_display(self):
         return self.__main_display
 
+    def tick_scheduler(self):
+        return self.__tick_scheduler
+
+    def tick_profiler(self):
+        """ The TickProfiler, None unless 'tick_profiler_enabled' """
+        return self.__tick_profiler
+
+    def song_snapshot(self):
+        return self.__song_snapshot
+
+    def clock(self):
+        """ Seconds of a monotonic clock, for everything timed in seconds (auto-repeat) """
+        return self.__clock()
+
+    def set_clock(self, clock):
+        """ Replaces the clock, the tools run the script on simulated time """
+        self.__clock = clock
+
     def connect_script_instances(self, instanciated_scripts):
         """
             Called by the Application as soon as all scripts are initialized.
@@ -114,11 +263,14 @@ class P1NanoTGE(object):
             left_extensions, right_extensions)
         self.__channel_strip_controller.set_controller_extensions(
             left_extensions, right_extensions)
+        if self.__session_recorder:
+            self.__session_recorder.connect_script_instances(len(left_extensions),
+                                                             len(right_extensions))
 
     def request_firmware_version(self):
         
         if not self._received_firmware_version:
-            self.send_midi((240, 0, 0, 102, SYSEX_DEVICE_TYPE, 19, 0, 247))
+            self.__send_midi_now((240, 0, 0, 102, SYSEX_DEVICE_TYPE, 19, 0, 247))
 
     def application(self):
         """ Returns a reference to the application that we are running in"""
@@ -136,11 +288,30 @@ class P1NanoTGE(object):
         return self.__c_instance.handle()
 
     def refresh_state(self):
-        for c in self.__components:
-            c.refresh_state()
+        if self.__session_recorder:
+            self.__session_recorder.refresh_state()
+        if self.config().staged_startup_enabled:
+            # the controller may have been reconnected: handshake and sync again
+            if self.__startup_sync:
+                self.__startup_sync.restart()
+            else:
+                self.__startup_sync = self.__create_startup_sync()
+            self._received_firmware_version = False
+            self.__defer_refresh_state_of_components()
+            self.request_firmware_version()
+            return
+        self.__defer_refresh_state_of_components()
         self.request_firmware_version()
         self._refresh_state_next_time = 30
 
+    def __defer_refresh_state_of_components(self):
+        """
+            Refreshing resends the complete LED/display state. Spread it over the
+            next ticks within the frame budget instead of stalling a single one.
+        """
+        for c in self.__components:
+            self.__tick_scheduler.defer(c.refresh_state)
+
     def is_extension(self):
         
         return False
@@ -164,10 +335,36 @@ class P1NanoTGE(object):
             (see 'request_rebuild_midi_map' above) or when due to a change in Lives internal state,
             a rebuild is needed.
         """
-        
-        for s in self.__channel_strips:
-            s.build_midi_map(midi_map_handle)
-        self.__master_strip.build_midi_map(midi_map_handle)
+        self.__song_snapshot.begin()
+        try:
+            self.__build_midi_map(midi_map_handle)
+        finally:
+            self.__song_snapshot.end()
+
+    def __build_midi_map(self, midi_map_handle):
+        if self.__session_recorder:
+            self.__session_recorder.build_midi_map()
+        profiler = self.__tick_profiler
+        if profiler:
+            for i, s in enumerate(self.__channel_strips):
+                profiler.measure(self.__strip_map_slots[i], s.build_midi_map,
+                                 midi_map_handle)
+            profiler.measure(self.__master_map_slot, self.__master_strip.build_midi_map,
+                             midi_map_handle)
+            profiler.measure(self.__forwards_map_slot, self.__forward_midi_messages,
+                             midi_map_handle)
+        else:
+            for s in self.__channel_strips:
+                s.build_midi_map(midi_map_handle)
+            self.__master_strip.build_midi_map(midi_map_handle)
+            self.__forward_midi_messages(midi_map_handle)
+        mapped_parameters = tuple(p for s in self.__channel_strips + [self.__master_strip]
+                                  for p in s.mapped_parameters())
+        self.__software_controller.set_mapped_parameters(mapped_parameters)
+        if self.__session_recorder:
+            self.__session_recorder.set_mapped_parameters(mapped_parameters)
+
+    def __forward_midi_messages(self, midi_map_handle):
         for i in range(SID_FIRST, SID_LAST + 1):
             #TODO add exception for function_key_control_switch_ids that are not mapped to any function
             # this means keeping track of the function key switch ids that are mapped to a function
@@ -182,26 +379,82 @@ class P1NanoTGE(object):
                                      JOG_WHEEL_CC_NO)
 
     def update_display(self):
-        
+        self.__song_snapshot.begin()
+        try:
+            self.__update_display()
+        finally:
+            self.__song_snapshot.end()
+
+    def __update_display(self):
+        if self.__session_recorder:
+            self.__session_recorder.tick()
+        if self.__latency_tracer:
+            self.__latency_tracer.begin_tick()
         if self._refresh_state_next_time > 0:
             self._refresh_state_next_time -= 1
             if self._refresh_state_next_time == 0:
-                for c in self.__components:
-                    c.refresh_state()
+                self.__defer_refresh_state_of_components()
                 self.request_firmware_version()
-        for c in self.__components:
-            
-            c.on_update_display_timer()
-
-    def send_midi(self, midi_event_bytes):
+        self.__tick_scheduler.tick()
+        if self.__startup_sync:
+            if self.__startup_sync.tick():
+                self.request_firmware_version()
+            if self.__startup_sync.is_done():
+                self.__startup_sync = None
+        if self.__midi_traffic_monitor:
+            self.__midi_traffic_monitor.update()
+        if self.__tick_profiler:
+            self.__tick_profiler.end_tick()
+        if self.__latency_tracer:
+            self.__latency_tracer.end_tick()
+
+    def send_midi(self, midi_event_bytes, sender=None):
         """
             Use this function to send MIDI events through Live to the _real_ MIDI devices
             that this script is assigned to.
+            'sender' is the component that sends, only used for the statistics.
+            During the staged startup the message goes to the StartupSync table.
         """
-        
+        if self.__startup_sync:
+            self.__startup_sync.collect(midi_event_bytes, sender)
+        else:
+            self.__send_midi_now(midi_event_bytes, sender)
+
+    def __send_midi_now(self, midi_event_bytes, sender=None):
+        if self.__latency_tracer:
+            self.__latency_tracer.feedback_sent(sender)
+        if self.__midi_traffic_monitor:
+            self.__midi_traffic_monitor.count(sender, midi_event_bytes)
+        if self.__session_recorder:
+            self.__session_recorder.send_midi(midi_event_bytes)
         self.__c_instance.send_midi(midi_event_bytes)
 
     def receive_midi(self, midi_bytes):
+        self.__song_snapshot.begin()
+        try:
+            self.__receive_midi(midi_bytes)
+        finally:
+            self.__song_snapshot.end()
+
+    def __receive_midi(self, midi_bytes):
+        if self.__session_recorder:
+            self.__session_recorder.receive_midi(midi_bytes)
+        profiler = self.__tick_profiler
+        tracer = self.__latency_tracer
+        if profiler or tracer:
+            control_type = self.__control_type(midi_bytes)
+            if tracer:
+                tracer.begin_event(control_type, midi_bytes)
+            start = perf_counter()
+            self.__dispatch_midi(midi_bytes)
+            if profiler:
+                profiler.add(self.__receive_midi_slots[control_type], perf_counter() - start)
+            if tracer:
+                tracer.end_event()
+        else:
+            self.__dispatch_midi(midi_bytes)
+
+    def __dispatch_midi(self, midi_bytes):
         if midi_bytes[0] & 240 == NOTE_ON_STATUS or midi_bytes[
             0] & 240 == NOTE_OFF_STATUS:
 
@@ -248,6 +501,7 @@ class P1NanoTGE(object):
                     self.__transport.handle_jog_wheel_switch_ids(note, value)
                 elif note in user_foot_switch_ids:
                     self.__transport.handle_user_foot_switch_ids(note, value)
+                self.__software_controller.undo_state_may_have_changed()
         elif midi_bytes[0] & 240 == CC_STATUS:
             cc_no = midi_bytes[1]
             cc_value = midi_bytes[2]
@@ -257,12 +511,16 @@ class P1NanoTGE(object):
                                 FID_PANNING_BASE + NUM_CHANNEL_STRIPS):
                 for s in self.__channel_strips:
                     s.handle_vpot_rotation(cc_no - FID_PANNING_BASE, cc_value)
+            self.__software_controller.undo_state_may_have_changed()
         elif midi_bytes[0] == 240 and len(midi_bytes) == 12 and (
             midi_bytes[5] == 20):
             version_bytes = midi_bytes[6:-2]
             major_version = version_bytes[1]
             self.is_pro_version = major_version > 50
             self._received_firmware_version = True
+            if self.__startup_sync:
+                # after the component refreshes that are still queued
+                self.__tick_scheduler.defer(self.__startup_sync.handshake_received)
 
     def can_lock_to_devices(self):
         return False
@@ -322,5 +580,11 @@ class P1NanoTGE(object):
                     self.__channel_strip_controller.handle_toggle_io_disable()
                 elif switch_id == SID_SOFTWARE_F3:
                     self.__channel_strip_controller.handle_toggle_auto_arm()
+                elif switch_id == SID_SOFTWARE_F4:
+                    if self.__midi_traffic_monitor:
+                        self.__midi_traffic_monitor.report()
+                elif switch_id == SID_SOFTWARE_F5:
+                    if self.__latency_tracer:
+                        self.__latency_tracer.report()
                 else:
                     pass
\ No newline at end of file
@@ -7,16 +7,25 @@ from .consts import *
 class P1NanoTGEComponent(object):
     """ Baseclass for every 'sub component' of the Mackie Control. Just offers some """
 
+    __slots__ = ('__main_script', '__tick_tasks', '__weakref__')
+
     def __init__(self, main_script):
-        self.__last_send_messages = [[], [], [], []]
         self.__main_script = main_script
+        self.__tick_tasks = []
 
     def destroy(self):
+        for task in self.__tick_tasks:
+            self.__main_script.tick_scheduler().remove_task(task)
+        self.__tick_tasks = []
         self.__main_script = None
 
     def main_script(self):
         return self.__main_script
 
+    def component_name(self):
+        """ How this component is called in logs and statistics """
+        return self.__class__.__name__
+
     def shift_is_pressed(self):
         return self.__main_script.shift_is_pressed()
 
@@ -32,6 +41,19 @@ class P1NanoTGEComponent(object):
     def song(self):
         return self.__main_script.song()
 
+    def selected_track(self):
+        """ song().view.selected_track, read once per call of Live (see SongSnapshot) """
+        return self.__main_script.song_snapshot().selected_track()
+
+    def tracks(self):
+        return self.__main_script.song_snapshot().tracks()
+
+    def visible_tracks(self):
+        return self.__main_script.song_snapshot().visible_tracks()
+
+    def return_tracks(self):
+        return self.__main_script.song_snapshot().return_tracks()
+
     def script_handle(self):
         return self.__main_script.handle()
 
@@ -40,13 +62,41 @@ class P1NanoTGEComponent(object):
 
     def send_midi(self, bytes):
         if self.__main_script:
-            self.__main_script.send_midi(bytes)
+            self.__main_script.send_midi(bytes, self)
         else:
             sys.stderr.write('Main script not available, cannot send MIDI message')
 
     def request_rebuild_midi_map(self):
         self.__main_script.request_rebuild_midi_map()
 
+    def add_tick_task(self, callback, interval=1, sleeping=False, deferrable=False):
+        """
+            Register periodic work with the main scripts TickScheduler. The task is
+            removed again when the component is destroyed.
+            Pass deferrable=True for work that may wait a tick when the frame is
+            over budget (display repaints and the like).
+        """
+        task = self.__main_script.tick_scheduler().add_task(
+            callback, interval, sleeping, deferrable, name=self.__class__.__name__)
+        self.__tick_tasks.append(task)
+        return task
+
+    def defer(self, callback):
+        """ Run 'callback' once on one of the next ticks, when there is time left """
+        self.__main_script.tick_scheduler().defer(callback)
+
+    def measured(self, slot_name, callback, *args):
+        """
+            Calls 'callback(*args)', measured into the profiler slot 'slot_name'
+            when the tick profiler is enabled. For work that runs from several
+            entry points or from Live's listeners (see TickProfiler).
+        """
+        profiler = self.__main_script.tick_profiler()
+        if profiler is None:
+            callback(*args)
+        else:
+            profiler.measure(profiler.slot(slot_name), callback, *args)
+
     def visible_detail_view(self):
         if self.application().view.is_view_visible('Detail/DeviceChain'):
             return "Detail/DeviceChain"
@@ -67,7 +117,7 @@ class P1NanoTGEComponent(object):
             self.application().view.focus_view(self.visible_detail_view())
 
     def total_number_of_sends(self):
-        return len(self.song().view.selected_track.mixer_device.sends)
+        return len(self.__main_script.song_snapshot().selected_track_sends())
 
     def tge_sends_slots(self):
         return min(NUM_CHANNEL_STRIPS - 1, self.total_number_of_sends())
@@ -82,4 +132,4 @@ class P1NanoTGEComponent(object):
         return range(1 + self.tge_sends_slots(), NUM_CHANNEL_STRIPS)
 
     def sends(self):
-        return self.song().view.selected_track.mixer_device.sends
\ No newline at end of file
+        return self.__main_script.song_snapshot().selected_track_sends()
\ No newline at end of file
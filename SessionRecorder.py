@@ -0,0 +1,280 @@
+import json
+import os
+import struct
+import sys
+import time
+from functools import partial
+from time import perf_counter
+
+from ableton.v2.base import liveobj_valid
+
+MAGIC = b'P1NS'
+VERSION = 2
+FLUSH_SIZE = 65536
+
+RECORD_TICK = 1
+RECORD_RECEIVE_MIDI = 2
+RECORD_BUILD_MIDI_MAP = 3
+RECORD_SEND_MIDI = 4
+RECORD_REFRESH_STATE = 5
+RECORD_CONNECT = 6
+RECORD_PARAMETER = 7
+
+TRACK = 0
+RETURN_TRACK = 1
+MASTER_TRACK = 2
+MIXER_DEVICE = 0xFFFF
+
+_HEADER = struct.Struct('<4sBI')
+_EVENT = struct.Struct('<BI')
+_TICK = struct.Struct('<BIdd')
+_MIDI_IN = struct.Struct('<BIdH')
+_MIDI_OUT = struct.Struct('<BH')
+_CONNECT = struct.Struct('<BIBB')
+_PARAMETER = struct.Struct('<BIBHHHd')
+
+
+def describe_song(song):
+    """ The shape of the set (tracks, devices, parameters), enough to rebuild it off-Live """
+
+    def device(d):
+        return [d.name, d.class_name,
+                [[p.name, p.value, p.min, p.max, p.is_quantized] for p in d.parameters]]
+
+    def track(t):
+        return [t.name, t.color, [device(d) for d in t.devices]]
+    tracks = list(song.tracks)
+    selected_track = song.view.selected_track
+    return {'tracks': [track(t) for t in tracks],
+            'return_tracks': [track(t) for t in song.return_tracks],
+            'num_scenes': len(song.scenes),
+            'selected_track': tracks.index(selected_track) if selected_track in tracks else -1,
+            'is_playing': song.is_playing,
+            'tempo': song.tempo,
+            'current_song_time': song.current_song_time,
+            'recorded': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+
+def parameter_path(song, parameter):
+    """
+        (track kind, track index, device index, parameter index) of a mixer or
+        device parameter of a track, None for other parameters (devices in racks,
+        devices of the master track). The mixer device is MIXER_DEVICE, its
+        parameters are volume, panning and the sends.
+    """
+    owner = parameter.canonical_parent
+    track = getattr(owner, 'canonical_parent', None)
+    if track is None:
+        return None
+    if track == song.master_track:
+        track_kind, track_index = MASTER_TRACK, 0
+    else:
+        for track_kind, tracks in ((TRACK, list(song.tracks)),
+                                   (RETURN_TRACK, list(song.return_tracks))):
+            if track in tracks:
+                track_index = tracks.index(track)
+                break
+        else:
+            return None
+    mixer_device = track.mixer_device
+    if owner == mixer_device:
+        parameters = [mixer_device.volume, mixer_device.panning] + list(mixer_device.sends)
+        device_index = MIXER_DEVICE
+    else:
+        if track_kind == MASTER_TRACK:
+            return None
+        devices = list(track.devices)
+        if owner not in devices:
+            return None
+        parameters = list(owner.parameters)
+        device_index = devices.index(owner)
+    if parameter not in parameters:
+        return None
+    return track_kind, track_index, device_index, parameters.index(parameter)
+
+
+def path_parameter(song, path):
+    """ The parameter at a 'parameter_path', None when the set has no such parameter """
+    track_kind, track_index, device_index, parameter_index = path
+    if track_kind == MASTER_TRACK:
+        track = song.master_track
+    else:
+        tracks = list(song.tracks if track_kind == TRACK else song.return_tracks)
+        if track_index >= len(tracks):
+            return None
+        track = tracks[track_index]
+    if device_index == MIXER_DEVICE:
+        mixer_device = track.mixer_device
+        parameters = [mixer_device.volume, mixer_device.panning] + list(mixer_device.sends)
+    else:
+        devices = list(track.devices)
+        if device_index >= len(devices):
+            return None
+        parameters = list(devices[device_index].parameters)
+    return parameters[parameter_index] if parameter_index < len(parameters) else None
+
+
+class SessionRecorder(object):
+    """
+        Records a session (see 'session_recording_enabled' in settings.py) into a
+        compact binary log: every message that reaches 'receive_midi', every
+        'update_display', 'build_midi_map', 'refresh_state' and
+        'connect_script_instances' call and every message the script sends. A
+        header holds the shape of the set. 'tools/replay.py' feeds a log back into
+        the script running on the Live stand-in.
+
+        Timestamps are microseconds since the start of the current display tick, a
+        tick record holds the time since the previous tick, the song time and the
+        script's clock, a received message the clock too. Messages of controls
+        Live maps to parameters (faders, encoders in a parameter mode) never reach
+        the script, the values Live sets on the mapped parameters are recorded
+        instead ('set_mapped_parameters'). Changes of the set itself (tracks,
+        returns or devices added, deleted or moved) are not recorded.
+
+        The log is buffered and appended to the file every FLUSH_SIZE bytes and
+        when the script is unloaded.
+    """
+
+    def __init__(self, directory, song, clock):
+        if not directory:
+            directory = os.path.expanduser('~')
+        self.__path = os.path.join(directory, time.strftime(
+            'P1NanoTGE_session_%Y%m%d_%H%M%S.p1ns'))
+        self.__song = song
+        self.__clock = clock
+        self.__parameter_listeners = {}
+        self.__buffer = bytearray()
+        self.__is_writing = True
+        self.__tick_start = perf_counter()
+        description = json.dumps(describe_song(song)).encode('utf-8')
+        self.__buffer += _HEADER.pack(MAGIC, VERSION, len(description))
+        self.__buffer += description
+        sys.stderr.write('P1NanoTGE recording the session to {}\n'.format(self.__path))
+
+    def path(self):
+        return self.__path
+
+    def tick(self):
+        now = perf_counter()
+        self.__buffer += _TICK.pack(RECORD_TICK, self.__microseconds(now - self.__tick_start),
+                                    self.__song.current_song_time, self.__clock())
+        self.__tick_start = now
+        if len(self.__buffer) >= FLUSH_SIZE:
+            self.flush()
+
+    def receive_midi(self, midi_bytes):
+        self.__buffer += _MIDI_IN.pack(RECORD_RECEIVE_MIDI, self.__offset(), self.__clock(),
+                                       len(midi_bytes))
+        self.__buffer += bytes(midi_bytes)
+
+    def send_midi(self, midi_bytes):
+        self.__buffer += _MIDI_OUT.pack(RECORD_SEND_MIDI, len(midi_bytes))
+        self.__buffer += bytes(midi_bytes)
+
+    def build_midi_map(self):
+        self.__buffer += _EVENT.pack(RECORD_BUILD_MIDI_MAP, self.__offset())
+
+    def refresh_state(self):
+        self.__buffer += _EVENT.pack(RECORD_REFRESH_STATE, self.__offset())
+
+    def connect_script_instances(self, num_left_extensions, num_right_extensions):
+        self.__buffer += _CONNECT.pack(RECORD_CONNECT, self.__offset(),
+                                       num_left_extensions, num_right_extensions)
+
+    def set_mapped_parameters(self, parameters):
+        """ The parameters Live moves for the faders and v-pots, set after every MIDI map build """
+        listeners = self.__parameter_listeners
+        for parameter in list(listeners):
+            if parameter not in parameters:
+                self.__remove_parameter_listener(parameter)
+        for parameter in parameters:
+            if parameter not in listeners:
+                listener = partial(self.__on_parameter_value_changed, parameter)
+                parameter.add_value_listener(listener)
+                listeners[parameter] = listener
+
+    def __on_parameter_value_changed(self, parameter):
+        path = parameter_path(self.__song, parameter)
+        if path:
+            self.__buffer += _PARAMETER.pack(RECORD_PARAMETER, self.__offset(), *path,
+                                             parameter.value)
+
+    def __remove_parameter_listener(self, parameter):
+        listener = self.__parameter_listeners.pop(parameter)
+        if liveobj_valid(parameter) and parameter.value_has_listener(listener):
+            parameter.remove_value_listener(listener)
+
+    def destroy(self):
+        for parameter in list(self.__parameter_listeners):
+            self.__remove_parameter_listener(parameter)
+        self.flush()
+
+    def flush(self):
+        if self.__is_writing and self.__buffer:
+            try:
+                with open(self.__path, 'ab') as f:
+                    f.write(self.__buffer)
+            except (IOError, OSError) as e:
+                self.__is_writing = False
+                sys.stderr.write('P1NanoTGE session recording stopped: {}\n'.format(e))
+        del self.__buffer[:]
+
+    def __offset(self):
+        return self.__microseconds(perf_counter() - self.__tick_start)
+
+    @staticmethod
+    def __microseconds(seconds):
+        return min(0xFFFFFFFF, int(seconds * 1000000.0))
+
+
+def read_session(path):
+    """
+        Returns (set description, records) of a log. Records are tuples
+        (kind, microseconds, data): data is (MIDI message, clock) for
+        RECORD_RECEIVE_MIDI, the MIDI message for RECORD_SEND_MIDI (which has no
+        timestamp, microseconds is 0), (song time, clock) for RECORD_TICK,
+        (parameter path, value) for RECORD_PARAMETER, the number of left and
+        right extensions for RECORD_CONNECT, otherwise None.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, description_length = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('{} is not a version {} session log'.format(path, VERSION))
+    position = _HEADER.size
+    description = json.loads(data[position:position + description_length].decode('utf-8'))
+    position += description_length
+    records = []
+    while position < len(data):
+        kind = data[position]
+        if kind == RECORD_SEND_MIDI:
+            kind, length = _MIDI_OUT.unpack_from(data, position)
+            position += _MIDI_OUT.size
+            records.append((kind, 0, tuple(data[position:position + length])))
+            position += length
+        elif kind == RECORD_RECEIVE_MIDI:
+            kind, offset, clock, length = _MIDI_IN.unpack_from(data, position)
+            position += _MIDI_IN.size
+            records.append((kind, offset, (tuple(data[position:position + length]), clock)))
+            position += length
+        elif kind == RECORD_CONNECT:
+            kind, offset, left, right = _CONNECT.unpack_from(data, position)
+            position += _CONNECT.size
+            records.append((kind, offset, (left, right)))
+        elif kind == RECORD_TICK:
+            kind, offset, song_time, clock = _TICK.unpack_from(data, position)
+            position += _TICK.size
+            records.append((kind, offset, (song_time, clock)))
+        elif kind == RECORD_PARAMETER:
+            kind, offset, track_kind, track_index, device_index, parameter_index, value = \
+                _PARAMETER.unpack_from(data, position)
+            position += _PARAMETER.size
+            records.append((kind, offset,
+                            ((track_kind, track_index, device_index, parameter_index), value)))
+        elif kind in (RECORD_BUILD_MIDI_MAP, RECORD_REFRESH_STATE):
+            kind, offset = _EVENT.unpack_from(data, position)
+            position += _EVENT.size
+            records.append((kind, offset, None))
+        else:
+            raise ValueError('Unknown record {} at byte {} of {}'.format(kind, position, path))
+    return description, records
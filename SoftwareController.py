@@ -1,15 +1,24 @@
 import sys
 
+from ableton.v2.base import liveobj_valid
 from .P1NanoTGEComponent import *
 
 
 class SoftwareController(P1NanoTGEComponent):
     """ Representing the buttons above the transport, including the basic: """
 
+    __slots__ = ('__last_can_undo_state', '__last_can_redo_state', '__undo_redo_poll_task',
+                 '__devices_listener_track', '__mapped_parameters')
+
     def __init__(self, main_script):
         P1NanoTGEComponent.__init__(self, main_script)
         self.__last_can_undo_state = False
         self.__last_can_redo_state = False
+        self.__undo_redo_poll_task = self.add_tick_task(
+            self.on_update_display_timer,
+            interval=UNDO_REDO_POLL_MIN_INTERVAL, deferrable=True)
+        self.__devices_listener_track = None
+        self.__mapped_parameters = ()
         av = self.application().view
         av.add_is_view_visible_listener('Session',
                                         self.__update_session_arranger_button_led)
@@ -25,6 +34,14 @@ class SoftwareController(P1NanoTGEComponent):
             self.__update_follow_song_button_led)
         self.song().add_back_to_arranger_listener(
             self.__update_back_to_arranger_button_led)
+        self.song().add_tracks_listener(self.undo_state_may_have_changed)
+        self.song().add_return_tracks_listener(self.undo_state_may_have_changed)
+        self.song().add_record_mode_listener(self.undo_state_may_have_changed)
+        self.song().add_session_record_listener(
+            self.undo_state_may_have_changed)
+        self.song().view.add_selected_track_listener(
+            self.__on_selected_track_changed)
+        self.__on_selected_track_changed()
 
     def destroy(self):
         av = self.application().view
@@ -42,6 +59,16 @@ class SoftwareController(P1NanoTGEComponent):
             self.__update_follow_song_button_led)
         self.song().remove_back_to_arranger_listener(
             self.__update_back_to_arranger_button_led)
+        self.song().remove_tracks_listener(self.undo_state_may_have_changed)
+        self.song().remove_return_tracks_listener(
+            self.undo_state_may_have_changed)
+        self.song().remove_record_mode_listener(self.undo_state_may_have_changed)
+        self.song().remove_session_record_listener(
+            self.undo_state_may_have_changed)
+        self.song().view.remove_selected_track_listener(
+            self.__on_selected_track_changed)
+        self.__remove_devices_listener()
+        self.set_mapped_parameters(())
         for note in software_controls_switch_ids:
             self.send_midi((NOTE_ON_STATUS, note, BUTTON_STATE_OFF))
         for note in function_key_control_switch_ids:
@@ -106,13 +133,66 @@ class SoftwareController(P1NanoTGEComponent):
         self.__update_back_to_arranger_button_led()
 
     def on_update_display_timer(self):
-        
-        if self.__last_can_undo_state != self.song().can_undo:
-            self.__last_can_undo_state = self.song().can_undo
+        """
+            Live has no listener for can_undo/can_redo, so we poll them. Right after
+            anything that might have changed them (see 'undo_state_may_have_changed')
+            this happens every tick, otherwise the interval doubles up to a slow
+            heartbeat, which catches changes we were not told about: edits with
+            the mouse or another controller show up to 2 s late. Moves of the
+            faders and v-pots Live maps are seen through their parameters (see
+            'set_mapped_parameters'), also when automation moves them, which
+            keeps the polling at every tick while it plays.
+        """
+        can_undo = self.song().can_undo
+        can_redo = self.song().can_redo
+        changed = False
+        if self.__last_can_undo_state != can_undo:
+            self.__last_can_undo_state = can_undo
             self.__update_undo_button_led()
-        if self.__last_can_redo_state != self.song().can_redo:
-            self.__last_can_redo_state = self.song().can_redo
+            changed = True
+        if self.__last_can_redo_state != can_redo:
+            self.__last_can_redo_state = can_redo
             self.__update_redo_button_led()
+            changed = True
+        task = self.__undo_redo_poll_task
+        if changed:
+            task.set_interval(UNDO_REDO_POLL_MIN_INTERVAL)
+        else:
+            task.set_interval(min(UNDO_REDO_POLL_MAX_INTERVAL, task.interval() * 2))
+
+    def undo_state_may_have_changed(self):
+        """ Called after every handled MIDI input, on song/device changes and mapped moves """
+        self.__undo_redo_poll_task.set_interval(UNDO_REDO_POLL_MIN_INTERVAL)
+
+    def set_mapped_parameters(self, parameters):
+        """
+            The parameters Live moves for the faders and v-pots (their MIDI never
+            gets to the script), set after every MIDI map build
+        """
+        old_parameters = self.__mapped_parameters
+        self.__mapped_parameters = parameters
+        for parameter in old_parameters:
+            if parameter not in parameters and liveobj_valid(parameter) and \
+                    parameter.value_has_listener(self.undo_state_may_have_changed):
+                parameter.remove_value_listener(self.undo_state_may_have_changed)
+        for parameter in parameters:
+            if not parameter.value_has_listener(self.undo_state_may_have_changed):
+                parameter.add_value_listener(self.undo_state_may_have_changed)
+
+    def __on_selected_track_changed(self):
+        self.__remove_devices_listener()
+        track = self.selected_track()
+        if track:
+            track.add_devices_listener(self.undo_state_may_have_changed)
+            self.__devices_listener_track = track
+        self.undo_state_may_have_changed()
+
+    def __remove_devices_listener(self):
+        track = self.__devices_listener_track
+        self.__devices_listener_track = None
+        if liveobj_valid(track) and track.devices_has_listener(
+            self.undo_state_may_have_changed):
+            track.remove_devices_listener(self.undo_state_may_have_changed)
 
     def __toggle_session_arranger_is_visible(self):
         if self.application().view.is_view_visible('Session'):
@@ -0,0 +1,102 @@
+_UNREAD = object()
+
+
+class SongSnapshot(object):
+    """
+        The song properties the components read over and over (the selected
+        track, its sends, the track lists). Every read of them asks Live for a
+        new proxy or vector, so while Live is calling the script (a display
+        tick, a MIDI message, a MIDI map build, see 'begin' and 'end') each one
+        is read once, on first use, and kept until the call ends or Live
+        reports a change.
+
+        The listeners are connected before the ones of the components, so a
+        component listener never sees an outdated value. Outside of a call
+        (e.g. in a listener Live calls on its own) everything is read from Live,
+        the lists are tuples only within a call.
+    """
+
+    __slots__ = ('__song', '__depth', '__selected_track', '__sends', '__tracks',
+                 '__visible_tracks', '__return_tracks')
+
+    def __init__(self, song):
+        self.__song = song
+        self.__depth = 0
+        self.__clear()
+        song.view.add_selected_track_listener(self.__on_selected_track_changed)
+        song.add_tracks_listener(self.__on_tracks_changed)
+        song.add_visible_tracks_listener(self.__on_visible_tracks_changed)
+        song.add_return_tracks_listener(self.__on_return_tracks_changed)
+
+    def destroy(self):
+        song = self.__song
+        song.view.remove_selected_track_listener(self.__on_selected_track_changed)
+        song.remove_tracks_listener(self.__on_tracks_changed)
+        song.remove_visible_tracks_listener(self.__on_visible_tracks_changed)
+        song.remove_return_tracks_listener(self.__on_return_tracks_changed)
+        self.__clear()
+
+    def begin(self):
+        self.__depth += 1
+
+    def end(self):
+        self.__depth -= 1
+        if self.__depth == 0:
+            self.__clear()
+
+    def __clear(self):
+        self.__selected_track = _UNREAD
+        self.__sends = _UNREAD
+        self.__tracks = _UNREAD
+        self.__visible_tracks = _UNREAD
+        self.__return_tracks = _UNREAD
+
+    def selected_track(self):
+        if not self.__depth:
+            return self.__song.view.selected_track
+        if self.__selected_track is _UNREAD:
+            self.__selected_track = self.__song.view.selected_track
+        return self.__selected_track
+
+    def selected_track_sends(self):
+        if not self.__depth:
+            return self.__song.view.selected_track.mixer_device.sends
+        if self.__sends is _UNREAD:
+            self.__sends = tuple(self.selected_track().mixer_device.sends)
+        return self.__sends
+
+    def tracks(self):
+        if not self.__depth:
+            return self.__song.tracks
+        if self.__tracks is _UNREAD:
+            self.__tracks = tuple(self.__song.tracks)
+        return self.__tracks
+
+    def visible_tracks(self):
+        if not self.__depth:
+            return self.__song.visible_tracks
+        if self.__visible_tracks is _UNREAD:
+            self.__visible_tracks = tuple(self.__song.visible_tracks)
+        return self.__visible_tracks
+
+    def return_tracks(self):
+        if not self.__depth:
+            return self.__song.return_tracks
+        if self.__return_tracks is _UNREAD:
+            self.__return_tracks = tuple(self.__song.return_tracks)
+        return self.__return_tracks
+
+    def __on_selected_track_changed(self):
+        self.__selected_track = _UNREAD
+        self.__sends = _UNREAD
+
+    def __on_tracks_changed(self):
+        self.__tracks = _UNREAD
+
+    def __on_visible_tracks_changed(self):
+        self.__visible_tracks = _UNREAD
+
+    def __on_return_tracks_changed(self):
+        # the number of sends follows the return tracks
+        self.__return_tracks = _UNREAD
+        self.__sends = _UNREAD
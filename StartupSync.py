@@ -0,0 +1,112 @@
+import sys
+
+
+def state_address(midi_bytes):
+    """
+        What a message sets on the controller (an LED, a ring, a fader, a display
+        range), two messages with the same address overwrite each other. None for
+        messages that are no state and must all be sent.
+    """
+    status = midi_bytes[0]
+    if status == 240:
+        if len(midi_bytes) > 7 and midi_bytes[1] == 0 and midi_bytes[2] == 0:
+            # display text, meter modes: header up to the offset/strip byte
+            return tuple(midi_bytes[:7]), len(midi_bytes)
+        if len(midi_bytes) > 6 and midi_bytes[3] == 0x4E:
+            # display colors
+            return tuple(midi_bytes[:6]), len(midi_bytes)
+        return None
+    kind = status & 240
+    if kind == 128:
+        return 144 | (status & 15), midi_bytes[1]
+    if kind == 144 or kind == 176 or kind == 160:
+        return status, midi_bytes[1]
+    if kind == 224:
+        return status,
+    if kind == 208:
+        return status, midi_bytes[1] >> 4
+    return None
+
+
+class StartupSync(object):
+    """
+        Staged bring-up of the controller. While the script is created and
+        refreshed, the components only fill a table of the state they want on the
+        hardware (see 'collect'): a later message for the same LED, ring, fader or
+        display range replaces the earlier one, so the repeated refreshes of the
+        startup cost nothing on the wire.
+
+        Once the controller answered the firmware version request (or did not
+        within 'handshake_timeout_ticks' display ticks), the table is sent in the
+        order it was filled, at most 'bytes_per_tick' bytes per display tick.
+        Messages sent by the script while the table is flushed go into the table
+        as well, so nothing overtakes older state.
+    """
+
+    def __init__(self, send, bytes_per_tick, handshake_timeout_ticks):
+        self.__send = send
+        self.__bytes_per_tick = bytes_per_tick
+        self.__handshake_timeout_ticks = handshake_timeout_ticks
+        self.__pending = {}
+        self.__next_unique_address = 0
+        self.__is_collecting = True
+        self.__ticks_waited = 0
+        self.__collected_count = 0
+        self.__sent_count = 0
+        self.__sent_bytes = 0
+
+    def is_done(self):
+        return not self.__is_collecting and not self.__pending
+
+    def collect(self, midi_bytes, sender):
+        self.__collected_count += 1
+        address = state_address(midi_bytes)
+        if address is None:
+            address = self.__next_unique_address
+            self.__next_unique_address += 1
+        elif address in self.__pending:
+            # moved to the end: it must not be overwritten by what came in between
+            del self.__pending[address]
+        self.__pending[address] = (midi_bytes, sender)
+
+    def restart(self):
+        """ Wait for the handshake again, the collected state is kept """
+        self.__is_collecting = True
+        self.__ticks_waited = 0
+
+    def handshake_received(self):
+        """ The controller is ready: start sending with the next tick """
+        self.__is_collecting = False
+
+    def tick(self):
+        """ Called every display tick, returns True when the timeout passed """
+        timed_out = False
+        if self.__is_collecting:
+            self.__ticks_waited += 1
+            if self.__ticks_waited < self.__handshake_timeout_ticks:
+                return False
+            sys.stderr.write('P1NanoTGE: no answer to the firmware request, '
+                             'syncing the controller anyway\n')
+            self.__is_collecting = False
+            timed_out = True
+        self.__flush()
+        if self.is_done():
+            sys.stderr.write('P1NanoTGE startup sync: {} messages collected, {} '
+                             'messages ({} bytes) sent\n'.format(
+                                 self.__collected_count, self.__sent_count,
+                                 self.__sent_bytes))
+        return timed_out
+
+    def __flush(self):
+        pending = self.__pending
+        budget = self.__bytes_per_tick
+        while pending:
+            address = next(iter(pending))
+            midi_bytes, sender = pending[address]
+            if budget < len(midi_bytes) and budget < self.__bytes_per_tick:
+                return
+            del pending[address]
+            budget -= len(midi_bytes)
+            self.__sent_count += 1
+            self.__sent_bytes += len(midi_bytes)
+            self.__send(midi_bytes, sender)
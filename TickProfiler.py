@@ -0,0 +1,162 @@
+import sys
+from array import array
+from time import perf_counter
+
+NUM_BUCKETS = 20
+MAX_SLOTS = 96
+SLOW_TICK_LOG_SLOTS = 8
+
+
+class TickProfiler(object):
+    """
+        Opt-in timing of everything the script does per display frame (see
+        'tick_profiler_enabled' in settings.py). Work is measured into named
+        slots (a component's tick task, a receive_midi handler group, a strip's
+        build_midi_map...). Per slot it keeps call counts, total and max time and
+        a histogram with power of two microsecond buckets, all in arrays that
+        are allocated once. Slots hold self time: what is measured into another
+        slot while a slot is measured (the strip reassignment of a bank button
+        handler) is not counted twice, so the slots of a frame add up to it.
+
+        The histograms roll: they cover the current and the previous window of
+        'window_ticks' display ticks. A frame (everything measured since the last
+        'end_tick') that takes longer than 'slow_tick_ms' is written to Live's
+        log with the most expensive slots of that frame.
+    """
+
+    def __init__(self, slow_tick_ms, window_ticks=600):
+        self.__slow_tick = slow_tick_ms / 1000.0
+        self.__window_ticks = window_ticks
+        self.__ticks_in_window = 0
+        self.__slot_names = []
+        self.__slot_by_name = {}
+        # time measured into inner slots during the current measurement
+        self.__inner_time = 0.0
+        self.__counts = array('L', [0] * MAX_SLOTS)
+        self.__totals = array('d', [0.0] * MAX_SLOTS)
+        self.__maxima = array('d', [0.0] * MAX_SLOTS)
+        self.__frame = array('d', [0.0] * MAX_SLOTS)
+        self.__zero_frame = array('d', [0.0] * MAX_SLOTS)
+        self.__histogram = array('L', [0] * (MAX_SLOTS * NUM_BUCKETS))
+        self.__previous_histogram = array('L', [0] * (MAX_SLOTS * NUM_BUCKETS))
+        self.__zero_histogram = array('L', [0] * (MAX_SLOTS * NUM_BUCKETS))
+        self.__slow_ticks = 0
+        self.__other_slot = self.slot('other')
+
+    def slot(self, name):
+        """ Returns the slot index for 'name', registering it on first use """
+        slot = self.__slot_by_name.get(name)
+        if slot is None:
+            if len(self.__slot_names) >= MAX_SLOTS:
+                return self.__other_slot
+            slot = len(self.__slot_names)
+            self.__slot_names.append(name)
+            self.__slot_by_name[name] = slot
+        return slot
+
+    def unique_slot(self, name):
+        """ Like 'slot', but numbers names that are already taken ('ChannelStrip 2') """
+        if name in self.__slot_by_name:
+            number = 2
+            while '{} {}'.format(name, number) in self.__slot_by_name:
+                number += 1
+            name = '{} {}'.format(name, number)
+        return self.slot(name)
+
+    def add(self, slot, seconds):
+        self.__counts[slot] += 1
+        self.__totals[slot] += seconds
+        self.__frame[slot] += seconds
+        if seconds > self.__maxima[slot]:
+            self.__maxima[slot] = seconds
+        bucket = int(seconds * 1000000.0).bit_length()
+        if bucket >= NUM_BUCKETS:
+            bucket = NUM_BUCKETS - 1
+        self.__histogram[slot * NUM_BUCKETS + bucket] += 1
+
+    def measure(self, slot, callback, *args):
+        outer_inner_time = self.__inner_time
+        self.__inner_time = 0.0
+        start = perf_counter()
+        try:
+            callback(*args)
+        finally:
+            seconds = perf_counter() - start
+            self.add(slot, seconds - self.__inner_time)
+            self.__inner_time = outer_inner_time + seconds
+
+    def timed(self, slot, callback):
+        """ Returns 'callback' wrapped so that every call is measured into 'slot' """
+        measure = self.measure
+
+        def timed_callback():
+            measure(slot, callback)
+        return timed_callback
+
+    def end_tick(self):
+        """ Called once per update_display, after all work of the frame was done """
+        frame = self.__frame
+        frame_time = sum(frame)
+        if frame_time > self.__slow_tick:
+            self.__slow_ticks += 1
+            self.__log_slow_tick(frame_time)
+        frame[:] = self.__zero_frame
+        self.__ticks_in_window += 1
+        if self.__ticks_in_window >= self.__window_ticks:
+            self.__ticks_in_window = 0
+            self.__previous_histogram, self.__histogram = (self.__histogram,
+                                                           self.__previous_histogram)
+            self.__histogram[:] = self.__zero_histogram
+
+    def slow_ticks(self):
+        return self.__slow_ticks
+
+    def slot_names(self):
+        return tuple(self.__slot_names)
+
+    def statistics(self, name):
+        """ (calls, total seconds, max seconds) of slot 'name' since the start """
+        slot = self.__slot_by_name[name]
+        return self.__counts[slot], self.__totals[slot], self.__maxima[slot]
+
+    def histogram(self, name):
+        """ Bucket counts of the rolling window, bucket b holds calls < 2**b us """
+        slot = self.__slot_by_name[name]
+        first = slot * NUM_BUCKETS
+        return [self.__histogram[i] + self.__previous_histogram[i]
+                for i in range(first, first + NUM_BUCKETS)]
+
+    def percentile_us(self, name, fraction):
+        """ Upper bound of the bucket the percentile falls into """
+        buckets = self.histogram(name)
+        total = sum(buckets)
+        if not total:
+            return 0
+        seen = 0
+        for bucket, count in enumerate(buckets):
+            seen += count
+            if seen >= fraction * total:
+                return 1 << bucket
+        return 1 << (NUM_BUCKETS - 1)
+
+    def report(self):
+        lines = ['P1NanoTGE tick profile ({} slow ticks):'.format(self.__slow_ticks)]
+        for slot, name in enumerate(self.__slot_names):
+            count = self.__counts[slot]
+            if count:
+                lines.append('  {:48} {:8d} calls  mean {:8.1f} us  p50 <{:6d} us  '
+                             'p99 <{:6d} us  max {:8.1f} us'.format(
+                                 name, count, self.__totals[slot] / count * 1000000.0,
+                                 self.percentile_us(name, 0.5),
+                                 self.percentile_us(name, 0.99),
+                                 self.__maxima[slot] * 1000000.0))
+        return '\n'.join(lines) + '\n'
+
+    def __log_slow_tick(self, frame_time):
+        frame = self.__frame
+        parts = sorted([(frame[slot], name) for slot, name in enumerate(self.__slot_names)
+                        if frame[slot] > 0.0], reverse=True)[:SLOW_TICK_LOG_SLOTS]
+        sys.stderr.write('P1NanoTGE slow tick {:.1f} ms: {}\n'.format(
+            frame_time * 1000.0,
+            ', '.join('{} {:.2f}'.format(name, seconds * 1000.0)
+                      for seconds, name in parts)))
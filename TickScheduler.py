@@ -0,0 +1,185 @@
+from time import perf_counter
+
+
+class TickTask(object):
+    """
+        A piece of periodic work that a component registered with the TickScheduler.
+        An awake task runs every 'interval' display ticks. A sleeping task costs
+        nothing per tick until someone (usually a Live listener) wakes it up again.
+        Deferrable tasks may be pushed to a later tick when the frame is over budget.
+    """
+
+    def __init__(self, scheduler, callback, interval, sleeping, deferrable, name):
+        self.__scheduler = scheduler
+        self.__callback = callback
+        self.__interval = max(1, interval)
+        self.__countdown = 1
+        self.__is_sleeping = sleeping
+        self.__is_deferrable = deferrable
+        self.__name = name
+
+    def name(self):
+        return self.__name
+
+    def interval(self):
+        return self.__interval
+
+    def set_interval(self, interval):
+        """ Change the interval, the next run happens 'interval' ticks from now """
+        self.__interval = max(1, interval)
+        self.__countdown = self.__interval
+
+    def is_sleeping(self):
+        return self.__is_sleeping
+
+    def is_deferrable(self):
+        return self.__is_deferrable
+
+    def overdue_ticks(self):
+        return -self.__countdown
+
+    def sleep(self):
+        if not self.__is_sleeping:
+            self.__is_sleeping = True
+            self.__scheduler.task_state_changed()
+
+    def wake(self):
+        """ Wake the task up (if needed), it will run on the next tick """
+        self.__countdown = min(self.__countdown, 1)
+        if self.__is_sleeping:
+            self.__is_sleeping = False
+            self.__scheduler.task_state_changed()
+
+    def advance(self):
+        """ Count down one tick, returns True if the task wants to run """
+        if self.__is_sleeping:
+            return False
+        self.__countdown -= 1
+        return self.__countdown <= 0
+
+    def run(self):
+        self.__countdown = self.__interval
+        self.__callback()
+
+
+class TickScheduler(object):
+    """
+        Replaces calling 'on_update_display_timer' of every component on every
+        'update_display' call: components register TickTasks with their own interval
+        and put them to sleep when there is nothing to do, so a tick only costs
+        what the awake tasks cost.
+
+        Every tick first runs the latency critical tasks, then the deferrable tasks
+        and one-shot jobs (see 'defer') as long as the tick stays within its time
+        budget. Whatever did not fit is run first on the next tick. At least one
+        deferrable unit of work runs per tick, so nothing can starve.
+
+        With a TickProfiler every task and deferred job is measured into its own
+        profiler slot; without one no timing code runs at all.
+    """
+
+    def __init__(self, time_budget_ms, profiler=None):
+        self.__profiler = profiler
+        self.__tasks = []
+        self.__awake_tasks = ()
+        self.__awake_tasks_dirty = False
+        self.__deferred_jobs = []
+        self.__deferred_slots = {}
+        self.__time_budget = time_budget_ms / 1000.0
+        self.__tick_count = 0
+        self.__last_tick_time = 0.0
+        self.__deferred_count = 0
+
+    def add_task(self, callback, interval=1, sleeping=False, deferrable=False,
+                 name=None):
+        if self.__profiler is not None:
+            callback = self.__profiler.timed(
+                self.__profiler.unique_slot(name or 'task'), callback)
+        task = TickTask(self, callback, interval, sleeping, deferrable, name)
+        self.__tasks.append(task)
+        self.__awake_tasks_dirty = True
+        return task
+
+    def remove_task(self, task):
+        if task in self.__tasks:
+            self.__tasks.remove(task)
+            task.sleep()
+            self.__awake_tasks_dirty = True
+
+    def defer(self, callback):
+        """
+            Run 'callback' once on one of the next ticks, when there is time left.
+            Queuing the same callback twice before it ran only runs it once.
+        """
+        if callback not in self.__deferred_jobs:
+            self.__deferred_jobs.append(callback)
+
+    def task_state_changed(self):
+        self.__awake_tasks_dirty = True
+
+    def tasks(self):
+        return tuple(self.__tasks)
+
+    def time_budget_ms(self):
+        return self.__time_budget * 1000.0
+
+    def set_time_budget_ms(self, time_budget_ms):
+        self.__time_budget = time_budget_ms / 1000.0
+
+    def tick_count(self):
+        return self.__tick_count
+
+    def last_tick_time_ms(self):
+        return self.__last_tick_time * 1000.0
+
+    def deferred_count(self):
+        """ How often deferrable work was pushed to a later tick so far """
+        return self.__deferred_count
+
+    def tick(self):
+        start = perf_counter()
+        self.__tick_count += 1
+        if self.__awake_tasks_dirty:
+            self.__awake_tasks_dirty = False
+            self.__awake_tasks = tuple([t for t in self.__tasks if not t.is_sleeping()])
+        due_deferrable_tasks = []
+        for task in self.__awake_tasks:
+            if task.advance():
+                if task.is_deferrable():
+                    due_deferrable_tasks.append(task)
+                else:
+                    task.run()
+        if due_deferrable_tasks or self.__deferred_jobs:
+            self.__run_deferrable_work(start, due_deferrable_tasks)
+        self.__last_tick_time = perf_counter() - start
+
+    def __run_deferrable_work(self, start, due_deferrable_tasks):
+        if len(due_deferrable_tasks) > 1:
+            due_deferrable_tasks.sort(key=lambda t: t.overdue_ticks(), reverse=True)
+        budget = self.__time_budget
+        ran_any = False
+        for task in due_deferrable_tasks:
+            if ran_any and perf_counter() - start > budget:
+                self.__deferred_count += 1
+                return
+            task.run()
+            ran_any = True
+        while self.__deferred_jobs:
+            if ran_any and perf_counter() - start > budget:
+                self.__deferred_count += 1
+                return
+            job = self.__deferred_jobs.pop(0)
+            if self.__profiler is None:
+                job()
+            else:
+                self.__profiler.measure(self.__deferred_slot(job), job)
+            ran_any = True
+
+    def __deferred_slot(self, job):
+        """ The profiler slot of a deferred job, looked up once per function """
+        function = getattr(job, '__func__', job)
+        slot = self.__deferred_slots.get(function)
+        if slot is None:
+            slot = self.__deferred_slots[function] = self.__profiler.slot(
+                'deferred ' + getattr(job, '__qualname__', 'job'))
+        return slot
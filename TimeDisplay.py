@@ -8,15 +8,23 @@ from .P1NanoTGEComponent import *
 class TimeDisplay(P1NanoTGEComponent):
     """ Represents the Mackie Controls Time-Display, plus the two LED's that show the assignment """
 
+    __slots__ = ('__main_script', '__show_beat_time', '__smpt_format', '__last_send_time',
+                 '__tick_task')
+
     def __init__(self, main_script):
         P1NanoTGEComponent.__init__(self, main_script)
         self.__main_script = main_script
         self.__show_beat_time = False
         self.__smpt_format = Live.Song.TimeFormat.smpte_25
         self.__last_send_time = []
+        self.__tick_task = self.add_tick_task(self.on_update_display_timer)
+        self.song().add_is_playing_listener(self.__wake_up)
+        self.song().add_current_song_time_listener(self.__wake_up)
         self.show_beats()
 
     def destroy(self):
+        self.song().remove_is_playing_listener(self.__wake_up)
+        self.song().remove_current_song_time_listener(self.__wake_up)
         self.clear_display()
         P1NanoTGEComponent.destroy(self)
 
@@ -36,6 +44,7 @@ class TimeDisplay(P1NanoTGEComponent):
             self.show_smpte(self.__smpt_format)
         else:
             self.show_beats()
+        self.__wake_up()
 
     def clear_display(self):
         time_string = [' ' for i in range(10)]
@@ -46,10 +55,15 @@ class TimeDisplay(P1NanoTGEComponent):
     def refresh_state(self):
         self.show_beats()
         self.__last_send_time = []
+        self.__wake_up()
 
     def on_update_display_timer(self):
-        """ Called by a timer which gets called every 100 ms. We will simply check if the """
-        
+        """
+            Runs every tick while the song is playing. When stopped, the song time only
+            changes through its listener, which wakes us up again.
+        """
+        if not self.song().is_playing:
+            self.__tick_task.sleep()
         if self.__show_beat_time:
             time_string = str(self.song().get_current_beats_song_time())
         else:
@@ -61,6 +75,9 @@ class TimeDisplay(P1NanoTGEComponent):
             self.__last_send_time = time_string
             self.__send_time_string(time_string, show_points=True)
 
+    def __wake_up(self):
+        self.__tick_task.wake()
+
     def __send_time_string(self, time_string, show_points):
         for c in range(0, 10):
             char = time_string[9 - c].upper()
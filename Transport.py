@@ -1,29 +1,61 @@
 import sys
 
-from ableton.v2.base import move_current_song_time
+from ableton.v2.base import liveobj_valid, move_current_song_time
+from .AutoRepeat import AutoRepeater, AutoRepeatProfile
+from .LoopRegion import moved_end, moved_region, moved_start, region_with_end, \
+    region_with_start, write_region
 from .P1NanoTGEComponent import *
 import Live
 
 class Transport(P1NanoTGEComponent):
     """ Representing the transport section of the Mackie Control: """
 
+    __slots__ = ('__forward_button_down', '__rewind_button_down', '__zoom_button_down',
+                 '__scrub_button_down', '__loop_button_down', '__punch_in_button_down',
+                 '__punch_out_button_down', '__loop_nudged', '__jog_step_count_forward',
+                 '__jog_step_count_backwards', '__last_focussed_clip_play_state',
+                 '__transport_repeat_profile', '__auto_repeater', '__observed_clip_slot',
+                 '__observed_clip', '__observing_session', '__tick_task')
+
     def __init__(self, main_script):
         P1NanoTGEComponent.__init__(self, main_script)
         self.__forward_button_down = False
-        self.____rewind_button_down = False
+        self.__rewind_button_down = False
         self.__zoom_button_down = False
         self.__scrub_button_down = False
-        self.__cursor_left_is_down = False
-        self.__cursor_right_is_down = False
-        self.__cursor_up_is_down = False
-        self.__cursor_down_is_down = False
-        self.__cursor_repeat_delay = 0
-        self.__transport_repeat_delay = 0
-        self.____fast_forward_counter = 0
-        self.__fast___rewind_counter = 0
+        self.__loop_button_down = False
+        self.__punch_in_button_down = False
+        self.__punch_out_button_down = False
+        self.__loop_nudged = False
         self.__jog_step_count_forward = 0
         self.__jog_step_count_backwards = 0
         self.__last_focussed_clip_play_state = CLIP_STATE_INVALID
+        self.__transport_repeat_profile = AutoRepeatProfile(
+            TRANSPORT_REPEAT_DELAY, TRANSPORT_REPEAT_INTERVAL,
+            step_acceleration=TRANSPORT_REPEAT_STEP_ACCELERATION)
+        cursor_repeat_profile = AutoRepeatProfile(
+            CURSOR_REPEAT_DELAY, CURSOR_REPEAT_INTERVAL, CURSOR_REPEAT_MIN_INTERVAL,
+            rate_acceleration=CURSOR_REPEAT_ACCELERATION)
+        self.__auto_repeater = AutoRepeater(AUTO_REPEAT_MAX_CATCH_UP,
+                                            clock=main_script.clock)
+        self.__auto_repeater.add_button(SID_TRANSPORT_FAST_FORWARD,
+                                        self.__transport_repeat_profile,
+                                        self.__repeat_fast_forward)
+        self.__auto_repeater.add_button(SID_TRANSPORT_REWIND,
+                                        self.__transport_repeat_profile,
+                                        self.__repeat_rewind)
+        self.__auto_repeater.add_button(SID_JOG_CURSOR_UP, cursor_repeat_profile,
+                                        lambda held_time: self.__on_cursor_up_pressed())
+        self.__auto_repeater.add_button(SID_JOG_CURSOR_DOWN, cursor_repeat_profile,
+                                        lambda held_time: self.__on_cursor_down_pressed())
+        self.__auto_repeater.add_button(SID_JOG_CURSOR_LEFT, cursor_repeat_profile,
+                                        lambda held_time: self.__on_cursor_left_pressed())
+        self.__auto_repeater.add_button(SID_JOG_CURSOR_RIGHT, cursor_repeat_profile,
+                                        lambda held_time: self.__on_cursor_right_pressed())
+        self.__observed_clip_slot = None
+        self.__observed_clip = None
+        self.__observing_session = False
+        self.__tick_task = self.add_tick_task(self.on_update_display_timer)
         self.song().add_record_mode_listener(self.__update_record_button_led)
         self.song().add_is_playing_listener(self.__update_play_button_led)
         self.song().add_loop_listener(self.__update_loop_button_led)
@@ -32,6 +64,9 @@ class Transport(P1NanoTGEComponent):
         self.song().add_can_jump_to_prev_cue_listener(self.__update_prev_cue_button_led)
         self.song().add_can_jump_to_next_cue_listener(self.__update_next_cue_button_led)
         self.application().view.add_is_view_visible_listener('Session', self.__on_session_is_visible_changed)
+        self.song().view.add_selected_track_listener(self.__on_highlighted_clip_slot_changed)
+        self.song().view.add_selected_scene_listener(self.__on_highlighted_clip_slot_changed)
+        self.__observe_highlighted_clip_slot()
         self.refresh_state()
 
     def destroy(self):
@@ -43,6 +78,9 @@ class Transport(P1NanoTGEComponent):
         self.song().remove_can_jump_to_prev_cue_listener(self.__update_prev_cue_button_led)
         self.song().remove_can_jump_to_next_cue_listener(self.__update_next_cue_button_led)
         self.application().view.remove_is_view_visible_listener('Session', self.__on_session_is_visible_changed)
+        self.song().view.remove_selected_track_listener(self.__on_highlighted_clip_slot_changed)
+        self.song().view.remove_selected_scene_listener(self.__on_highlighted_clip_slot_changed)
+        self.__stop_observing_clip_slot()
         for note in transport_control_switch_ids:
             self.send_midi((NOTE_ON_STATUS, note, BUTTON_STATE_OFF))
         for note in jog_wheel_switch_ids:
@@ -60,17 +98,14 @@ class Transport(P1NanoTGEComponent):
         self.__update_punch_in_button_led()
         self.__update_punch_out_button_led()
         self.__forward_button_down = False
-        self.____rewind_button_down = False
+        self.__rewind_button_down = False
         self.__zoom_button_down = False
         self.__scrub_button_down = False
-        self.__cursor_left_is_down = False
-        self.__cursor_right_is_down = False
-        self.__cursor_up_is_down = False
-        self.__cursor_down_is_down = False
-        self.__cursor_repeat_delay = 0
-        self.__transport_repeat_delay = 0
-        self.____fast_forward_counter = 0
-        self.__fast___rewind_counter = 0
+        self.__loop_button_down = False
+        self.__punch_in_button_down = False
+        self.__punch_out_button_down = False
+        self.__loop_nudged = False
+        self.__auto_repeater.release_all()
         self.__jog_step_count_forward = 0
         self.__jog_step_count_backwards = 0
         self.__last_focussed_clip_play_state = CLIP_STATE_INVALID
@@ -88,44 +123,29 @@ class Transport(P1NanoTGEComponent):
         return self.song().view.highlighted_clip_slot
 
     def on_update_display_timer(self):
-        
-        if self.__transport_repeat_delay > 2:
-            if self.alt_is_pressed():
-                base_acceleration = 1
-            else:
-                base_acceleration = self.song().signature_numerator
-            if self.song().is_playing:
-                base_acceleration *= 4
-            if not (self.__forward_button_down and self.____rewind_button_down):
-                if self.__forward_button_down:
-                    self.____fast_forward_counter += 1
-                    self.__fast___rewind_counter -= 4
-                    if not self.alt_is_pressed():
-                        self.__fast_forward(base_acceleration + max(1, self.____fast_forward_counter//4))
-                    else:
-                        self.__fast_forward(base_acceleration)
-                if self.____rewind_button_down:
-                    self.__fast___rewind_counter += 1
-                    self.____fast_forward_counter -= 4
-                    if not self.alt_is_pressed():
-                        self.__rewind(base_acceleration + max(1, self.__fast___rewind_counter//4))
-                    else:
-                        self.__rewind(base_acceleration)
+        """ Only awake while a button that auto-repeats is held """
+        self.__auto_repeater.update()
+        if not self.__auto_repeater.any_pressed():
+            self.__tick_task.sleep()
+
+    def __transport_repeat_beats(self, held_time):
+        if self.alt_is_pressed():
+            base_acceleration = 1
         else:
-            self.__transport_repeat_delay += 1
-        if self.__cursor_repeat_delay > 2:
-            if self.__cursor_left_is_down:
-                self.__on_cursor_left_pressed()
-            if self.__cursor_right_is_down:
-                self.__on_cursor_right_pressed()
-            if self.__cursor_up_is_down:
-                self.__on_cursor_up_pressed()
-            if self.__cursor_down_is_down:
-                self.__on_cursor_down_pressed()
-        else:
-            self.__cursor_repeat_delay += 1
-        if self.session_is_visible():
-            self.__update_zoom_led_in_session()
+            base_acceleration = self.song().signature_numerator
+        if self.song().is_playing:
+            base_acceleration *= 4
+        if self.alt_is_pressed():
+            return base_acceleration
+        return base_acceleration + self.__transport_repeat_profile.steps_at(held_time)
+
+    def __repeat_fast_forward(self, held_time):
+        if not self.__rewind_button_down:
+            self.__fast_forward(self.__transport_repeat_beats(held_time))
+
+    def __repeat_rewind(self, held_time):
+        if not self.__forward_button_down:
+            self.__rewind(self.__transport_repeat_beats(held_time))
 
     def handle_marker_switch_ids(self, switch_id, value):
         if switch_id == SID_MARKER_FROM_PREV:
@@ -135,22 +155,32 @@ class Transport(P1NanoTGEComponent):
             if value == BUTTON_PRESSED:
                 self.__jump_to_next_cue()
         elif switch_id == SID_MARKER_LOOP:
+            # toggles on release, turning the jog wheel while it is held moves the loop
             if value == BUTTON_PRESSED:
-                self.__toggle_loop()
+                self.__loop_button_down = True
+                self.__loop_nudged = False
+            elif value == BUTTON_RELEASED and self.__loop_button_down:
+                self.__loop_button_down = False
+                if not self.__loop_nudged:
+                    self.__toggle_loop()
         elif switch_id == SID_MARKER_PI:
             if value == BUTTON_PRESSED:
                 if self.control_is_pressed():
                     self.__toggle_punch_in()
                 else:
+                    self.__punch_in_button_down = True
                     self.__set_loopstart_from_cur_position()
-
+            elif value == BUTTON_RELEASED:
+                self.__punch_in_button_down = False
         elif switch_id == SID_MARKER_PO:
             if value == BUTTON_PRESSED:
                 if self.control_is_pressed():
                     self.__toggle_punch_out()
                 else:
+                    self.__punch_out_button_down = True
                     self.__set_loopend_from_cur_position()
-
+            elif value == BUTTON_RELEASED:
+                self.__punch_out_button_down = False
         elif switch_id == SID_MARKER_HOME:
             if value == BUTTON_PRESSED:
                 self.__goto_home()
@@ -162,18 +192,22 @@ class Transport(P1NanoTGEComponent):
         if switch_id == SID_TRANSPORT_REWIND:
             if value == BUTTON_PRESSED:
                 self.__rewind()
-                self.____rewind_button_down = True
+                self.__rewind_button_down = True
+                self.__auto_repeater.press(switch_id)
+                self.__tick_task.wake()
             elif value == BUTTON_RELEASED:
-                self.____rewind_button_down = False
-                self.__fast___rewind_counter = 0
+                self.__rewind_button_down = False
+                self.__auto_repeater.release(switch_id)
             self.__update_forward_rewind_leds()
         elif switch_id == SID_TRANSPORT_FAST_FORWARD:
             if value == BUTTON_PRESSED:
                 self.__fast_forward()
                 self.__forward_button_down = True
+                self.__auto_repeater.press(switch_id)
+                self.__tick_task.wake()
             elif value == BUTTON_RELEASED:
                 self.__forward_button_down = False
-                self.____fast_forward_counter = 0
+                self.__auto_repeater.release(switch_id)
             self.__update_forward_rewind_leds()
         elif switch_id == SID_TRANSPORT_STOP:
             if value == BUTTON_PRESSED:
@@ -199,7 +233,10 @@ class Transport(P1NanoTGEComponent):
 
     def handle_jog_wheel_rotation(self, value):
         backwards = value >= 64
-        if self.control_is_pressed():
+        if self.__loop_button_down or self.__punch_in_button_down or \
+                self.__punch_out_button_down:
+            self.__nudge_loop(-(value - 64) if backwards else value)
+        elif self.control_is_pressed():
             if self.alt_is_pressed():
                 step = 0.1
             else:
@@ -250,32 +287,32 @@ class Transport(P1NanoTGEComponent):
     def handle_jog_wheel_switch_ids(self, switch_id, value):
         if switch_id == SID_JOG_CURSOR_UP:
             if value == BUTTON_PRESSED:
-                self.__cursor_up_is_down = True
-                self.__cursor_repeat_delay = 0
+                self.__auto_repeater.press(switch_id)
+                self.__tick_task.wake()
                 self.__on_cursor_up_pressed()
             elif value == BUTTON_RELEASED:
-                self.__cursor_up_is_down = False
+                self.__auto_repeater.release(switch_id)
         elif switch_id == SID_JOG_CURSOR_DOWN:
             if value == BUTTON_PRESSED:
-                self.__cursor_down_is_down = True
-                self.__cursor_repeat_delay = 0
+                self.__auto_repeater.press(switch_id)
+                self.__tick_task.wake()
                 self.__on_cursor_down_pressed()
             elif value == BUTTON_RELEASED:
-                self.__cursor_down_is_down = False
+                self.__auto_repeater.release(switch_id)
         elif switch_id == SID_JOG_CURSOR_LEFT:
             if value == BUTTON_PRESSED:
-                self.__cursor_left_is_down = True
-                self.__cursor_repeat_delay = 0
+                self.__auto_repeater.press(switch_id)
+                self.__tick_task.wake()
                 self.__on_cursor_left_pressed()
             elif value == BUTTON_RELEASED:
-                self.__cursor_left_is_down = False
+                self.__auto_repeater.release(switch_id)
         elif switch_id == SID_JOG_CURSOR_RIGHT:
             if value == BUTTON_PRESSED:
-                self.__cursor_right_is_down = True
-                self.__cursor_repeat_delay = 0
+                self.__auto_repeater.press(switch_id)
+                self.__tick_task.wake()
                 self.__on_cursor_right_pressed()
             elif value == BUTTON_RELEASED:
-                self.__cursor_right_is_down = False
+                self.__auto_repeater.release(switch_id)
         elif switch_id == SID_JOG_ZOOM:
             if value == BUTTON_PRESSED:
                 if self.session_is_visible():
@@ -292,7 +329,7 @@ class Transport(P1NanoTGEComponent):
         elif switch_id == SID_JOG_SCRUB:
             if value == BUTTON_PRESSED:
                 if self.arrangement_is_visible():
-                    self.song().view.selected_track.view.is_collapsed = not self.song().view.selected_track.view.is_collapsed
+                    self.selected_track().view.is_collapsed = not self.selected_track().view.is_collapsed
                 if self.session_is_visible():
                     if self.option_is_pressed():
                         self.song().stop_all_clips()
@@ -376,47 +413,33 @@ class Transport(P1NanoTGEComponent):
     def __jump_to_next_cue(self):
         self.song().jump_to_next_cue()
 
-    def __set_loopstart_from_cur_position(self):
-        if self.song().current_song_time != self.song().loop_start:
-            loop_length = self.song().loop_length
-            loop_start = self.song().loop_start
-            loop_end = loop_start + loop_length
-            current_song_time = self.song().current_song_time
-            if current_song_time < loop_start:
-                target_loop_length = loop_end - current_song_time
-                while self.song().loop_length < target_loop_length:
-                    self.song().loop_length = min(target_loop_length,self.song().song_length-loop_start)
-                self.song().loop_length = target_loop_length
-                self.song().loop_start = current_song_time
-            elif loop_start < current_song_time < loop_end:
-                target_loop_start = current_song_time
-                while self.song().loop_start < target_loop_start:
-                    self.song().loop_start = min(target_loop_start, self.song().song_length - loop_length)
-                self.song().loop_length = loop_end - current_song_time
-                self.song().loop_start = current_song_time
-            elif current_song_time > loop_end:
-                loop_length = current_song_time - loop_end
-                self.song().loop_length = loop_length
-                self.song().loop_start = loop_end
-
-
+    def __edit_loop(self, edit, position):
+        """ Applies 'edit' (see LoopRegion) at a cursor position or by a number of beats """
+        song = self.song()
+        start = song.loop_start
+        length = song.loop_length
+        write_region(song, start, length, edit(position, start, length, song.song_length))
 
+    def __set_loopstart_from_cur_position(self):
+        self.__edit_loop(region_with_start, self.song().current_song_time)
 
     def __set_loopend_from_cur_position(self):
-        if self.song().current_song_time != self.song().loop_start + self.song().loop_length:
-            loop_length = self.song().loop_length
-            loop_start = self.song().loop_start
-            loop_end = loop_start + loop_length
-            current_song_time = self.song().current_song_time
-            if current_song_time < loop_start:
-                loop_length = loop_start - current_song_time
-                self.song().loop_start = current_song_time
-                self.song().loop_length = loop_length
-            elif loop_start < current_song_time < loop_end:
-                self.song().loop_length =  current_song_time - loop_start
-            elif current_song_time > loop_end:
-                loop_length += current_song_time - loop_end
-                self.song().loop_length = loop_length
+        self.__edit_loop(region_with_end, self.song().current_song_time)
+
+    def __nudge_loop(self, amount):
+        """
+            Moves the loop by 'amount' bars (beats with Alt): the whole loop
+            while Loop is held, its start while Punch In is held and its end
+            while Punch Out is held.
+        """
+        beats = amount * (1 if self.alt_is_pressed() else self.song().signature_numerator)
+        if self.__loop_button_down:
+            self.__loop_nudged = True
+            self.__edit_loop(moved_region, beats)
+        elif self.__punch_in_button_down:
+            self.__edit_loop(moved_start, beats)
+        else:
+            self.__edit_loop(moved_end, beats)
 
     def __goto_home(self):
         self.song().current_song_time = 0
@@ -426,16 +449,70 @@ class Transport(P1NanoTGEComponent):
 
     def __on_session_is_visible_changed(self):
         self.__last_focussed_clip_play_state = CLIP_STATE_INVALID
+        self.__observe_highlighted_clip_slot()
         self.__update_zoom_button_led()
         self.__update_scrub_button_led()
 
-    def __update_zoom_led_in_session(self):
-        if self.session_is_visible():
+    def __on_highlighted_clip_slot_changed(self):
+        """
+            The view has no listener for 'highlighted_clip_slot', but it is the
+            slot of the selected track in the selected scene.
+        """
+        if self.__observing_session:
+            self.__observe_highlighted_clip_slot()
+
+    def __observe_highlighted_clip_slot(self):
+        """
+            While the Session is visible, the zoom LED shows the state of the
+            highlighted clip. Listen to its slot (and clip) instead of polling them.
+        """
+        self.__stop_observing_clip_slot()
+        self.__observing_session = self.session_is_visible()
+        if self.__observing_session:
             clip_slot = self.selected_clip_slot()
-            if clip_slot and clip_slot.clip:
-                if clip_slot.clip.is_triggered:
+            if clip_slot:
+                self.__observed_clip_slot = clip_slot
+                clip_slot.add_has_clip_listener(self.__on_observed_clip_changed)
+                clip_slot.add_playing_status_listener(self.__update_zoom_led_in_session)
+                self.__observe_clip()
+        self.__update_zoom_led_in_session()
+
+    def __observe_clip(self):
+        clip_slot = self.__observed_clip_slot
+        if clip_slot and clip_slot.has_clip:
+            self.__observed_clip = clip_slot.clip
+            self.__observed_clip.add_playing_status_listener(self.__update_zoom_led_in_session)
+
+    def __stop_observing_clip(self):
+        clip = self.__observed_clip
+        self.__observed_clip = None
+        if liveobj_valid(clip):
+            self.__remove_listener(clip, 'playing_status', self.__update_zoom_led_in_session)
+
+    def __stop_observing_clip_slot(self):
+        self.__stop_observing_clip()
+        clip_slot = self.__observed_clip_slot
+        self.__observed_clip_slot = None
+        if liveobj_valid(clip_slot):
+            self.__remove_listener(clip_slot, 'has_clip', self.__on_observed_clip_changed)
+            self.__remove_listener(clip_slot, 'playing_status', self.__update_zoom_led_in_session)
+
+    def __on_observed_clip_changed(self):
+        self.__stop_observing_clip()
+        self.__observe_clip()
+        self.__update_zoom_led_in_session()
+
+    def __remove_listener(self, object, property, listener):
+        if getattr(object, u'{}_has_listener'.format(property))(listener):
+            getattr(object, u'remove_{}_listener'.format(property))(listener)
+
+    def __update_zoom_led_in_session(self):
+        clip = self.__observed_clip
+        if self.__observing_session:
+            if liveobj_valid(clip):
+                if clip.is_triggered:
                     state = CLIP_TRIGGERED
-                elif clip_slot.clip.is_playing:
+                elif clip.is_playing:
                     state = CLIP_PLAYING
                 else:
                     state = CLIP_STOPPED
@@ -453,12 +530,10 @@ class Transport(P1NanoTGEComponent):
     def __update_forward_rewind_leds(self):
         if self.__forward_button_down:
             self.send_midi((NOTE_ON_STATUS, SID_TRANSPORT_FAST_FORWARD, BUTTON_STATE_ON))
-            self.__transport_repeat_delay = 0
         else:
             self.send_midi((NOTE_ON_STATUS, SID_TRANSPORT_FAST_FORWARD, BUTTON_STATE_OFF))
-        if self.____rewind_button_down:
+        if self.__rewind_button_down:
             self.send_midi((NOTE_ON_STATUS, SID_TRANSPORT_REWIND, BUTTON_STATE_ON))
-            self.__transport_repeat_delay = 0
         else:
             self.send_midi((NOTE_ON_STATUS, SID_TRANSPORT_REWIND, BUTTON_STATE_OFF))
 
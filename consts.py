@@ -17,6 +17,9 @@ SELECT_SMPTE_NOTE = 113
 SELECT_BEATS_NOTE = 114
 SELECT_RUDE_SOLO = 115
 FID_PANNING_BASE = 16
+# channel of the v-pot mappings that are only there for the LED ring feedback
+# (the controller sends nothing on it, the turns go to the script)
+VPOT_FEEDBACK_ONLY_CHANNEL = 15
 JOG_WHEEL_CC_NO = 60
 VPOT_DISPLAY_SINGLE_DOT = 0
 VPOT_DISPLAY_BOOST_CUT = 1
@@ -40,6 +43,17 @@ CLIP_STATE_INVALID = (-1)
 CLIP_STOPPED = 0
 CLIP_TRIGGERED = 1
 CLIP_PLAYING = 2
+TICKS_PER_SECOND = 10
+UNDO_REDO_POLL_MIN_INTERVAL = 1
+UNDO_REDO_POLL_MAX_INTERVAL = 2 * TICKS_PER_SECOND
+AUTO_REPEAT_MAX_CATCH_UP = 4
+CURSOR_REPEAT_DELAY = 0.3
+CURSOR_REPEAT_INTERVAL = 0.1
+CURSOR_REPEAT_MIN_INTERVAL = 0.03
+CURSOR_REPEAT_ACCELERATION = 1.0
+TRANSPORT_REPEAT_DELAY = 0.3
+TRANSPORT_REPEAT_INTERVAL = 0.1
+TRANSPORT_REPEAT_STEP_ACCELERATION = 2.5
 g7_seg_led_conv_table = {' ': 61, 'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6,
                          'G': 7, 'H': 8, 'I': 9, 'J': 10, 'K': 11, 'L': 12,
                          'M': 13, 'N': 14, 'O': 15, 'P': 16, 'Q': 17, 'R': 18,
@@ -206,3 +220,16 @@ SID_FADER_TOUCH_SENSE_MASTER = 112
 fader_touch_switch_ids = list(
     range(SID_FADER_TOUCH_SENSE_CH1, SID_FADER_TOUCH_SENSE_MASTER + 1))
 SID_LAST = 112
+# (name, switch ids) of the handler groups of the MIDI dispatch in P1NanoTGE.
+# A switch id in several groups belongs to the last one, like in the dispatch.
+switch_id_groups = (('channel strip', channel_strip_switch_ids + fader_touch_switch_ids),
+                    ('assignment', channel_strip_assignment_switch_ids),
+                    ('strip control', channel_strip_control_switch_ids),
+                    ('function key', function_key_control_switch_ids),
+                    ('software controls', software_controls_switch_ids),
+                    ('transport', transport_control_switch_ids),
+                    ('marker', marker_control_switch_ids),
+                    ('jog buttons', jog_wheel_switch_ids),
+                    ('foot switch', user_foot_switch_ids),
+                    ('select', range(SID_SELECT_BASE, SID_SELECT_BASE + NUM_CHANNEL_STRIPS)),
+                    ('display', display_switch_ids))
@@ -1,3 +1,66 @@
 #Encoder sensitivity as a multiplier. 1.0 is default sensitivity.
 encoder_sensitivity = 4.0
-auto_arm_on_track_select_on_by_default = True
\ No newline at end of file
+#Encoder speed per kind of parameter, for the kinds not listed here
+#encoder_sensitivity is used. 'sensitivity' is a multiplier like
+#encoder_sensitivity, 'acceleration' makes fast turns go further: the encoder
+#reports how many steps it turned since the last message, n steps move
+#n * (1 + acceleration * (n - 1)) times as far as one (0.0 = no acceleration).
+#Kinds: 'pan', 'send', 'quantized' (parameters with a list of values, one value
+#per step at sensitivity 1.0), 'continuous' (all other parameters), the class
+#name of a device ('AutoFilter', see Live's _Generic/Devices.py) or one
+#parameter of a device class ('AutoFilter:Frequency'). A parameter of a device
+#class wins over the class, the class over 'quantized' and 'continuous'.
+#Without acceleration Live moves the parameter itself. An accelerated v-pot is
+#moved by the script instead: every encoder message is a call into the script,
+#a parameter change and an undo step, so only use it where it pays off.
+#E.g.
+#encoder_profiles = {
+#    'pan': {'sensitivity': 2.0},
+#    'quantized': {'sensitivity': 1.0},
+#    'send': {'acceleration': 0.5},
+#    'AutoFilter:Frequency': {'acceleration': 1.0},
+#}
+encoder_profiles = {}
+auto_arm_on_track_select_on_by_default = True
+#Time in milliseconds a display update may take before display repaints and
+#LED refreshes are pushed to the next update.
+update_display_time_budget_ms = 8.0
+#Measure how long every component takes and write display updates slower than
+#tick_profiler_slow_tick_ms (in milliseconds) to Live's Log.txt. A summary is
+#written when the script is unloaded. Costs a little CPU, so off by default.
+tick_profiler_enabled = False
+tick_profiler_slow_tick_ms = 20.0
+#Count the MIDI messages the script sends to the controller per component and
+#message type. The rates are written to Live's Log.txt every
+#midi_traffic_report_interval_s seconds (0 = never), when F4 is pressed and
+#when the script is unloaded.
+midi_traffic_monitor_enabled = False
+midi_traffic_report_interval_s = 60
+#Measure the time from a button press or encoder turn until the controller gets
+#the first and the last MIDI message caused by it, per control type. Presses
+#whose feedback takes longer than latency_tracing_slow_event_ms (in
+#milliseconds) to finish are written to Live's Log.txt, a summary when F5 is
+#pressed and when the script is unloaded.
+latency_tracing_enabled = False
+latency_tracing_slow_event_ms = 50.0
+#Record all MIDI the script receives and sends, the values of the parameters
+#of the faders and v-pots plus Live's calls into a binary log
+#(P1NanoTGE_session_<date>_<time>.p1ns in session_recording_directory, the
+#home directory when empty). 'tools/replay.py' replays it without Live.
+session_recording_enabled = False
+session_recording_directory = ''
+#Collect the LED, display and fader state of the startup (and of every refresh
+#Live asks for) in one table and send it once the controller answered the
+#firmware request, at most startup_sync_bytes_per_tick bytes per display update.
+#Without an answer the state is sent after startup_sync_handshake_timeout_ticks
+#display updates (10 per second).
+staged_startup_enabled = True
+startup_sync_bytes_per_tick = 512
+startup_sync_handshake_timeout_ticks = 30
+#settings.py is read again when it was saved while the script runs, checked
+#every settings_watch_interval_s seconds (0 = only read when the script is
+#loaded). Encoder settings and update_display_time_budget_ms are used right
+#away, the staged startup settings from the next refresh, all others (the
+#diagnostics and auto_arm_on_track_select_on_by_default) when the script is
+#loaded again.
+settings_watch_interval_s = 1.0
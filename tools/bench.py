@@ -0,0 +1,265 @@
+"""
+    Scenario benchmarks for the script, run against the Live stand-in.
+
+    Every scenario builds its own set, starts the script, then drives
+    receive_midi, update_display and build_midi_map the way Live would while
+    timing every call. The report holds p50/p99/max per entry point and the
+    MIDI traffic sent to the controller, and is written as JSON so runs can be
+    compared:
+
+        python bench.py --out before.json
+        python bench.py --out after.json --compare before.json
+
+    '--compare' exits with 1 when a p99 got slower than '--tolerance' times the
+    old one (and by more than '--min-delta-us', to ignore timer noise on tiny
+    calls), or when a scenario sends more MIDI bytes than before.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from harness import SCRIPT_DIR, ScriptHarness, build_song, pin_default_settings
+from setgen import generate_set
+
+ENTRY_POINTS = ('receive_midi', 'update_display', 'build_midi_map')
+
+
+def jog_scroll_500_tracks(scale, rng):
+    """ Cursor up/down held through a 500 track set, jog wheel spinning along """
+    harness = ScriptHarness(build_song(num_tracks=500, num_scenes=8))
+    harness.start()
+    harness.tick(5)
+    c = harness.consts()
+    harness.record_timings()
+    for direction in (c.SID_JOG_CURSOR_DOWN, c.SID_JOG_CURSOR_UP):
+        for _ in range(int(500 * scale)):
+            harness.click(direction)
+            harness.turn_jog_wheel(rng.choice((1, 2, 3, -1, -2)))
+            if rng.random() < 0.5:
+                harness.tick()
+    harness.tick(10)
+    return harness
+
+
+def select_button_hammering(scale, rng):
+    """ All eight select buttons pressed as fast as fingers go """
+    harness = ScriptHarness(build_song(num_tracks=64, devices_per_track=2))
+    harness.start()
+    harness.tick(5)
+    c = harness.consts()
+    harness.record_timings()
+    for _ in range(int(2000 * scale)):
+        harness.click(c.SID_SELECT_BASE + rng.randrange(c.NUM_CHANNEL_STRIPS))
+        if rng.random() < 0.25:
+            harness.tick()
+    harness.tick(10)
+    return harness
+
+
+def encoders_spinning_multi_tge(scale, rng):
+    """ All eight encoders turned at once in the TGE mode """
+    harness = ScriptHarness(build_song(num_tracks=32, num_returns=4,
+                                       devices_per_track=3))
+    harness.start()
+    harness.tick(5)
+    c = harness.consts()
+    harness.record_timings()
+    for _ in range(int(600 * scale)):
+        for strip in range(c.NUM_CHANNEL_STRIPS):
+            harness.turn_vpot(strip, rng.choice((1, 2, 4, -1, -3)))
+        harness.tick()
+    harness.tick(10)
+    return harness
+
+
+def track_add_delete_storm(scale, rng):
+    """ Tracks created and deleted in bursts, like undoing a big paste """
+    song = build_song(num_tracks=32)
+    harness = ScriptHarness(song)
+    harness.start()
+    harness.tick(5)
+    harness.record_timings()
+    for _ in range(int(60 * scale)):
+        for _ in range(rng.randint(1, 12)):
+            song.add_track(index=rng.randrange(len(song.tracks) + 1))
+        harness.tick()
+        for _ in range(rng.randint(1, 12)):
+            if len(song.tracks) > 8:
+                song.delete_track(rng.randrange(len(song.tracks)))
+        harness.tick()
+    harness.tick(10)
+    return harness
+
+
+def playback_with_meters(scale, rng):
+    """ Ten minutes of playback in the volume/pan mode with meters running """
+    song = build_song(num_tracks=24)
+    harness = ScriptHarness(song)
+    harness.start()
+    c = harness.consts()
+    harness.click(c.SID_ASSIGNMENT_PAN)
+    harness.tick(5)
+    harness.record_timings()
+    harness.click(c.SID_TRANSPORT_PLAY)
+    levels = [rng.random() for _ in song.tracks]
+    for _ in range(int(6000 * scale)):
+        for i, track in enumerate(song.tracks):
+            levels[i] = min(1.0, max(0.0, levels[i] + rng.uniform(-0.1, 0.1)))
+            track.set_meter(levels[i])
+        harness.tick()
+    harness.click(c.SID_TRANSPORT_STOP)
+    harness.tick(10)
+    return harness
+
+
+def huge_set_navigation(scale, rng):
+    """ Navigating a generated 1000 track set while groups fold and unfold """
+    song = generate_set(seed=rng.getrandbits(32), preset='huge')
+    harness = ScriptHarness(song)
+    harness.start()
+    harness.tick(5)
+    c = harness.consts()
+    groups = [t for t in song.tracks if t.is_foldable]
+    harness.record_timings()
+    for _ in range(int(500 * scale)):
+        harness.click(rng.choice((c.SID_JOG_CURSOR_DOWN, c.SID_JOG_CURSOR_UP,
+                                  c.SID_FADERBANK_NEXT_BANK, c.SID_FADERBANK_PREV_BANK,
+                                  c.SID_SELECT_BASE + rng.randrange(c.NUM_CHANNEL_STRIPS))))
+        if rng.random() < 0.05:
+            group = rng.choice(groups)
+            group.fold_state = not group.fold_state
+        harness.tick()
+    harness.click(c.SID_ASSIGNMENT_PLUG_INS)
+    harness.tick()
+    for _ in range(int(50 * scale)):
+        harness.click(c.SID_VPOD_PUSH_BASE + rng.randrange(c.NUM_CHANNEL_STRIPS))
+        harness.tick()
+        harness.click(c.SID_ASSIGNMENT_DYNAMIC)
+        harness.tick()
+        harness.click(c.SID_JOG_CURSOR_DOWN)
+        harness.tick()
+    harness.tick(10)
+    return harness
+
+
+SCENARIOS = {'jog_scroll_500_tracks': jog_scroll_500_tracks,
+             'select_button_hammering': select_button_hammering,
+             'encoders_spinning_multi_tge': encoders_spinning_multi_tge,
+             'track_add_delete_storm': track_add_delete_storm,
+             'playback_with_meters': playback_with_meters,
+             'huge_set_navigation': huge_set_navigation}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize_timings(durations):
+    values = sorted(durations)
+    to_us = 1000000.0
+    return {'calls': len(values),
+            'p50_us': round(percentile(values, 0.5) * to_us, 2),
+            'p99_us': round(percentile(values, 0.99) * to_us, 2),
+            'max_us': round(values[-1] * to_us, 2) if values else 0.0,
+            'total_ms': round(sum(values) * 1000.0, 3)}
+
+
+def run_scenario(name, scale, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    harness = SCENARIOS[name](scale, rng)
+    wall_time = time.perf_counter() - start
+    sent = harness.c_instance.take_sent_midi()
+    harness.close()
+    result = {'wall_time_s': round(wall_time, 3),
+              'ticks': harness.ticks,
+              'midi_messages': len(sent),
+              'midi_bytes': sum(len(m) for m in sent)}
+    for entry_point in ENTRY_POINTS:
+        result[entry_point] = summarize_timings(harness.timings[entry_point])
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=SCRIPT_DIR, stderr=subprocess.DEVNULL
+                                       ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_report, new_report, tolerance, min_delta_us):
+    regressions = []
+    for name, new in new_report['scenarios'].items():
+        old = old_report.get('scenarios', {}).get(name)
+        if old is None:
+            continue
+        for entry_point in ENTRY_POINTS:
+            old_p99 = old[entry_point]['p99_us']
+            new_p99 = new[entry_point]['p99_us']
+            ratio = new_p99 / old_p99 if old_p99 else 1.0
+            print('{:32} {:15} p99 {:10.1f} -> {:10.1f} us ({:+.0%})'.format(
+                name, entry_point, old_p99, new_p99, ratio - 1.0))
+            if ratio > tolerance and new_p99 - old_p99 > min_delta_us:
+                regressions.append('{} {} p99'.format(name, entry_point))
+        if new['midi_bytes'] > old['midi_bytes']:
+            regressions.append('{} midi bytes {} -> {}'.format(
+                name, old['midi_bytes'], new['midi_bytes']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='run only this scenario (repeatable)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiplies the length of every scenario')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--compare', metavar='OLD_JSON')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='allowed p99 slow down factor for --compare')
+    parser.add_argument('--min-delta-us', type=float, default=50.0,
+                        help='p99 differences below this are never regressions')
+    args = parser.parse_args(argv)
+    pin_default_settings()
+
+    report = {'revision': git_revision(),
+              'python': platform.python_version(),
+              'platform': platform.platform(),
+              'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'scale': args.scale,
+              'seed': args.seed,
+              'scenarios': {}}
+    for name in args.scenario or sorted(SCENARIOS):
+        result = run_scenario(name, args.scale, args.seed)
+        report['scenarios'][name] = result
+        print('{:32} {:6d} msgs {:8d} bytes  '.format(
+            name, result['midi_messages'], result['midi_bytes']) + '  '.join(
+            '{} p50 {:.0f}us p99 {:.0f}us'.format(e, result[e]['p50_us'], result[e]['p99_us'])
+            for e in ENTRY_POINTS))
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print('written to ' + os.path.abspath(args.out))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.tolerance,
+                                  args.min_delta_us)
+        if regressions:
+            print('REGRESSIONS:\n  ' + '\n  '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
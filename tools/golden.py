@@ -0,0 +1,269 @@
+"""
+    Golden output checks: fixed interaction scripts run against the script on
+    the Live stand-in, and the exact MIDI it sends is compared with the
+    snapshots in 'tools/golden'.
+
+        python golden.py             check all scenarios
+        python golden.py --update    rewrite the snapshots after an intended change
+
+    Besides the exact stream, every scenario has an upper bound for the number
+    of messages and bytes it may send (BUDGETS). A change that reintroduces
+    redundant LED resends, full display rewrites or per tick sends fails here
+    even when the snapshots were updated along with it. Exits with 1 on any
+    difference or exceeded budget.
+
+    The tick scheduler's time budget is lifted while checking, so that no work
+    is deferred depending on how fast the machine is. The scenarios in
+    LIVE_FEEDBACK also get the feedback Live sends for mapped parameters (see
+    ScriptHarness), their snapshots have a line per v-pot mapping as well.
+"""
+import argparse
+import difflib
+import os
+import sys
+
+from harness import TOOLS_DIR, ScriptHarness, build_song, pin_default_settings
+
+GOLDEN_DIR = os.path.join(TOOLS_DIR, 'golden')
+
+# scenario: (max messages, max bytes)
+BUDGETS = {'startup': (150, 850),
+           'idle': (0, 0),
+           'select_track': (550, 2550),
+           'bank_navigation': (250, 1060),
+           'change_modes': (190, 1340),
+           'page_plugins': (60, 580),
+           'flip': (40, 400),
+           'toggle_meters': (110, 660),
+           'transport': (115, 350),
+           'hold_to_repeat': (2080, 8550),
+           'accelerated_vpots': (60, 520)}
+
+# scenarios run with the feedback Live sends for mapped parameters (see ScriptHarness)
+LIVE_FEEDBACK = ('accelerated_vpots',)
+
+
+class GoldenRun(object):
+    """ Drives one scenario and collects the output of every step """
+
+    def __init__(self, song, start=True, live_feedback=False):
+        self.harness = ScriptHarness(song, live_feedback=live_feedback)
+        self.c = self.harness.consts()
+        self.steps = []
+        if start:
+            self.start()
+            self.harness.c_instance.take_sent_midi()
+
+    def start(self):
+        self.harness.start()
+        self.harness.script.tick_scheduler().set_time_budget_ms(1000000.0)
+        self.harness.tick(40)
+
+    def step(self, label, action, *args, ticks=3):
+        """ Runs 'action(*args)' and 'ticks' display ticks, records what was sent """
+        action(*args)
+        self.harness.tick(ticks)
+        self.steps.append((label, self.harness.c_instance.take_sent_midi()))
+
+    def click(self, switch_id):
+        self.harness.click(switch_id)
+
+    def v_pot_mappings(self, label):
+        """ Records how the v-pots are mapped: the control, the parameter and its feedback """
+        lines = []
+        rules = dict(self.harness.midi_map.feedback_rules)
+        for parameter, kind, channel, cc_no, _, _ in self.harness.midi_map.parameter_mappings:
+            if kind == 'cc':
+                rule = rules[parameter]
+                lines.append('map cc {} ch {} to {!r}, feedback cc {} ch {}'.format(
+                    cc_no, channel + 1, parameter.name, rule.cc_no, rule.channel + 1))
+        self.steps.append((label, lines))
+
+
+def default_song():
+    return build_song(num_tracks=24, num_returns=2, num_scenes=8, devices_per_track=2)
+
+
+def startup(run):
+    """ Loading the script and the delayed second refresh """
+    run.step('create and refresh', run.start, ticks=0)
+
+
+def idle(run):
+    """ A stopped set left alone must not send anything """
+    run.step('100 idle ticks', lambda: None, ticks=100)
+
+
+def select_track(run):
+    for strip in (1, 2, 5, 0):
+        run.step('select strip {}'.format(strip + 1), run.click,
+                 run.c.SID_SELECT_BASE + strip)
+
+
+def bank_navigation(run):
+    c = run.c
+    run.step('pan mode', run.click, c.SID_ASSIGNMENT_PAN)
+    for label, switch_id in (('next bank', c.SID_FADERBANK_NEXT_BANK),
+                             ('next bank', c.SID_FADERBANK_NEXT_BANK),
+                             ('next channel', c.SID_FADERBANK_NEXT_CH),
+                             ('previous channel', c.SID_FADERBANK_PREV_CH),
+                             ('previous bank', c.SID_FADERBANK_PREV_BANK)):
+        run.step(label, run.click, switch_id)
+
+
+def change_modes(run):
+    c = run.c
+    for label, switch_id in (('io', c.SID_ASSIGNMENT_IO),
+                             ('sends', c.SID_ASSIGNMENT_SENDS),
+                             ('pan', c.SID_ASSIGNMENT_PAN),
+                             ('plug-ins', c.SID_ASSIGNMENT_PLUG_INS),
+                             ('multi track TGE', c.SID_SOFTWARE_F1)):
+        run.step(label, run.click, switch_id)
+
+
+def page_plugins(run):
+    c = run.c
+    run.step('plug-ins mode', run.click, c.SID_ASSIGNMENT_PLUG_INS)
+    run.step('choose first device', run.click, c.SID_VPOD_PUSH_BASE)
+    for label, switch_id in (('next page', c.SID_ASSIGNMENT_DYNAMIC),
+                             ('next page', c.SID_ASSIGNMENT_DYNAMIC),
+                             ('previous page', c.SID_ASSIGNMENT_EQ)):
+        run.step(label, run.click, switch_id)
+
+
+def flip(run):
+    c = run.c
+    run.step('pan mode', run.click, c.SID_ASSIGNMENT_PAN)
+    run.step('flip', run.click, c.SID_FADERBANK_FLIP)
+    run.step('flip back', run.click, c.SID_FADERBANK_FLIP)
+
+
+def toggle_meters(run):
+    c = run.c
+    song = run.harness.song
+    run.step('pan mode', run.click, c.SID_ASSIGNMENT_PAN)
+    for i, track in enumerate(song.tracks):
+        track.set_meter((i % 8) / 8.0)
+    run.step('meters on', run.click, c.SID_DISPLAY_NAME_VALUE, ticks=5)
+    run.step('meters off', run.click, c.SID_DISPLAY_NAME_VALUE)
+
+
+def transport(run):
+    c = run.c
+    run.step('play', run.click, c.SID_TRANSPORT_PLAY, ticks=10)
+    run.step('stop', run.click, c.SID_TRANSPORT_STOP)
+
+
+def hold_to_repeat(run):
+    """ Held buttons repeat on the harness clock, 100 ms per tick """
+    c = run.c
+    harness = run.harness
+    run.step('hold fast forward', harness.press, c.SID_TRANSPORT_FAST_FORWARD, ticks=15)
+    run.step('release fast forward', harness.release, c.SID_TRANSPORT_FAST_FORWARD)
+    run.step('hold cursor down', harness.press, c.SID_JOG_CURSOR_DOWN, ticks=15)
+    run.step('release cursor down', harness.release, c.SID_JOG_CURSOR_DOWN)
+
+
+def accelerated_vpots(run):
+    """
+        Pan with an accelerated profile: the v-pots are mapped on
+        VPOT_FEEDBACK_ONLY_CHANNEL, so their turns reach the script, which moves
+        the panning, and Live still sends the ring (channel 1, CC 48 + strip)
+    """
+    c = run.c
+    pin_default_settings(encoder_profiles={'pan': {'acceleration': 0.5}})
+    try:
+        run.start()
+    finally:
+        pin_default_settings()
+    run.harness.c_instance.take_sent_midi()
+    run.step('pan mode', run.click, c.SID_ASSIGNMENT_PAN)
+    run.v_pot_mappings('v-pot mappings')
+    run.step('turn v-pot 1 right slowly', run.harness.send, (0xB0, c.FID_PANNING_BASE, 1))
+    run.step('turn v-pot 1 right fast', run.harness.send, (0xB0, c.FID_PANNING_BASE, 5))
+    run.step('turn v-pot 3 left fast', run.harness.send, (0xB0, c.FID_PANNING_BASE + 2, 0x45))
+
+
+SCENARIOS = {'startup': (startup, False),
+             'idle': (idle, True),
+             'select_track': (select_track, True),
+             'bank_navigation': (bank_navigation, True),
+             'change_modes': (change_modes, True),
+             'page_plugins': (page_plugins, True),
+             'flip': (flip, True),
+             'toggle_meters': (toggle_meters, True),
+             'transport': (transport, True),
+             'hold_to_repeat': (hold_to_repeat, True),
+             'accelerated_vpots': (accelerated_vpots, False)}
+
+
+def run_scenario(name):
+    """ Returns the snapshot lines of scenario 'name' and its (messages, bytes) """
+    scenario, start = SCENARIOS[name]
+    run = GoldenRun(default_song(), start, live_feedback=name in LIVE_FEEDBACK)
+    scenario(run)
+    run.harness.close()
+    # the v-pot mapping lines are no messages
+    sent_midi = [[m for m in sent if not isinstance(m, str)] for _, sent in run.steps]
+    messages = sum(len(sent) for sent in sent_midi)
+    num_bytes = sum(len(m) for sent in sent_midi for m in sent)
+    lines = ['# {}: {} messages, {} bytes'.format(name, messages, num_bytes)]
+    for (label, sent), midi in zip(run.steps, sent_midi):
+        lines.append('== {} ({} messages)'.format(label, len(midi)))
+        lines.extend(m if isinstance(m, str) else ' '.join('{:02X}'.format(b) for b in m)
+                     for m in sent)
+    return lines, (messages, num_bytes)
+
+
+def snapshot_path(name):
+    return os.path.join(GOLDEN_DIR, name + '.txt')
+
+
+def check(name, update):
+    """ Returns a list of failures of scenario 'name' """
+    lines, (messages, num_bytes) = run_scenario(name)
+    failures = []
+    max_messages, max_bytes = BUDGETS[name]
+    if messages > max_messages or num_bytes > max_bytes:
+        failures.append('{}: {} messages / {} bytes, the budget is {} / {}'.format(
+            name, messages, num_bytes, max_messages, max_bytes))
+    path = snapshot_path(name)
+    if update:
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+    elif not os.path.exists(path):
+        failures.append('{}: no snapshot, run with --update'.format(name))
+    else:
+        with open(path) as f:
+            expected = f.read().splitlines()
+        if expected != lines:
+            diff = list(difflib.unified_diff(expected, lines, 'snapshot', 'now', lineterm=''))
+            failures.append('{}: output differs from {}\n{}'.format(
+                name, os.path.relpath(path), '\n'.join(diff[:60])))
+    print('{:17} {:5d} messages {:6d} bytes  {}'.format(
+        name, messages, num_bytes, 'FAILED' if failures else 'ok'))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='check only this scenario (repeatable)')
+    parser.add_argument('--update', action='store_true',
+                        help='rewrite the snapshots instead of comparing')
+    args = parser.parse_args(argv)
+    pin_default_settings()
+
+    if not os.path.isdir(GOLDEN_DIR):
+        os.makedirs(GOLDEN_DIR)
+    failures = []
+    for name in args.scenario or list(SCENARIOS):
+        failures.extend(check(name, args.update))
+    if failures:
+        print('\n'.join(failures))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""
+    Runs the P1NanoTGE script outside of Live.
+
+    The packages under 'tools/standin' take the place of 'Live', '_Framework',
+    '_Generic' and 'ableton' (only what the script touches), and 'FakeCInstance'
+    plays the part of the C instance Live hands to 'create_instance'. Everything
+    is synchronous and single threaded: 'ScriptHarness.tick' is one
+    'update_display' call, i.e. 100 ms of wall clock time in Live.
+
+        from harness import ScriptHarness, build_song
+        harness = ScriptHarness(build_song(num_tracks=16))
+        harness.start()
+        harness.press(SID_TRANSPORT_PLAY)
+        harness.tick(10)
+        harness.close()
+"""
+import importlib.util
+import os
+import sys
+from functools import partial
+from time import perf_counter
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_DIR = os.path.dirname(TOOLS_DIR)
+STANDIN_DIR = os.path.join(TOOLS_DIR, 'standin')
+SCRIPT_PACKAGE = 'P1NanoTGE_script'
+
+if STANDIN_DIR not in sys.path:
+    sys.path.insert(0, STANDIN_DIR)
+
+import Live  # noqa: E402  (the stand-in, see above)
+
+
+def load_script_package(name=SCRIPT_PACKAGE):
+    """
+        Imports the script directory as a package, the way Live imports it from
+        its 'MIDI Remote Scripts' folder. Loaded once per process.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(SCRIPT_DIR, '__init__.py'),
+        submodule_search_locations=[SCRIPT_DIR])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[name] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def script_module(module_name):
+    """ Returns a submodule of the script, e.g. script_module('consts') """
+    load_script_package()
+    return importlib.import_module(SCRIPT_PACKAGE + '.' + module_name)
+
+
+def pin_default_settings(**settings):
+    """
+        Makes the script use the defaults of Config.py, changed by 'settings',
+        instead of settings.py, so a run doesn't depend on local edits of it.
+    """
+    config = script_module('Config')
+    config.overrides.clear()
+    config.overrides.update(config.DEFAULTS)
+    config.overrides.update(settings)
+
+
+def build_song(num_tracks=8, num_returns=2, num_scenes=8, devices_per_track=0,
+               clips=True):
+    """ A plain set: audio tracks, returns and scenes, optionally with clips """
+    song = Live.Song.Song()
+    for _ in range(num_returns):
+        song.add_return_track()
+    for _ in range(num_scenes):
+        song.add_scene()
+    for i in range(num_tracks):
+        track = song.add_track(color=(i * 0x2f1b07) & 0xffffff)
+        for d in range(devices_per_track):
+            track.devices = list(track.devices) + [make_device(d)]
+        if clips:
+            for s, clip_slot in enumerate(track.clip_slots):
+                if (i + s) % 3 == 0:
+                    clip_slot.create_clip(4.0)
+    song.view.selected_track = song.tracks[0] if song.tracks else song.master_track
+    return song
+
+
+def make_device(index, num_parameters=16):
+    parameters = [Live.DeviceParameter.DeviceParameter('Device On', 1.0, 0.0, 1.0,
+                                                       is_quantized=True,
+                                                       value_items=('Off', 'On'))]
+    parameters += [Live.DeviceParameter.DeviceParameter('Macro {}'.format(p + 1), 0.5)
+                   for p in range(num_parameters)]
+    return Live.Device.Device('Rack {}'.format(index + 1), 'AudioEffectGroupDevice',
+                              parameters)
+
+
+class MidiError(Exception):
+    pass
+
+
+def validate_midi(midi_bytes):
+    """ Raises MidiError unless 'midi_bytes' is one well formed MIDI message """
+    if not isinstance(midi_bytes, tuple) or not midi_bytes:
+        raise MidiError('MIDI messages must be non empty tuples: {!r}'.format(midi_bytes))
+    for b in midi_bytes:
+        if not isinstance(b, int) or not 0 <= b <= 255:
+            raise MidiError('Invalid MIDI byte {!r} in {!r}'.format(b, midi_bytes))
+    status = midi_bytes[0]
+    if status == 0xF0:
+        if midi_bytes[-1] != 0xF7:
+            raise MidiError('Unterminated SysEx: {!r}'.format(midi_bytes))
+        data = midi_bytes[1:-1]
+    else:
+        if status < 0x80:
+            raise MidiError('Missing status byte: {!r}'.format(midi_bytes))
+        expected = 2 if status & 0xF0 in (0xC0, 0xD0) else 3
+        if len(midi_bytes) != expected:
+            raise MidiError('Expected {} bytes: {!r}'.format(expected, midi_bytes))
+        data = midi_bytes[1:]
+    if any(b > 127 for b in data):
+        raise MidiError('Data byte out of range: {!r}'.format(midi_bytes))
+
+
+class FakeCInstance(object):
+    """
+        What Live passes to 'create_instance'. Every outgoing MIDI message is
+        validated and appended to 'sent_midi'.
+    """
+
+    def __init__(self, song):
+        self.__song = song
+        self.sent_midi = []
+        self.rebuild_requested = False
+        self.messages = []
+
+    def song(self):
+        return self.__song
+
+    def handle(self):
+        return self
+
+    def send_midi(self, midi_event_bytes):
+        validate_midi(midi_event_bytes)
+        self.sent_midi.append(midi_event_bytes)
+
+    def request_rebuild_midi_map(self):
+        self.rebuild_requested = True
+
+    def show_message(self, message):
+        self.messages.append(message)
+
+    def take_sent_midi(self):
+        sent = self.sent_midi
+        self.sent_midi = []
+        return sent
+
+
+class SimulatedClock(object):
+    """ The script's clock (see P1NanoTGE.clock) in simulated seconds """
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class ScriptHarness(object):
+    """
+        Owns one script instance and drives it like Live would: the MIDI map is
+        rebuilt once per frame when requested, then 'update_display' runs. The
+        script runs on 'clock', which 'tick' moves on by 100 ms, so auto-repeat
+        and everything else timed in seconds does not depend on the machine.
+
+        With 'live_feedback' the harness also sends what Live sends for the
+        parameters mapped with a feedback rule (v-pot rings, motor faders):
+        once per 'send_feedback_for_parameter' of a MIDI map build and
+        whenever the parameter's value changes. It goes to the same
+        'c_instance.sent_midi' as the script's own messages.
+    """
+
+    def __init__(self, song=None, firmware_version=b'1.00', left_extensions=0,
+                 right_extensions=0, live_feedback=False):
+        self.song = song if song is not None else build_song()
+        self.c_instance = FakeCInstance(self.song)
+        self.script = None
+        self.extensions = []
+        self.__num_extensions = (left_extensions, right_extensions)
+        self.midi_map = None
+        self.ticks = 0
+        self.timings = None
+        self.__mapped_controls = {}
+        self.__live_feedback = live_feedback
+        self.__feedback_listeners = {}
+        self.__firmware_version = firmware_version
+        self.__consts = None
+        self.clock = SimulatedClock()
+
+    def consts(self):
+        if self.__consts is None:
+            self.__consts = script_module('consts')
+        return self.__consts
+
+    def start(self, answer_firmware_request=True):
+        self.create_script()
+        if any(self.__num_extensions):
+            self.connect_extensions()
+        self.build_midi_map()
+        self.script.refresh_state()
+        if answer_firmware_request:
+            self.answer_firmware_request()
+        return self.script
+
+    def create_script(self):
+        """ Only what Live does when it loads the script, see 'start' for the rest """
+        Live.Application.reset_application().view.attach_song(self.song)
+        package = load_script_package()
+        self.script = package.create_instance(self.c_instance)
+        self.script.set_clock(self.clock)
+        return self.script
+
+    def connect_extensions(self):
+        """
+            Creates the MackieControlXT stand-ins and lets Live's
+            'connect_script_instances' introduce them, left ones first
+        """
+        from MackieControlXT.MackieControlXT import MackieControlXT
+        left, right = self.__num_extensions
+        self.extensions = [MackieControlXT(self.c_instance, SCRIPT_PACKAGE)
+                           for _ in range(left + right)]
+        scripts = self.extensions[:left] + [self.script] + self.extensions[left:]
+        self.__call('connect_script_instances', self.script.connect_script_instances,
+                    scripts)
+
+    def answer_firmware_request(self):
+        """ Replies to the version request the way the P1 Nano firmware does """
+        consts = self.consts()
+        version = tuple(self.__firmware_version[:4].ljust(4, b'0'))
+        self.send((240, 0, 0, 102, consts.SYSEX_DEVICE_TYPE, 20) + version + (0, 247))
+
+    def record_timings(self):
+        """
+            From now on every receive_midi, update_display and build_midi_map
+            call is timed, the durations in seconds go to 'timings'.
+        """
+        self.timings = {'receive_midi': [], 'update_display': [],
+                        'build_midi_map': [], 'connect_script_instances': []}
+
+    def __call(self, kind, function, argument=None):
+        if self.timings is None:
+            if argument is None:
+                function()
+            else:
+                function(argument)
+        else:
+            start = perf_counter()
+            if argument is None:
+                function()
+            else:
+                function(argument)
+            self.timings[kind].append(perf_counter() - start)
+
+    def build_midi_map(self):
+        self.c_instance.rebuild_requested = False
+        self.midi_map = Live.MidiMap.MidiMapHandle()
+        self.__call('build_midi_map', self.script.build_midi_map, self.midi_map)
+        for extension in self.extensions:
+            extension.build_midi_map(self.midi_map)
+        controls = {}
+        for parameter, kind, channel, cc_no, map_mode, sensitivity in \
+                self.midi_map.parameter_mappings:
+            controls[(kind, channel, cc_no)] = (parameter, sensitivity)
+        self.__mapped_controls = controls
+        if self.__live_feedback:
+            self.__connect_feedback(self.midi_map)
+
+    def __connect_feedback(self, midi_map):
+        self.__disconnect_feedback()
+        for parameter, rule in midi_map.feedback_rules:
+            if rule is None or parameter in self.__feedback_listeners:
+                continue
+            listener = partial(self.__send_feedback, parameter, rule)
+            parameter.add_value_listener(listener)
+            self.__feedback_listeners[parameter] = listener
+        rules = dict(midi_map.feedback_rules)
+        for parameter in midi_map.feedback_requests:
+            if parameter in rules:
+                self.__send_feedback(parameter, rules[parameter])
+
+    def __disconnect_feedback(self):
+        for parameter, listener in self.__feedback_listeners.items():
+            if parameter and parameter.value_has_listener(listener):
+                parameter.remove_value_listener(listener)
+        self.__feedback_listeners = {}
+
+    def __send_feedback(self, parameter, rule):
+        span = parameter.max - parameter.min
+        position = (parameter.value - parameter.min) / span if span else 0.0
+        if isinstance(rule, Live.MidiMap.CCFeedbackRule):
+            values = rule.cc_value_map or tuple(range(128))
+            value = values[int(round(position * (len(values) - 1)))]
+            self.c_instance.send_midi((0xB0 | rule.channel, rule.cc_no, value))
+        else:
+            value = int(round(position * 16383))
+            self.c_instance.send_midi((0xE0 | rule.channel, value & 0x7F, value >> 7))
+
+    def tick(self, count=1):
+        for _ in range(count):
+            if self.c_instance.rebuild_requested:
+                self.build_midi_map()
+            self.update_display()
+            self.song.advance(0.1)
+            self.clock.advance(0.1)
+
+    def update_display(self):
+        """ One display frame without the MIDI map rebuild and song time of 'tick' """
+        self.__call('update_display', self.script.update_display)
+        for extension in self.extensions:
+            extension.update_display()
+        self.ticks += 1
+
+    def send(self, midi_bytes):
+        """
+            Like Live, messages for controls that are mapped to a parameter
+            move the parameter and never reach 'receive_midi'.
+        """
+        validate_midi(midi_bytes)
+        status = midi_bytes[0] & 0xF0
+        channel = midi_bytes[0] & 0x0F
+        if status == 0xB0:
+            mapping = self.__mapped_controls.get(('cc', channel, midi_bytes[1]))
+            if mapping:
+                self.__move_parameter_relative(midi_bytes[2], *mapping)
+                return
+        elif status == 0xE0:
+            mapping = self.__mapped_controls.get(('pitchbend', channel, None))
+            if mapping:
+                value = (midi_bytes[2] << 7 | midi_bytes[1]) / 16383.0
+                parameter = mapping[0]
+                parameter.value = parameter.min + value * (parameter.max - parameter.min)
+                return
+        self.receive_midi(midi_bytes)
+
+    def receive_midi(self, midi_bytes):
+        """ Hands a message straight to the script, bypassing the MIDI map """
+        self.__call('receive_midi', self.script.receive_midi, midi_bytes)
+
+    @staticmethod
+    def __move_parameter_relative(cc_value, parameter, sensitivity):
+        steps = -(cc_value & 0x3F) if cc_value & 0x40 else cc_value
+        if parameter.is_quantized:
+            delta = 1 if steps > 0 else -1
+        else:
+            delta = steps * sensitivity * (parameter.max - parameter.min) / 200.0
+        parameter.value = min(parameter.max, max(parameter.min, parameter.value + delta))
+
+    def press(self, switch_id):
+        self.send((self.consts().NOTE_ON_STATUS, switch_id, 127))
+
+    def release(self, switch_id):
+        self.send((self.consts().NOTE_ON_STATUS, switch_id, 0))
+
+    def click(self, switch_id):
+        self.press(switch_id)
+        self.release(switch_id)
+
+    def move_fader(self, strip_index, position):
+        """ 'position' from 0.0 to 1.0, sent as 14 bit pitch bend """
+        value = int(round(min(1.0, max(0.0, position)) * 16383))
+        self.send((0xE0 | strip_index, value & 0x7F, value >> 7))
+
+    def turn_vpot(self, strip_index, steps):
+        """ Relative signed bit encoding, like the hardware sends it """
+        value = steps if steps > 0 else 64 - steps
+        self.send((self.consts().CC_STATUS, self.consts().FID_PANNING_BASE + strip_index,
+                   min(value, 127)))
+
+    def turn_jog_wheel(self, steps):
+        value = steps if steps > 0 else 64 - steps
+        self.send((self.consts().CC_STATUS, self.consts().JOG_WHEEL_CC_NO,
+                   min(value, 127)))
+
+    def pump(self, seconds):
+        """ Runs the script for 'seconds' of simulated time """
+        self.tick(max(1, int(round(seconds * 10))))
+
+    def close(self):
+        self.__disconnect_feedback()
+        if self.script is not None:
+            self.script.disconnect()
+            self.script = None
+        for extension in self.extensions:
+            extension.disconnect()
+        self.extensions = []
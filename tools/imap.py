@@ -0,0 +1,190 @@
+"""
+    Compiles the iCON iMap mapping files (Custom_Mapping.imap and the
+    variants made by imapvariants.py) into a compact mapping of one slot and DAW mode.
+
+        python imap.py ../Custom_Mapping.imap                  live mode of the current slot
+        python imap.py ../Custom_Mapping.imap --mode cubase --slot 1 --json cubase.json
+        python imap.py ../Custom_Mapping.imap --imap live_only.imap
+
+    The files hold 3 slots with 18 DAW modes of ~226 controls each. They are
+    read with a streaming parser that only keeps the controls of the chosen
+    slot and mode. The JSON output has one line per control (attribute values
+    in the order iMap writes them), so it diffs well; '--imap' writes an .imap
+    with just that slot and mode.
+
+    'format_imap' writes elements exactly like iMap does (JUCE's XML writer:
+    attributes wrapped after 60 characters, its escaping), so a file that is
+    read and written again is byte for byte the same.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+_LEGAL_CHARACTERS = frozenset(" .,;:-()_+=?!$#@[]/|*%~{}'\\")
+_NAMED_ENTITIES = {'&': '&amp;', '"': '&quot;', '>': '&gt;', '<': '&lt;'}
+_WRAP_LENGTH = 60
+
+
+def read_mapping(path, slot=None, mode='live'):
+    """
+        The controls of one slot (default: the file's current slot) and mode, as
+        {'file': root attributes, 'slot': slot attributes, 'mode': mode attributes,
+        'controls': [ctl attributes, ...]}. Attributes are dicts in file order.
+    """
+    mapping = None
+    root_attributes = None
+    slot_attributes = None
+    in_slot = False
+    complete = False
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            if tag == 'slots':
+                root_attributes = dict(element.attrib)
+                if slot is None:
+                    slot = root_attributes.get('current', '0')
+            elif tag == 'slot':
+                in_slot = element.get('id') == str(slot)
+                slot_attributes = dict(element.attrib)
+            elif tag == 'mode' and in_slot and mapping is None and \
+                    element.get('mode') == mode:
+                mapping = {'file': root_attributes, 'slot': slot_attributes,
+                           'mode': dict(element.attrib), 'controls': []}
+            continue
+        if tag == 'ctl':
+            if mapping is not None and not complete:
+                mapping['controls'].append(dict(element.attrib))
+        elif tag == 'mode':
+            complete = mapping is not None
+        elif tag == 'slot' and complete:
+            break
+        element.clear()
+    if mapping is None:
+        raise ValueError('no mode {!r} in slot {}'.format(mode, slot))
+    return mapping
+
+
+def escape(value):
+    return ''.join(c if (c.isascii() and c.isalnum()) or c in _LEGAL_CHARACTERS
+                   else _NAMED_ENTITIES.get(c, '&#{};'.format(ord(c))) for c in value)
+
+
+def format_element(tag, attributes, indent, close):
+    text = ' ' * indent + '<' + tag
+    line_length = 0
+    for name, value in attributes.items():
+        if line_length > _WRAP_LENGTH:
+            text += '\n' + ' ' * (indent + len(tag) + 1)
+            line_length = 0
+        attribute = ' {}="{}"'.format(name, escape(value))
+        text += attribute
+        line_length += len(attribute)
+    return text + close
+
+
+def format_imap(root_attributes, slots):
+    """
+        The text of an .imap file. 'slots' is a list of (slot attributes, modes),
+        modes a list of (mode attributes, [ctl attributes, ...]).
+    """
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '',
+             format_element('slots', root_attributes, 0, '>')]
+    for slot_attributes, modes in slots:
+        lines.append(format_element('slot', slot_attributes, 2, '>'))
+        for mode_attributes, controls in modes:
+            lines.append(format_element('mode', mode_attributes, 4, '>'))
+            lines.extend(format_element('ctl', c, 6, '/>') for c in controls)
+            lines.append('    </mode>')
+        lines.append('  </slot>')
+    lines.append('</slots>')
+    return '\n'.join(lines) + '\n'
+
+
+def read_imap(path):
+    """ The whole file as (root attributes, slots), see 'format_imap' """
+    root = ET.parse(path).getroot()
+    return dict(root.attrib), [
+        (dict(slot.attrib), [(dict(mode.attrib), [dict(c.attrib) for c in mode])
+                             for mode in slot])
+        for slot in root]
+
+
+def mapping_imap(mapping):
+    """ An .imap text with only the slot and mode of 'mapping' """
+    root_attributes = dict(mapping['file'], current=mapping['slot']['id'])
+    return format_imap(root_attributes, [(mapping['slot'], [(mapping['mode'],
+                                                             mapping['controls'])])])
+
+
+def mapping_json(mapping):
+    """
+        Compact JSON: every distinct attribute order once, then one line per
+        control with the index of its order and the values.
+    """
+    orders = []
+    rows = []
+    for control in mapping['controls']:
+        order = list(control)
+        if order not in orders:
+            orders.append(order)
+        rows.append([orders.index(order)] + list(control.values()))
+    lines = ['{', '"file": ' + json.dumps(mapping['file']) + ',',
+             '"slot": ' + json.dumps(mapping['slot']) + ',',
+             '"mode": ' + json.dumps(mapping['mode']) + ',',
+             '"attribute_orders": [']
+    lines.append(',\n'.join(json.dumps(o) for o in orders))
+    lines.append('],')
+    lines.append('"controls": [')
+    lines.append(',\n'.join(json.dumps(r) for r in rows))
+    lines.append(']}')
+    return '\n'.join(lines) + '\n'
+
+
+def load_mapping_json(path):
+    """ A mapping written by 'mapping_json', in the form of 'read_mapping' """
+    with open(path) as f:
+        data = json.load(f)
+    orders = data['attribute_orders']
+    controls = [dict(zip(orders[row[0]], row[1:])) for row in data['controls']]
+    return {'file': data['file'], 'slot': data['slot'], 'mode': data['mode'],
+            'controls': controls}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('imap', help='an .imap file')
+    parser.add_argument('--slot', help="slot id (default: the file's current slot)")
+    parser.add_argument('--mode', default='live', help='DAW mode (default: live)')
+    parser.add_argument('--json', help='output file (default: <imap name>.<mode>.json)')
+    parser.add_argument('--imap', dest='imap_out', help='also write an .imap with only '
+                                                        'this slot and mode')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        mapping = read_mapping(args.imap, args.slot, args.mode)
+    except ValueError as e:
+        print('{}: {}'.format(args.imap, e))
+        return 1
+    elapsed = time.perf_counter() - start
+    json_path = args.json or '{}.{}.json'.format(
+        os.path.splitext(os.path.basename(args.imap))[0], args.mode)
+    with open(json_path, 'w') as f:
+        f.write(mapping_json(mapping))
+    outputs = [json_path]
+    if args.imap_out:
+        with open(args.imap_out, 'w', newline='\n') as f:
+            f.write(mapping_imap(mapping))
+        outputs.append(args.imap_out)
+    print('slot {} mode {}: {} controls read in {:.0f} ms'.format(
+        mapping['slot']['id'], args.mode, len(mapping['controls']), elapsed * 1000.0))
+    for path in outputs:
+        print('{:40} {:8d} bytes'.format(path, os.path.getsize(path)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
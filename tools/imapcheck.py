@@ -0,0 +1,194 @@
+"""
+    Checks the hardware mapping (.imap) against what the script expects
+    (consts.py): every control of the live mode is turned into the MIDI message
+    it sends and looked up in the script's tables of mapped and forwarded
+    messages.
+
+        python imapcheck.py                       the mapping and its variants (see
+                                                  imapvariants.py)
+        python imapcheck.py my.imap --strict      warnings fail as well
+
+    Errors (exit code 1):
+      - a fader that does not send pitch bend on a strip channel
+      - a note or CC the script handles, sent on another channel than 1 (the
+        script only maps and forwards channel 1, so it never gets it)
+      - one message sent by controls of different kinds (e.g. a knob and a
+        button), the script can only handle it one way
+    Warnings:
+      - one message sent by differently named controls of the same kind
+      - MIDI the script neither maps nor forwards (it goes to Live's own MIDI
+        mapping instead, which may be intended)
+    Also listed: the script inputs no control sends. Controls on several
+    layers of the Nano that send the same message are fine.
+
+    Fast enough (well under a second) for a pre-commit hook.
+"""
+import argparse
+import os
+import sys
+import time
+
+from harness import SCRIPT_DIR, script_module
+from imap import read_mapping
+from imapvariants import CANONICAL_FILE, VARIANT_FILES
+
+
+def control_message(control):
+    """
+        The message a control sends as ('note'|'cc', channel, number) or
+        ('pitch', channel), channels counted from 0. None for hotkeys and
+        unassigned controls. A 'func' control sends the Mackie Control note of
+        its function on channel 1.
+    """
+    value_type = control.get('valueType')
+    if value_type == 'func':
+        return 'note', 0, int(control['value'])
+    if value_type != 'midi':
+        return None
+    kind = control.get('type')
+    channel = int(control.get('chan', '1')) - 1
+    if kind == 'pitch':
+        return 'pitch', channel
+    if kind in ('note', 'cc'):
+        return kind, channel, int(control['value'])
+    return None
+
+
+def script_inputs(consts):
+    """ {message: what the script does with it} for every message it maps or forwards """
+    inputs = {}
+    for name, switch_ids in consts.switch_id_groups:
+        for switch_id in switch_ids:
+            inputs['note', 0, switch_id] = name
+    for strip in range(consts.NUM_CHANNEL_STRIPS):
+        inputs['cc', 0, consts.FID_PANNING_BASE + strip] = 'v-pot {}'.format(strip + 1)
+        inputs['pitch', strip] = 'fader {}'.format(strip + 1)
+    inputs['pitch', consts.MASTER_CHANNEL_STRIP_INDEX] = 'master fader'
+    inputs['cc', 0, consts.JOG_WHEEL_CC_NO] = 'jog wheel'
+    return inputs
+
+
+def format_message(message):
+    if message[0] == 'pitch':
+        return 'pitch bend ch {}'.format(message[1] + 1)
+    return '{} {} ch {}'.format(message[0], message[2], message[1] + 1)
+
+
+def describe_input(inputs, message):
+    if message not in inputs:
+        return 'not used by the script'
+    if message[0] == 'note':
+        return '{} switch'.format(inputs[message])
+    return inputs[message]
+
+
+def describe(control):
+    name = control.get('name', '').strip()
+    return 'ctl {} ({} {})'.format(control['id'], control['kind'],
+                                   repr(name) if name else 'unnamed')
+
+
+def check(mapping, inputs):
+    """ Returns (errors, warnings, unused script inputs) """
+    errors = []
+    warnings = []
+    by_message = {}
+    inputs_on_channel_1 = set(m[0::2] for m in inputs if m[0] != 'pitch')
+    for control in mapping['controls']:
+        message = control_message(control)
+        if control['kind'] == 'fader' and (message is None or message[0] != 'pitch' or
+                                           message not in inputs):
+            errors.append('{} sends {}, the script maps faders to pitch bend on '
+                          'channels 1-9'.format(describe(control), format_message(message)
+                                                if message else 'nothing'))
+        if message is None:
+            continue
+        by_message.setdefault(message, []).append(control)
+        if message in inputs:
+            continue
+        if message[0] != 'pitch' and message[1] != 0 and message[0::2] in inputs_on_channel_1:
+            errors.append('{} sends {}, the script only gets it on channel 1 ({})'.format(
+                describe(control), format_message(message),
+                describe_input(inputs, (message[0], 0, message[2]))))
+        elif control['kind'] != 'fader':
+            warnings.append('{} sends {}, which the script neither maps nor forwards'.format(
+                describe(control), format_message(message)))
+    for message, controls in sorted(by_message.items()):
+        kinds = sorted(set(c['kind'] for c in controls))
+        names = sorted(set(c.get('name', '').strip() for c in controls))
+        used_as = describe_input(inputs, message)
+        if len(kinds) > 1:
+            errors.append('{} ({}) is sent by {}'.format(
+                format_message(message), used_as, ', '.join(describe(c) for c in controls)))
+        elif len(names) > 1:
+            warnings.append('{} ({}) is sent by {}'.format(
+                format_message(message), used_as, ', '.join(describe(c) for c in controls)))
+    unused = [m for m in sorted(inputs) if m not in by_message]
+    return errors, warnings, unused
+
+
+def summarize_notes(messages, inputs):
+    """ 'select 24-31, marker 84-85' for notes, the others one by one """
+    parts = []
+    run = None
+    for message in messages + [None]:
+        if run and message and message[0] == 'note' and inputs[message] == run[0] and \
+                message[2] == run[2] + 1:
+            run[2] = message[2]
+            continue
+        if run:
+            parts.append('{} {}'.format(run[0], run[1] if run[1] == run[2] else
+                                        '{}-{}'.format(run[1], run[2])))
+            run = None
+        if message is None:
+            break
+        if message[0] == 'note':
+            run = [inputs[message], message[2], message[2]]
+        else:
+            parts.append(inputs[message])
+    return ', '.join(parts)
+
+
+def repo_mappings():
+    """ (name, file) of the mapping and of its variants """
+    return [(name, os.path.join(SCRIPT_DIR, name)) for name in (CANONICAL_FILE,) + VARIANT_FILES]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('imap', nargs='*', help='.imap files (default: the ones of the repo)')
+    parser.add_argument('--slot', help="slot id (default: the file's current slot)")
+    parser.add_argument('--mode', default='live', help='DAW mode (default: live)')
+    parser.add_argument('--strict', action='store_true', help='fail on warnings as well')
+    parser.add_argument('--quiet', action='store_true', help='only print problems')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    inputs = script_inputs(script_module('consts'))
+    failed = False
+    sources = [(os.path.basename(p), p) for p in args.imap] or repo_mappings()
+    for name, source in sources:
+        try:
+            mapping = read_mapping(source, args.slot, args.mode)
+        except ValueError as e:
+            print('{}: {}'.format(name, e))
+            failed = True
+            continue
+        errors, warnings, unused = check(mapping, inputs)
+        print('{}: slot {} mode {}, {} controls, {} errors, {} warnings'.format(
+            name, mapping['slot']['id'], args.mode,
+            len(mapping['controls']), len(errors), len(warnings)))
+        for error in errors:
+            print('  error: ' + error)
+        for warning in warnings:
+            print('  warning: ' + warning)
+        if unused and not args.quiet:
+            print('  no control sends: ' + summarize_notes(unused, inputs))
+        failed = failed or bool(errors) or (args.strict and bool(warnings))
+    if not args.quiet:
+        print('checked in {:.0f} ms'.format((time.perf_counter() - start) * 1000.0))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+    Keeps the platform variants of the hardware mapping as patches against one
+    canonical file: Custom_Mapping.imap is the mapping, Custom_Mapping_Mac.imap
+    is made from it and Custom_Mapping_Mac.imap.patch. The variants are checked
+    in as well (users download them), '--check' makes sure they match.
+
+        python imapvariants.py              write the variants (after editing the mapping)
+        python imapvariants.py --update     new patches from edited variant files
+        python imapvariants.py --check      fail when a variant is out of date or
+                                            missing or a patch does not fit
+
+    The patches are unified diffs without context lines, so 'patch' can apply
+    them as well:
+
+        patch -o Custom_Mapping_Mac.imap Custom_Mapping.imap Custom_Mapping_Mac.imap.patch
+
+    iMap on macOS writes type="null" for some controls Windows writes as
+    type="nil" (and reads both). '--update' takes such lines from the canonical
+    file and writes the variant without them, so a patch only holds what
+    really differs (the hotkeys) instead of hundreds of these lines.
+
+    Before a patch is applied, every line it removes is compared with the
+    canonical file, so a patch that does not fit the mapping any more is an
+    error instead of a broken variant. Files are read and written byte for
+    byte (no newline conversion); every patch written is applied again and the
+    result compared with the variant it was made from. Writing the variants
+    and '--check' (which applies the patches and compares the result with the
+    variant files) take milliseconds, '--update' diffs the whole files and
+    takes about half a second.
+"""
+import argparse
+import difflib
+import os
+import re
+import sys
+import time
+
+from harness import SCRIPT_DIR
+
+CANONICAL_FILE = 'Custom_Mapping.imap'
+VARIANT_FILES = ('Custom_Mapping_Mac.imap',)
+
+# (variant, canonical) notation of the same value, see above
+NOTATION_CHANGES = (('type="null"', 'type="nil"'),)
+
+_HUNK_HEADER = re.compile(r'@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def read_lines(path):
+    with open(path, newline='') as f:
+        return f.read().splitlines(True)
+
+
+def write_lines(path, lines):
+    with open(path, 'w', newline='') as f:
+        f.write(''.join(lines))
+
+
+def make_patch(canonical_lines, variant_lines, canonical_name, variant_name):
+    """ A unified diff without context from the canonical file to the variant """
+    return ''.join(difflib.unified_diff(canonical_lines, variant_lines, canonical_name,
+                                        variant_name, n=0))
+
+
+def without_notation_changes(canonical_lines, variant_lines):
+    """ The variant with lines only differing in NOTATION_CHANGES taken from the canonical one """
+
+    def canonical_notation(line):
+        for variant_notation, notation in NOTATION_CHANGES:
+            line = line.replace(variant_notation, notation)
+        return line
+
+    result = []
+    matcher = difflib.SequenceMatcher(None, canonical_lines, variant_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'replace' and i2 - i1 == j2 - j1:
+            result.extend(c if canonical_notation(v) == c else v
+                          for c, v in zip(canonical_lines[i1:i2], variant_lines[j1:j2]))
+        else:
+            result.extend(variant_lines[j1:j2])
+    return result
+
+
+def apply_patch(canonical_lines, patch):
+    """
+        The lines of the variant. Raises a ValueError when a removed line is not
+        the one in the canonical file.
+    """
+    result = []
+    position = 0
+    lines = patch.splitlines(True)
+    index = 0
+    while index < len(lines) and not lines[index].startswith('@@'):
+        index += 1
+    while index < len(lines):
+        match = _HUNK_HEADER.match(lines[index])
+        if match is None:
+            raise ValueError('not a hunk header: {!r}'.format(lines[index]))
+        start = int(match.group(1))
+        count = 1 if match.group(2) is None else int(match.group(2))
+        # a hunk that only adds starts after the given line
+        start = start if count == 0 else start - 1
+        if start < position:
+            raise ValueError('hunks out of order at line {}'.format(start + 1))
+        result.extend(canonical_lines[position:start])
+        position = start
+        index += 1
+        while index < len(lines) and not lines[index].startswith('@@'):
+            line = lines[index]
+            if line.startswith('-'):
+                if position >= len(canonical_lines) or canonical_lines[position] != line[1:]:
+                    raise ValueError('line {} of the canonical file does not match the '
+                                     'patch'.format(position + 1))
+                position += 1
+            elif line.startswith('+'):
+                result.append(line[1:])
+            elif not line.startswith('\\'):
+                raise ValueError('unexpected line in the patch: {!r}'.format(line))
+            index += 1
+    result.extend(canonical_lines[position:])
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--update', action='store_true',
+                       help='make the patches from the variant files')
+    group.add_argument('--check', action='store_true',
+                       help='only compare, exit with an error when something is out of date '
+                            '(takes milliseconds, usable as a pre-commit hook)')
+    parser.add_argument('--dir', default=SCRIPT_DIR,
+                        help='folder of the mapping files (default: the script folder)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    canonical = read_lines(os.path.join(args.dir, CANONICAL_FILE))
+    failed = False
+    for name in VARIANT_FILES:
+        variant_path = os.path.join(args.dir, name)
+        patch_path = variant_path + '.patch'
+        if args.update:
+            edited = read_lines(variant_path)
+            variant = without_notation_changes(canonical, edited)
+            patch = make_patch(canonical, variant, CANONICAL_FILE, name)
+            if apply_patch(canonical, patch) != variant:
+                print('{}: the patch does not give back the variant'.format(name))
+                failed = True
+                continue
+            with open(patch_path, 'w', newline='') as f:
+                f.write(patch)
+            if variant != edited:
+                write_lines(variant_path, variant)
+                print('{}: {} lines only differing in notation taken from {}'.format(
+                    name, sum(1 for v, e in zip(variant, edited) if v != e),
+                    CANONICAL_FILE))
+            print('{}: {} bytes'.format(os.path.basename(patch_path), len(patch)))
+            continue
+        with open(patch_path, newline='') as f:
+            patch = f.read()
+        try:
+            variant = apply_patch(canonical, patch)
+        except ValueError as e:
+            print('{}: {}'.format(os.path.basename(patch_path), e))
+            failed = True
+            continue
+        if args.check:
+            if not os.path.exists(variant_path):
+                print('{}: missing, run without options'.format(name))
+                failed = True
+            elif read_lines(variant_path) != variant:
+                print('{}: out of date or edited, run without options or with '
+                      '--update'.format(name))
+                failed = True
+            continue
+        write_lines(variant_path, variant)
+        print('{}: {} lines'.format(name, len(variant)))
+    print('done in {:.0f} ms'.format((time.perf_counter() - start) * 1000.0))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
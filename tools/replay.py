@@ -0,0 +1,231 @@
+"""
+    Replays a session log recorded with 'session_recording_enabled' (settings.py)
+    against the script on the Live stand-in.
+
+    The set is rebuilt from the log's header (tracks, returns, devices and their
+    parameters, scenes), then every recorded receive_midi, update_display,
+    build_midi_map, refresh_state and connect_script_instances call is made again
+    in the recorded order, timing every call. The script runs on the harness'
+    simulated clock, set to the recorded clock before every call, the song time
+    is set to the recorded one before every display tick and the values Live set
+    on the mapped parameters (faders, v-pots) are set again where they were
+    recorded. The display time budget is lifted, so work the recorded session
+    put off to a later tick is done right away in the replay.
+
+        python replay.py ~/P1NanoTGE_session_20261019_213000.p1ns
+        python replay.py session.p1ns --profile --out replay.json
+
+    The MIDI the replayed script sends is compared with the recorded output tick
+    by tick. Changes of the set while recording (tracks, returns or devices
+    added, deleted or moved, names, colors, parameters that are not mapped to a
+    fader or v-pot) are not in the log (see SessionRecorder): the replay only matches the
+    recording for sessions without them, the feedback of such changes shows up
+    as missing messages. '--check' exits with 1 when the output differs.
+"""
+import argparse
+import collections
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from bench import summarize_timings
+from harness import ScriptHarness, script_module
+
+import Live  # noqa: E402  (the stand-in, put on the path by harness)
+
+ENTRY_POINTS = ('receive_midi', 'update_display', 'build_midi_map')
+
+
+def build_recorded_song(description):
+    song = Live.Song.Song()
+    for name, color, devices in description['return_tracks']:
+        track = song.add_return_track(name=name)
+        track.color = color
+        add_devices(track, devices)
+    for _ in range(description['num_scenes']):
+        song.add_scene()
+    for name, color, devices in description['tracks']:
+        add_devices(song.add_track(name=name, color=color), devices)
+    selected_track = description['selected_track']
+    song.view.selected_track = song.tracks[selected_track] if selected_track >= 0 \
+        else song.master_track
+    song.tempo = description['tempo']
+    song.current_song_time = description['current_song_time']
+    song.is_playing = description['is_playing']
+    return song
+
+
+def add_devices(track, devices):
+    track.devices = [Live.Device.Device(name, class_name, [
+        Live.DeviceParameter.DeviceParameter(p_name, value, p_min, p_max,
+                                             is_quantized=is_quantized)
+        for p_name, value, p_min, p_max, is_quantized in parameters])
+        for name, class_name, parameters in devices]
+
+
+def output_by_tick(records):
+    """ The sent messages, one list per display tick (the first one before any tick) """
+    session_recorder = script_module('SessionRecorder')
+    ticks = [[]]
+    for kind, _, data in records:
+        if kind == session_recorder.RECORD_TICK:
+            ticks.append([])
+        elif kind == session_recorder.RECORD_SEND_MIDI:
+            ticks[-1].append(data)
+    return ticks
+
+
+def diff_output(recorded, replayed, max_ticks_shown):
+    differing_ticks = []
+    for tick in range(max(len(recorded), len(replayed))):
+        expected = recorded[tick] if tick < len(recorded) else []
+        actual = replayed[tick] if tick < len(replayed) else []
+        if expected != actual:
+            missing = collections.Counter(expected) - collections.Counter(actual)
+            extra = collections.Counter(actual) - collections.Counter(expected)
+            differing_ticks.append({
+                'tick': tick,
+                'recorded': len(expected),
+                'replayed': len(actual),
+                'missing': [format_midi(m) for m in list(missing.elements())[:5]],
+                'extra': [format_midi(m) for m in list(extra.elements())[:5]],
+                'reordered': not missing and not extra})
+    return {'differing_ticks': len(differing_ticks),
+            'first_differences': differing_ticks[:max_ticks_shown]}
+
+
+def format_midi(midi_bytes):
+    return ' '.join('{:02X}'.format(b) for b in midi_bytes)
+
+
+def count_output(ticks):
+    return {'midi_messages': sum(len(t) for t in ticks),
+            'midi_bytes': sum(len(m) for t in ticks for m in t)}
+
+
+def replay(path, profile=False, max_ticks_shown=10):
+    session_recorder = script_module('SessionRecorder')
+    config = script_module('Config')
+    description, records = session_recorder.read_session(path)
+    extensions = [data for kind, _, data in records
+                  if kind == session_recorder.RECORD_CONNECT]
+    left, right = extensions[0] if extensions else (0, 0)
+
+    output_dir = tempfile.mkdtemp(prefix='p1ns_replay_')
+    overrides = dict(config.overrides)
+    config.overrides.update(
+        session_recording_enabled=True, session_recording_directory=output_dir,
+        tick_profiler_enabled=profile or config.read_config().tick_profiler_enabled)
+    try:
+        song = build_recorded_song(description)
+        harness = ScriptHarness(song, left_extensions=left, right_extensions=right)
+        clocks = [data[1] for kind, _, data in records
+                  if kind in (session_recorder.RECORD_TICK,
+                              session_recorder.RECORD_RECEIVE_MIDI)]
+        if clocks:
+            harness.clock.now = clocks[0]
+        harness.record_timings()
+        harness.create_script()
+        harness.script.tick_scheduler().set_time_budget_ms(1000000.0)
+        frame_intervals = []
+        for kind, microseconds, data in records:
+            if kind == session_recorder.RECORD_RECEIVE_MIDI:
+                midi_bytes, harness.clock.now = data
+                harness.receive_midi(midi_bytes)
+            elif kind == session_recorder.RECORD_TICK:
+                frame_intervals.append(microseconds / 1000000.0)
+                song_time, harness.clock.now = data
+                if song.current_song_time != song_time:
+                    song.current_song_time = song_time
+                harness.update_display()
+            elif kind == session_recorder.RECORD_PARAMETER:
+                parameter_path, value = data
+                parameter = session_recorder.path_parameter(song, parameter_path)
+                if parameter is not None and parameter.value != value:
+                    parameter.value = value
+            elif kind == session_recorder.RECORD_BUILD_MIDI_MAP:
+                harness.build_midi_map()
+            elif kind == session_recorder.RECORD_REFRESH_STATE:
+                harness.script.refresh_state()
+            elif kind == session_recorder.RECORD_CONNECT:
+                harness.connect_extensions()
+        harness.close()
+        logs = [os.path.join(output_dir, f) for f in os.listdir(output_dir)]
+        _, replayed_records = session_recorder.read_session(logs[0])
+    finally:
+        config.overrides.clear()
+        config.overrides.update(overrides)
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    recorded_output = output_by_tick(records)
+    replayed_output = output_by_tick(replayed_records)
+    intervals = summarize_timings(frame_intervals[1:])
+    report = {'log': os.path.abspath(path),
+              'recorded_at': description.get('recorded'),
+              'tracks': len(description['tracks']),
+              'extensions': [left, right],
+              'ticks': harness.ticks,
+              'recorded': dict(count_output(recorded_output),
+                               frame_interval_ms={'p50': intervals['p50_us'] / 1000.0,
+                                                  'p99': intervals['p99_us'] / 1000.0,
+                                                  'max': intervals['max_us'] / 1000.0}),
+              'replayed': count_output(replayed_output),
+              'output_diff': diff_output(recorded_output, replayed_output,
+                                         max_ticks_shown)}
+    for entry_point in ENTRY_POINTS:
+        report['replayed'][entry_point] = summarize_timings(harness.timings[entry_point])
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('log', help='a .p1ns session log')
+    parser.add_argument('--profile', action='store_true',
+                        help='run the replay with the tick profiler enabled')
+    parser.add_argument('--out', help='also write the report to this JSON file')
+    parser.add_argument('--show', type=int, default=10,
+                        help='number of differing ticks to show')
+    parser.add_argument('--check', action='store_true',
+                        help='exit with 1 when the replayed output differs (only meaningful '
+                             'for sessions that did not change the set: added, deleted or '
+                             'moved tracks, returns and devices are not recorded)')
+    args = parser.parse_args(argv)
+
+    report = replay(args.log, args.profile, args.show)
+    recorded = report['recorded']
+    replayed = report['replayed']
+    print('{} ticks, {} tracks, recorded frame interval p50 {:.1f} ms p99 {:.1f} ms '
+          'max {:.1f} ms'.format(report['ticks'], report['tracks'],
+                                 recorded['frame_interval_ms']['p50'],
+                                 recorded['frame_interval_ms']['p99'],
+                                 recorded['frame_interval_ms']['max']))
+    for entry_point in ENTRY_POINTS:
+        timings = replayed[entry_point]
+        print('{:15} {:7d} calls  p50 {:8.1f} us  p99 {:8.1f} us  max {:8.1f} us'.format(
+            entry_point, timings['calls'], timings['p50_us'], timings['p99_us'],
+            timings['max_us']))
+    print('output: recorded {} msgs {} bytes, replayed {} msgs {} bytes'.format(
+        recorded['midi_messages'], recorded['midi_bytes'],
+        replayed['midi_messages'], replayed['midi_bytes']))
+    diff = report['output_diff']
+    print('{} ticks with different output'.format(diff['differing_ticks']))
+    for d in diff['first_differences']:
+        print('  tick {tick}: recorded {recorded}, replayed {replayed}'.format(**d) +
+              (' (same messages, other order)' if d['reordered'] else ''))
+        for m in d['missing']:
+            print('    - ' + m)
+        for m in d['extra']:
+            print('    + ' + m)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print('written to ' + os.path.abspath(args.out))
+    if args.check and diff['differing_ticks']:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
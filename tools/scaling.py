@@ -0,0 +1,192 @@
+"""
+    Scaling benchmark: how the cost of each entry point grows with the set.
+
+    Three sweeps, each varying one dimension while the others stay at their
+    baseline (100 tracks, 2 returns, no XT):
+
+        tracks      number of (visible) tracks, 10 to 2000
+        returns     return tracks, 0 to 12, this moves the TGE send/plugin split
+        extensions  stacked MackieControlXTs, 0 to 3
+
+    For every point the same workload is run: startup, connecting the
+    extensions, select/solo/arm buttons (exclusive solo and arm walk all
+    tracks), adding and deleting tracks and plain ticks. Mean and p99 per entry
+    point go to a JSON file and are plotted as ASCII charts, and also as a PNG
+    when matplotlib is installed.
+
+    The script runs with the tick profiler, so each point also has the self
+    time of every profiler slot (tick tasks, receive_midi handler groups,
+    deferred jobs, the strip reassignments, the rude solo LED, ...), with the
+    numbered slots of the strips added up. The paths that cost most at the
+    largest point of a sweep are charted below its entry points:
+
+        python scaling.py --out scaling.json --png scaling.png
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import re
+import sys
+import time
+
+from harness import ScriptHarness, build_song, pin_default_settings
+from bench import percentile
+
+SWEEPS = {'tracks': (10, 50, 100, 250, 500, 1000, 2000),
+          'returns': (0, 1, 2, 4, 6, 8, 12),
+          'extensions': (0, 1, 2, 3)}
+BASELINE = {'tracks': 100, 'returns': 2, 'extensions': 0}
+ENTRY_POINTS = ('startup', 'connect_script_instances', 'receive_midi',
+                'update_display', 'build_midi_map', 'tracks_changed')
+NUM_CHARTED_PATHS = 10
+
+
+def timed(timings, kind, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    timings.setdefault(kind, []).append(time.perf_counter() - start)
+    return result
+
+
+def run_point(tracks, returns, extensions, repeat, rng):
+    song = build_song(num_tracks=tracks, num_returns=returns, devices_per_track=1)
+    harness = ScriptHarness(song, left_extensions=extensions // 2,
+                            right_extensions=extensions - extensions // 2)
+    timings = {}
+    harness.record_timings()
+    timed(timings, 'startup', harness.start)
+    harness.tick(5)
+    c = harness.consts()
+    for _ in range(repeat):
+        strip = rng.randrange(c.NUM_CHANNEL_STRIPS)
+        harness.click(c.SID_SELECT_BASE + strip)
+        harness.click(c.SID_SOLO_BASE + strip)
+        harness.click(c.SID_RECORD_ARM_BASE + strip)
+        harness.tick()
+        timed(timings, 'tracks_changed', song.add_track)
+        harness.tick()
+        timed(timings, 'tracks_changed', song.delete_track, len(song.tracks) - 1)
+        harness.tick(3)
+    paths = profiled_paths(harness.script.tick_profiler())
+    with contextlib.redirect_stderr(io.StringIO()):
+        # without the profiler's report
+        harness.close()
+    for kind, durations in harness.timings.items():
+        timings.setdefault(kind, []).extend(durations)
+    result = {}
+    for kind in ENTRY_POINTS:
+        values = sorted(timings.get(kind, ()))
+        result[kind] = {'calls': len(values),
+                        'mean_us': round(sum(values) / len(values) * 1e6, 1) if values else 0.0,
+                        'p99_us': round(percentile(values, 0.99) * 1e6, 1)}
+    return result, paths
+
+
+def profiled_paths(profiler):
+    """ {slot name: calls, total and mean self time}, the strips' numbered slots added up """
+    totals = {}
+    for name in profiler.slot_names():
+        calls, seconds, _ = profiler.statistics(name)
+        if calls:
+            path = re.sub(r' \d+$', '', name)
+            previous_calls, previous_seconds = totals.get(path, (0, 0.0))
+            totals[path] = (previous_calls + calls, previous_seconds + seconds)
+    return {path: {'calls': calls, 'total_ms': round(seconds * 1e3, 3),
+                   'mean_us': round(seconds / calls * 1e6, 1)}
+            for path, (calls, seconds) in totals.items()}
+
+
+def run_sweeps(sweeps, repeat, seed):
+    results = {}
+    for sweep in sweeps:
+        points = []
+        for value in SWEEPS[sweep]:
+            config = dict(BASELINE)
+            config[sweep] = value
+            point, paths = run_point(config['tracks'], config['returns'],
+                                     config['extensions'], repeat, random.Random(seed))
+            points.append({'value': value, 'entry_points': point, 'paths': paths})
+            sys.stderr.write('{} = {} done\n'.format(sweep, value))
+        results[sweep] = points
+    return results
+
+
+def ascii_chart(sweep, points, width=50):
+    lines = ['', '{} (mean per call, us)'.format(sweep)]
+    for kind in ENTRY_POINTS:
+        means = [p['entry_points'][kind]['mean_us'] for p in points]
+        top = max(means) or 1.0
+        lines.append('  ' + kind)
+        for point, mean in zip(points, means):
+            bar = '#' * max(1 if mean else 0, int(round(mean / top * width)))
+            lines.append('    {:>6} | {:<{}} {:.1f}'.format(point['value'], bar, width, mean))
+    return '\n'.join(lines)
+
+
+def paths_table(sweep, points):
+    last = points[-1]['paths']
+    paths = sorted(last, key=lambda path: last[path]['total_ms'],
+                   reverse=True)[:NUM_CHARTED_PATHS]
+    lines = ['', '{}: paths (total self time of the workload, ms, top {} at {})'.format(
+        sweep, len(paths), points[-1]['value']),
+        '  {:50}'.format('') + ''.join('{:>9}'.format(p['value']) for p in points)]
+    for path in paths:
+        lines.append('  {:50}'.format(path[:50]) + ''.join(
+            '{:>9.2f}'.format(p['paths'].get(path, {}).get('total_ms', 0.0)) for p in points))
+    return '\n'.join(lines)
+
+
+def write_png(results, path):
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        sys.stderr.write('matplotlib is not installed, skipping ' + path + '\n')
+        return False
+    figure, axes = plt.subplots(1, len(results), figsize=(6 * len(results), 4.5),
+                                squeeze=False)
+    for axis, (sweep, points) in zip(axes[0], sorted(results.items())):
+        values = [p['value'] for p in points]
+        for kind in ENTRY_POINTS:
+            axis.plot(values, [p['entry_points'][kind]['mean_us'] for p in points],
+                      marker='o', label=kind)
+        axis.set_xlabel(sweep)
+        axis.set_ylabel('mean us per call')
+        axis.set_yscale('symlog')
+        axis.grid(True, alpha=0.3)
+    axes[0][0].legend(fontsize='small')
+    figure.tight_layout()
+    figure.savefig(path)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sweep', action='append', choices=sorted(SWEEPS),
+                        help='run only this sweep (repeatable)')
+    parser.add_argument('--repeat', type=int, default=40,
+                        help='workload iterations per point')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', default='scaling_results.json')
+    parser.add_argument('--png', help='also plot to this file (needs matplotlib)')
+    args = parser.parse_args(argv)
+    # the profiler logs nothing while running, its slots are read per point
+    pin_default_settings(tick_profiler_enabled=True, tick_profiler_slow_tick_ms=1e9)
+
+    results = run_sweeps(args.sweep or sorted(SWEEPS), args.repeat, args.seed)
+    with open(args.out, 'w') as f:
+        json.dump({'baseline': BASELINE, 'repeat': args.repeat, 'seed': args.seed,
+                   'sweeps': results}, f, indent=2, sort_keys=True)
+    for sweep, points in sorted(results.items()):
+        print(ascii_chart(sweep, points))
+        print(paths_table(sweep, points))
+    if args.png:
+        write_png(results, args.png)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+    Builds large, production shaped sets in the Live stand-in from a seed and a
+    few size knobs: nested (partly folded) group tracks, MIDI and audio tracks,
+    returns, devices drawn from the '_Generic.Devices' classes with realistic
+    parameter counts, clips, scenes and cue points.
+
+        from setgen import generate_set
+        song = generate_set(seed=7, preset='huge')
+
+        python setgen.py --preset huge --seed 7      prints what was generated
+
+    Device parameters are only created when something first looks at a
+    device's 'parameters', so sets with tens of thousands of devices stay cheap
+    to build as long as the script only opens some of them.
+"""
+import argparse
+import random
+import sys
+import time
+
+from harness import Live  # the stand-in, put on the path by harness
+
+from _Generic.Devices import DEVICE_DICT  # noqa: E402
+
+# class name: (name in the browser, number of parameters, device type)
+DEVICE_CATALOGUE = {
+    'Eq8': ('EQ Eight', 86, Live.Device.DeviceType.audio_effect),
+    'Compressor2': ('Compressor', 26, Live.Device.DeviceType.audio_effect),
+    'GlueCompressor': ('Glue Compressor', 11, Live.Device.DeviceType.audio_effect),
+    'AutoFilter': ('Auto Filter', 31, Live.Device.DeviceType.audio_effect),
+    'Reverb': ('Reverb', 33, Live.Device.DeviceType.audio_effect),
+    'Delay': ('Delay', 26, Live.Device.DeviceType.audio_effect),
+    'Saturator': ('Saturator', 18, Live.Device.DeviceType.audio_effect),
+    'StereoGain': ('Utility', 12, Live.Device.DeviceType.audio_effect),
+    'AudioEffectGroupDevice': ('Audio Effect Rack', 17, Live.Device.DeviceType.audio_effect),
+    'PluginDevice': ('VST Plug-in', 129, Live.Device.DeviceType.audio_effect),
+    'MidiArpeggiator': ('Arpeggiator', 14, Live.Device.DeviceType.midi_effect),
+    'OriginalSimpler': ('Simpler', 69, Live.Device.DeviceType.instrument),
+    'Operator': ('Operator', 190, Live.Device.DeviceType.instrument),
+    'InstrumentGroupDevice': ('Instrument Rack', 17, Live.Device.DeviceType.instrument),
+}
+
+PRESETS = {
+    'small': dict(num_tracks=64, num_returns=4, devices_per_track=4, num_scenes=16,
+                  num_cue_points=8),
+    'production': dict(num_tracks=200, num_returns=8, devices_per_track=12,
+                       num_scenes=64, num_cue_points=24),
+    'huge': dict(num_tracks=1000, num_returns=12, devices_per_track=40, num_scenes=400,
+                 num_cue_points=60),
+}
+
+
+class GeneratedDevice(Live.Device.Device):
+    """ A device whose parameters are created on first access """
+
+    def __init__(self, name, class_name, device_type, parameter_names, seed):
+        Live.Device.Device.__init__(self, name, class_name, type=device_type)
+        object.__setattr__(self, '_parameters', None)
+        object.__setattr__(self, '_parameter_names', parameter_names)
+        object.__setattr__(self, '_seed', seed)
+
+    @property
+    def parameters(self):
+        if self._parameters is None:
+            rng = random.Random(self._seed)
+            parameters = [Live.DeviceParameter.DeviceParameter(
+                'Device On', 1.0, 0.0, 1.0, is_quantized=True, value_items=('Off', 'On'))]
+            for name in self._parameter_names:
+                if rng.random() < 0.15:
+                    parameters.append(Live.DeviceParameter.DeviceParameter(
+                        name, float(rng.randrange(4)), 0.0, 3.0, is_quantized=True,
+                        value_items=('A', 'B', 'C', 'D')))
+                else:
+                    parameters.append(Live.DeviceParameter.DeviceParameter(name, rng.random()))
+            object.__setattr__(self, '_parameters', parameters)
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, parameters):
+        object.__setattr__(self, '_parameters', list(parameters))
+        self.notify('parameters')
+
+
+def parameter_names(class_name, count):
+    """ The bank parameters of '_Generic.Devices' first, then numbered ones """
+    names = []
+    for bank in DEVICE_DICT.get(class_name, ()):
+        for name in bank:
+            if name and name not in names:
+                names.append(name)
+    number = 1
+    while len(names) < count - 1:
+        names.append('Parameter {}'.format(number))
+        number += 1
+    return tuple(names)
+
+
+def device_classes():
+    """ Every class of DEVICE_DICT and the catalogue, with its catalogue entry """
+    classes = {}
+    for class_name in sorted(set(DEVICE_DICT) | set(DEVICE_CATALOGUE)):
+        name, count, device_type = DEVICE_CATALOGUE.get(
+            class_name, (class_name, 1 + 8 * len(DEVICE_DICT.get(class_name, ())),
+                         Live.Device.DeviceType.audio_effect))
+        classes[class_name] = (name, device_type, parameter_names(class_name, count))
+    return classes
+
+
+def make_devices(rng, classes, count, is_midi_track):
+    by_type = {}
+    for class_name, entry in classes.items():
+        by_type.setdefault(entry[1], []).append(class_name)
+    chosen = []
+    if is_midi_track and count:
+        if by_type.get(Live.Device.DeviceType.midi_effect) and rng.random() < 0.3:
+            chosen.append(rng.choice(by_type[Live.Device.DeviceType.midi_effect]))
+        chosen.append(rng.choice(by_type[Live.Device.DeviceType.instrument]))
+    effects = by_type[Live.Device.DeviceType.audio_effect]
+    while len(chosen) < count:
+        chosen.append(rng.choice(effects))
+    devices = []
+    for class_name in chosen[:count]:
+        name, device_type, names = classes[class_name]
+        devices.append(GeneratedDevice(name, class_name, device_type, names,
+                                       rng.getrandbits(32)))
+    return devices
+
+
+def generate_set(seed=1, preset=None, num_tracks=100, num_returns=4, devices_per_track=8,
+                 num_scenes=32, num_cue_points=16, group_probability=0.08,
+                 max_group_depth=3, folded_fraction=0.3, midi_fraction=0.4,
+                 clip_density=0.15):
+    """
+        A new stand-in song. 'preset' (see PRESETS) sets the size knobs, keyword
+        arguments that are passed as well override it. Group tracks count as
+        tracks; roughly 'folded_fraction' of them start folded.
+    """
+    knobs = dict(num_tracks=num_tracks, num_returns=num_returns,
+                 devices_per_track=devices_per_track, num_scenes=num_scenes,
+                 num_cue_points=num_cue_points)
+    if preset is not None:
+        knobs.update(PRESETS[preset])
+    rng = random.Random(seed)
+    classes = device_classes()
+    song = Live.Song.Song()
+    for _ in range(knobs['num_returns']):
+        track = song.add_return_track()
+        track.devices = make_devices(rng, classes, rng.randint(1, 3), False)
+    for _ in range(knobs['num_scenes']):
+        song.add_scene()
+
+    groups = []
+    open_groups = []
+    tracks = []
+    for i in range(knobs['num_tracks']):
+        while open_groups and rng.random() < 0.15:
+            open_groups.pop()
+        parent = open_groups[-1] if open_groups else None
+        color = rng.getrandbits(24)
+        if len(open_groups) < max_group_depth and rng.random() < group_probability:
+            track = Live.Track.Track(song, '{}-Group'.format(i + 1), can_be_armed=False,
+                                     color=color, is_foldable=True, group_track=parent,
+                                     num_sends=len(song.return_tracks),
+                                     num_scenes=len(song.scenes))
+            track.devices = make_devices(rng, classes, rng.randint(0, 2), False)
+            groups.append(track)
+            open_groups.append(track)
+        else:
+            is_midi = rng.random() < midi_fraction
+            track = Live.Track.Track(song, '{}-{}'.format(i + 1, 'MIDI' if is_midi else 'Audio'),
+                                     has_midi_input=is_midi, color=color, group_track=parent,
+                                     num_sends=len(song.return_tracks),
+                                     num_scenes=len(song.scenes))
+            track.devices = make_devices(rng, classes, knobs['devices_per_track'], is_midi)
+            for clip_slot in track.clip_slots:
+                if rng.random() < clip_density:
+                    clip_slot.create_clip(float(rng.choice((1, 2, 4, 8, 16))))
+        tracks.append(track)
+    song.tracks = tracks
+    for group in groups:
+        if rng.random() < folded_fraction:
+            group._fold_state = True
+    song._update_visible_tracks()
+
+    length = max(64.0, knobs['num_scenes'] * 16.0)
+    song.song_length = length
+    song.cue_points = [Live.Song.CuePoint(song, time, 'Cue {}'.format(n + 1))
+                       for n, time in enumerate(sorted(
+                           float(rng.randrange(int(length))) for _ in range(
+                               knobs['num_cue_points'])))]
+    song.view.selected_track = song.visible_tracks[0] if song.visible_tracks \
+        else song.master_track
+    return song
+
+
+def describe(song):
+    tracks = list(song.tracks)
+    devices = [d for t in tracks + list(song.return_tracks) for d in t.devices]
+    return {'tracks': len(tracks),
+            'visible_tracks': len(song.visible_tracks),
+            'group_tracks': sum(1 for t in tracks if t.is_foldable),
+            'folded_groups': sum(1 for t in tracks if t.is_foldable and t.fold_state),
+            'max_group_depth': max([depth(t) for t in tracks] or [0]),
+            'return_tracks': len(song.return_tracks),
+            'scenes': len(song.scenes),
+            'clips': sum(1 for t in tracks for s in t.clip_slots if s.has_clip),
+            'cue_points': len(song.cue_points),
+            'devices': len(devices),
+            'device_classes': len(set(d.class_name for d in devices))}
+
+
+def depth(track):
+    level = 0
+    group = track.group_track
+    while group is not None:
+        level += 1
+        group = group.group_track
+    return level
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='production')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    song = generate_set(args.seed, args.preset)
+    elapsed = time.perf_counter() - start
+    for key, value in describe(song).items():
+        print('{:16} {}'.format(key, value))
+    print('built in {:.2f} s'.format(elapsed))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+    Soak test: hours of (simulated) randomized input and set mutations through
+    the script on the Live stand-in, watching for memory and listener leaks.
+
+        python soak.py --hours 4 --seed 3
+        python soak.py --hours 0.5 --preset production --no-tracemalloc
+
+    The set is generated by setgen.py. Mutations are balanced (tracks, devices
+    and returns are added and deleted around a fixed count), so in a leak free
+    script the number of connected listeners and the traced memory level off
+    after a warm-up. Every '--sample-minutes' of simulated time both are
+    sampled; the run fails when the lowest value of every window after the
+    warm-up is higher than the one of the window before (monotonic growth).
+    Every '--reload-minutes' the script is disconnected and loaded again, like
+    Live does when the set is switched, and the run fails when listeners are
+    still connected after a disconnect. On memory growth the allocation sites
+    that grew most are listed.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from harness import SCRIPT_DIR, TOOLS_DIR, ScriptHarness, pin_default_settings
+from setgen import PRESETS, generate_set
+
+import Live  # noqa: E402
+from Live.Base import listener_count  # noqa: E402
+
+TICKS_PER_MINUTE = 600
+WINDOWS = 5
+MIN_MEMORY_GROWTH = 256 * 1024
+
+
+class Soak(object):
+    """ Random input and set mutations, one 'step' per display tick """
+
+    def __init__(self, song, rng):
+        self.song = song
+        self.rng = rng
+        self.harness = None
+        self.c = None
+        self.num_tracks = len(song.tracks)
+        self.num_returns = len(song.return_tracks)
+        self.actions = (
+            (30, self.press_select), (20, self.turn_vpots), (10, self.turn_jog_wheel),
+            (10, self.press_navigation), (4, self.change_mode), (6, self.page),
+            (6, self.press_vpot), (2, self.flip), (1, self.toggle_meters),
+            (2, self.transport), (8, self.move_fader), (3, self.add_or_delete_track),
+            (3, self.add_or_delete_device), (2, self.rename_device), (2, self.fold_group),
+            (1, self.add_or_delete_return), (3, self.select_in_live), (2, self.solo))
+        self.weights = [w for w, _ in self.actions]
+
+    def start(self):
+        self.harness = ScriptHarness(self.song)
+        self.c = self.harness.consts()
+        self.harness.start()
+        self.harness.tick(40)
+        self.harness.c_instance.take_sent_midi()
+
+    def step(self):
+        if self.rng.random() < 0.6:
+            self.rng.choices(self.actions, self.weights)[0][1]()
+        self.harness.tick()
+        self.harness.c_instance.take_sent_midi()
+
+    def strip(self):
+        return self.rng.randrange(self.c.NUM_CHANNEL_STRIPS)
+
+    def press_select(self):
+        self.harness.click(self.c.SID_SELECT_BASE + self.strip())
+
+    def turn_vpots(self):
+        for strip in range(self.c.NUM_CHANNEL_STRIPS):
+            self.harness.turn_vpot(strip, self.rng.choice((1, 2, -1, -2)))
+
+    def turn_jog_wheel(self):
+        self.harness.turn_jog_wheel(self.rng.choice((1, 3, -1, -3)))
+
+    def press_navigation(self):
+        c = self.c
+        self.harness.click(self.rng.choice((
+            c.SID_JOG_CURSOR_UP, c.SID_JOG_CURSOR_DOWN, c.SID_JOG_CURSOR_LEFT,
+            c.SID_JOG_CURSOR_RIGHT, c.SID_FADERBANK_PREV_BANK, c.SID_FADERBANK_NEXT_BANK,
+            c.SID_FADERBANK_PREV_CH, c.SID_FADERBANK_NEXT_CH, c.SID_FADERBANK_EDIT)))
+
+    def change_mode(self):
+        c = self.c
+        self.harness.click(self.rng.choice((
+            c.SID_ASSIGNMENT_IO, c.SID_ASSIGNMENT_SENDS, c.SID_ASSIGNMENT_PAN,
+            c.SID_ASSIGNMENT_PLUG_INS, c.SID_SOFTWARE_F1)))
+
+    def page(self):
+        self.harness.click(self.rng.choice((self.c.SID_ASSIGNMENT_EQ,
+                                            self.c.SID_ASSIGNMENT_DYNAMIC)))
+
+    def press_vpot(self):
+        self.harness.click(self.c.SID_VPOD_PUSH_BASE + self.strip())
+
+    def flip(self):
+        self.harness.click(self.c.SID_FADERBANK_FLIP)
+
+    def toggle_meters(self):
+        self.harness.click(self.c.SID_DISPLAY_NAME_VALUE)
+
+    def transport(self):
+        self.harness.click(self.rng.choice((self.c.SID_TRANSPORT_PLAY,
+                                            self.c.SID_TRANSPORT_STOP)))
+
+    def move_fader(self):
+        self.harness.move_fader(self.strip(), self.rng.random())
+
+    def add_or_delete_track(self):
+        tracks = self.song.tracks
+        if len(tracks) > self.num_tracks or self.rng.random() < 0.5:
+            deletable = [i for i, t in enumerate(tracks) if not t.is_foldable]
+            if len(deletable) > 1:
+                self.song.delete_track(self.rng.choice(deletable))
+                return
+        self.song.add_track(index=self.rng.randrange(len(tracks) + 1))
+
+    def add_or_delete_device(self):
+        track = self.rng.choice(self.song.tracks)
+        devices = list(track.devices)
+        if devices and (len(devices) > 4 or self.rng.random() < 0.5):
+            track.delete_device(self.rng.randrange(len(devices)))
+        else:
+            donor = self.rng.choice(self.song.tracks).devices
+            if donor:
+                device = self.rng.choice(donor)
+                copy = Live.Device.Device(device.name, device.class_name,
+                                          [Live.DeviceParameter.DeviceParameter(
+                                              p.name, p.value, p.min, p.max,
+                                              is_quantized=p.is_quantized,
+                                              value_items=p.value_items)
+                                           for p in device.parameters])
+                devices.insert(self.rng.randrange(len(devices) + 1), copy)
+                track.devices = devices
+
+    def rename_device(self):
+        devices = self.song.view.selected_track.devices
+        if devices:
+            device = self.rng.choice(devices)
+            device.name = '{} {}'.format(device.class_name, self.rng.randrange(100))
+
+    def fold_group(self):
+        groups = [t for t in self.song.tracks if t.is_foldable]
+        if groups:
+            group = self.rng.choice(groups)
+            group.fold_state = not group.fold_state
+
+    def add_or_delete_return(self):
+        if len(self.song.return_tracks) > self.num_returns:
+            self.song.delete_return_track(self.rng.randrange(len(self.song.return_tracks)))
+        else:
+            self.song.add_return_track()
+
+    def select_in_live(self):
+        self.song.view.selected_track = self.rng.choice(self.song.visible_tracks)
+
+    def solo(self):
+        track = self.rng.choice(self.song.visible_tracks)
+        track.solo = not track.solo
+
+
+def window_minima(samples, warm_up):
+    values = samples[warm_up:]
+    size = max(1, len(values) // WINDOWS)
+    return [min(values[i:i + size]) for i in range(0, size * WINDOWS, size)
+            if values[i:i + size]]
+
+
+def grows_monotonically(minima, min_growth):
+    return len(minima) > 1 and all(b > a for a, b in zip(minima, minima[1:])) and \
+        minima[-1] - minima[0] > min_growth
+
+
+def top_growth(first, last, count=10):
+    """ Allocation sites in the script's files that grew most between two snapshots """
+    script_filter = [tracemalloc.Filter(True, os.path.join(SCRIPT_DIR, '*')),
+                     tracemalloc.Filter(False, os.path.join(TOOLS_DIR, '*'))]
+    stats = last.filter_traces(script_filter).compare_to(
+        first.filter_traces(script_filter), 'lineno')
+    return [str(s) for s in stats[:count] if s.size_diff > 0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hours', type=float, default=1.0,
+                        help='simulated hours (36000 display ticks per hour)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small')
+    parser.add_argument('--sample-minutes', type=float, default=1.0)
+    parser.add_argument('--reload-minutes', type=float, default=20.0,
+                        help='simulated minutes between reloads of the script')
+    parser.add_argument('--warm-up', type=float, default=0.2,
+                        help='fraction of the run ignored when judging growth')
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help='only watch the listener count (runs a lot faster)')
+    args = parser.parse_args(argv)
+    pin_default_settings()
+
+    rng = random.Random(args.seed)
+    song = generate_set(seed=args.seed, preset=args.preset)
+    listeners_before = listener_count()
+    trace = not args.no_tracemalloc
+    if trace:
+        tracemalloc.start()
+    soak = Soak(song, rng)
+    soak.start()
+
+    sample_ticks = max(1, int(args.sample_minutes * TICKS_PER_MINUTE))
+    total_ticks = int(args.hours * 60 * TICKS_PER_MINUTE)
+    reload_ticks = max(1, int(args.reload_minutes * TICKS_PER_MINUTE))
+    failures = []
+    listener_samples = []
+    memory_samples = []
+    snapshots = []
+    start = time.perf_counter()
+    for tick in range(1, total_ticks + 1):
+        soak.step()
+        if tick % reload_ticks == 0 and tick < total_ticks:
+            soak.harness.close()
+            if listener_count() != listeners_before:
+                failures.append('{} listeners still connected after the disconnect at '
+                                '{:.2f} h'.format(listener_count() - listeners_before,
+                                                  tick / (60.0 * TICKS_PER_MINUTE)))
+            soak.start()
+        if tick % sample_ticks == 0:
+            gc.collect()
+            listener_samples.append(listener_count())
+            if trace:
+                memory_samples.append(tracemalloc.get_traced_memory()[0])
+                if len(memory_samples) == int(args.warm_up * total_ticks / sample_ticks) + 1:
+                    snapshots.append(tracemalloc.take_snapshot())
+            print('{:7.2f} h  {:7d} listeners  {:9.0f} KB traced  {:5d} tracks'.format(
+                tick / (60.0 * TICKS_PER_MINUTE), listener_samples[-1],
+                memory_samples[-1] / 1024.0 if trace else 0.0, len(song.tracks)))
+    if trace:
+        snapshots.append(tracemalloc.take_snapshot())
+    soak.harness.close()
+    gc.collect()
+    listeners_after = listener_count()
+    print('{:.0f} s for {} ticks'.format(time.perf_counter() - start, total_ticks))
+
+    warm_up = int(args.warm_up * len(listener_samples))
+    minima = window_minima(listener_samples, warm_up)
+    if grows_monotonically(minima, 0):
+        failures.append('listener count grows: window minima {}'.format(minima))
+    if listeners_after != listeners_before:
+        failures.append('{} listeners still connected after disconnect'.format(
+            listeners_after - listeners_before))
+    if trace:
+        minima = window_minima(memory_samples, warm_up)
+        if grows_monotonically(minima, MIN_MEMORY_GROWTH):
+            failures.append('traced memory grows: window minima {} KB\n  {}'.format(
+                [m // 1024 for m in minima],
+                '\n  '.join(top_growth(snapshots[0], snapshots[-1]))))
+        tracemalloc.stop()
+    if failures:
+        print('FAILED:\n' + '\n'.join(failures))
+        return 1
+    print('no growth of listeners or memory')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+    Stand-in for Live.Application. 'get_application' returns a process wide
+    singleton like Live does, 'reset_application' gives the harness a fresh
+    one between runs.
+"""
+from .Base import LiveObject
+
+VIEW_NAMES = ('Browser', 'Arranger', 'Session', 'Detail', 'Detail/Clip',
+              'Detail/DeviceChain')
+
+
+class ApplicationView(LiveObject):
+    _listenable = ('focused_document_view', 'browse_mode')
+
+    class NavDirection(object):
+        up = 0
+        down = 1
+        left = 2
+        right = 3
+
+    def __init__(self):
+        LiveObject.__init__(self)
+        self.__visible = {'Arranger': True, 'Detail': True, 'Detail/Clip': True,
+                          'Browser': True}
+        self.__view_listeners = {}
+        self.focused_document_view = 'Arranger'
+        self.browse_mode = False
+        self.zoom_count = 0
+        self.scroll_count = 0
+        self.__song = None
+
+    def attach_song(self, song):
+        """ Lets scrolling the Arranger/Session move the selection, like Live """
+        self.__song = song
+
+    def __check_view_name(self, view_name):
+        if view_name and view_name not in VIEW_NAMES:
+            raise RuntimeError('Unknown view name: {}'.format(view_name))
+
+    def is_view_visible(self, view_name, main_window_only=True):
+        self.__check_view_name(view_name)
+        return self.__visible.get(view_name, False)
+
+    def show_view(self, view_name):
+        self.__check_view_name(view_name)
+        if view_name in ('Session', 'Arranger'):
+            other = 'Arranger' if view_name == 'Session' else 'Session'
+            self.__set_visible(other, False)
+            self.focused_document_view = view_name
+        elif view_name in ('Detail/Clip', 'Detail/DeviceChain'):
+            other = 'Detail/DeviceChain' if view_name == 'Detail/Clip' else 'Detail/Clip'
+            self.__set_visible(other, False)
+            self.__set_visible('Detail', True)
+        self.__set_visible(view_name, True)
+
+    def hide_view(self, view_name):
+        self.__check_view_name(view_name)
+        if view_name in ('Session', 'Arranger'):
+            # one of the two document views is always visible
+            self.show_view('Arranger' if view_name == 'Session' else 'Session')
+        else:
+            self.__set_visible(view_name, False)
+
+    def focus_view(self, view_name):
+        self.show_view(view_name)
+
+    def scroll_view(self, direction, view_name, modifier_pressed):
+        self.__check_view_name(view_name)
+        self.scroll_count += 1
+        song = self.__song
+        if song is None:
+            return
+        if direction in (self.NavDirection.up, self.NavDirection.down):
+            if view_name == 'Session' or (not view_name and self.__visible.get('Session')):
+                items, selected = song.scenes, song.view.selected_scene
+                attribute = 'selected_scene'
+            else:
+                items, selected = song.visible_tracks, song.view.selected_track
+                attribute = 'selected_track'
+            step = -1 if direction == self.NavDirection.up else 1
+        else:
+            if self.__visible.get('Session'):
+                items, selected = song.visible_tracks, song.view.selected_track
+                attribute = 'selected_track'
+                step = -1 if direction == self.NavDirection.left else 1
+            else:
+                return
+        if items:
+            index = items.index(selected) + step if selected in items else 0
+            setattr(song.view, attribute, items[min(len(items) - 1, max(0, index))])
+
+    def zoom_view(self, direction, view_name, modifier_pressed):
+        self.__check_view_name(view_name)
+        self.zoom_count += 1
+
+    def add_is_view_visible_listener(self, view_name, listener):
+        self.__check_view_name(view_name)
+        listeners = self.__view_listeners.setdefault(view_name, [])
+        if listener in listeners:
+            raise RuntimeError('Listener already connected')
+        listeners.append(listener)
+
+    def remove_is_view_visible_listener(self, view_name, listener):
+        listeners = self.__view_listeners.get(view_name, [])
+        if listener not in listeners:
+            raise RuntimeError('Listener not connected')
+        listeners.remove(listener)
+
+    def is_view_visible_has_listener(self, view_name, listener):
+        return listener in self.__view_listeners.get(view_name, ())
+
+    def listener_count(self, prop=None):
+        count = LiveObject.listener_count(self, prop)
+        if prop is None or prop == 'is_view_visible':
+            count += sum(len(l) for l in self.__view_listeners.values())
+        return count
+
+    def __set_visible(self, view_name, visible):
+        if self.__visible.get(view_name, False) != visible:
+            self.__visible[view_name] = visible
+            for listener in tuple(self.__view_listeners.get(view_name, ())):
+                listener()
+
+
+class Application(LiveObject):
+    View = ApplicationView
+
+    def __init__(self):
+        LiveObject.__init__(self)
+        self.view = ApplicationView()
+        self.major_version = 12
+        self.minor_version = 0
+        self.bugfix_version = 0
+
+    def get_major_version(self):
+        return self.major_version
+
+    def get_minor_version(self):
+        return self.minor_version
+
+    def get_bugfix_version(self):
+        return self.bugfix_version
+
+
+_application = [None]
+
+
+def get_application():
+    if _application[0] is None:
+        _application[0] = Application()
+    return _application[0]
+
+
+def reset_application():
+    _application[0] = Application()
+    return _application[0]
@@ -0,0 +1,99 @@
+"""
+    Listener machinery shared by all stand-in Live objects.
+
+    Every name in a class' '_listenable' tuple gets Live style
+    'add_<name>_listener', 'remove_<name>_listener' and '<name>_has_listener'
+    methods, and assigning a new value to such an attribute notifies its
+    listeners synchronously (properties call 'notify' themselves). Like Live,
+    connecting a listener twice or removing one that is not connected raises a
+    RuntimeError, and a deleted object is false and equal to None.
+"""
+from functools import partial
+
+_MISSING = object()
+_listener_count = [0]
+
+
+def listener_count():
+    """ Number of listeners currently connected to any stand-in object """
+    return _listener_count[0]
+
+
+class LiveObject(object):
+    _listenable = ()
+
+    def __init__(self):
+        object.__setattr__(self, '_listeners', {})
+        object.__setattr__(self, '_valid', True)
+
+    def __bool__(self):
+        return self._valid
+
+    def __eq__(self, other):
+        # like Live, an object that was deleted compares equal to None
+        if other is None:
+            return not self._valid
+        return self is other
+
+    __hash__ = object.__hash__
+
+    def __setattr__(self, name, value):
+        # the first assignment (in __init__) and properties never notify here
+        old_value = self.__dict__.get(name, _MISSING) if name in self._listenable \
+            else _MISSING
+        object.__setattr__(self, name, value)
+        if old_value is not _MISSING and old_value is not value and old_value != value:
+            self.notify(name)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name.startswith('add_') and name.endswith('_listener'):
+            prop = name[4:-9]
+            if prop in self._listenable:
+                return partial(self._add_listener, prop)
+        elif name.startswith('remove_') and name.endswith('_listener'):
+            prop = name[7:-9]
+            if prop in self._listenable:
+                return partial(self._remove_listener, prop)
+        elif name.endswith('_has_listener'):
+            prop = name[:-13]
+            if prop in self._listenable:
+                return partial(self._has_listener, prop)
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            type(self).__name__, name))
+
+    def _add_listener(self, prop, listener):
+        listeners = self._listeners.setdefault(prop, [])
+        if listener in listeners:
+            raise RuntimeError('Listener already connected')
+        listeners.append(listener)
+        _listener_count[0] += 1
+
+    def _remove_listener(self, prop, listener):
+        listeners = self._listeners.get(prop, [])
+        if listener not in listeners:
+            raise RuntimeError('Listener not connected')
+        listeners.remove(listener)
+        _listener_count[0] -= 1
+
+    def _has_listener(self, prop, listener):
+        return listener in self._listeners.get(prop, ())
+
+    def listener_count(self, prop=None):
+        if prop is None:
+            return sum(len(l) for l in self._listeners.values())
+        return len(self._listeners.get(prop, ()))
+
+    def notify(self, prop):
+        listeners = self._listeners.get(prop)
+        if listeners:
+            for listener in tuple(listeners):
+                listener()
+
+    def _invalidate(self):
+        """ Simulate the object being deleted in Live """
+        for listeners in self._listeners.values():
+            _listener_count[0] -= len(listeners)
+        self._listeners.clear()
+        object.__setattr__(self, '_valid', False)
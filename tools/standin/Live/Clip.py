@@ -0,0 +1,26 @@
+from .Base import LiveObject
+
+
+class Clip(LiveObject):
+    _listenable = ('name', 'playing_status', 'color', 'is_recording')
+
+    def __init__(self, name='Clip', length=4.0):
+        LiveObject.__init__(self)
+        self.name = name
+        self.length = length
+        self.color = 0
+        self.is_recording = False
+        self.is_playing = False
+        self.is_triggered = False
+        self.playing_status = 0
+
+    def _set_state(self, is_playing, is_triggered):
+        self.is_playing = is_playing
+        self.is_triggered = is_triggered
+        self.playing_status = (1 if is_playing else 0) + (2 if is_triggered else 0)
+
+    def fire(self):
+        self._set_state(self.is_playing, True)
+
+    def stop(self):
+        self._set_state(False, False)
@@ -0,0 +1,48 @@
+from .Base import LiveObject
+from .Clip import Clip
+
+
+class ClipSlot(LiveObject):
+    _listenable = ('has_clip', 'playing_status', 'is_triggered', 'has_stop_button',
+                   'controls_other_clips')
+
+    def __init__(self, has_clip=False):
+        LiveObject.__init__(self)
+        self.clip = None
+        self.has_clip = False
+        self.playing_status = 0
+        self.is_triggered = False
+        self.has_stop_button = True
+        self.controls_other_clips = False
+        if has_clip:
+            self.create_clip(4.0)
+
+    def create_clip(self, length):
+        self.clip = Clip(length=length)
+        self.has_clip = True
+
+    def delete_clip(self):
+        if self.clip:
+            self.clip._invalidate()
+        self.clip = None
+        self.has_clip = False
+
+    def fire(self):
+        self.is_triggered = True
+        if self.clip:
+            self.clip.fire()
+        self.playing_status = 2
+
+    def stop(self):
+        self.is_triggered = False
+        if self.clip:
+            self.clip.stop()
+        self.playing_status = 0
+
+    def _launch_triggered(self):
+        """ Simulate the launch quantization elapsing """
+        if self.is_triggered:
+            self.is_triggered = False
+            if self.clip:
+                self.clip._set_state(True, False)
+            self.playing_status = 1
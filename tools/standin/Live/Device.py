@@ -0,0 +1,26 @@
+from .Base import LiveObject
+
+
+class DeviceType(object):
+    undefined = 0
+    instrument = 1
+    audio_effect = 2
+    midi_effect = 4
+
+
+class Device(LiveObject):
+    _listenable = ('name', 'parameters', 'is_active')
+
+    def __init__(self, name, class_name, parameters=(), type=DeviceType.audio_effect):
+        LiveObject.__init__(self)
+        self.canonical_parent = None
+        self.name = name
+        self.class_name = class_name
+        self.class_display_name = class_name
+        self.type = type
+        self.parameters = list(parameters)
+        for parameter in self.parameters:
+            parameter.canonical_parent = self
+        self.is_active = True
+        self.can_have_chains = False
+        self.can_have_drum_pads = False
@@ -0,0 +1,52 @@
+from .Base import LiveObject
+
+
+class ParameterState(object):
+    enabled = 0
+    irrelevant = 1
+    disabled = 2
+
+
+class DeviceParameter(LiveObject):
+    _listenable = ('value', 'name', 'state')
+
+    def __init__(self, name, value=0.0, min=0.0, max=1.0, default_value=None,
+                 is_quantized=False, value_items=(), unit=''):
+        LiveObject.__init__(self)
+        self.name = name
+        self.original_name = name
+        self.canonical_parent = None
+        self.min = min
+        self.max = max
+        self.default_value = value if default_value is None else default_value
+        self.is_quantized = is_quantized
+        self.value_items = tuple(value_items)
+        self.is_enabled = True
+        self.state = ParameterState.enabled
+        self.automation_state = 0
+        self._unit = unit
+        self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        if value < self.min or value > self.max:
+            raise RuntimeError('Invalid value')
+        if value != self._value:
+            self._value = value
+            self.notify('value')
+
+    def str_for_value(self, value):
+        if self.value_items:
+            return self.value_items[int(value) % len(self.value_items)]
+        if self._unit == 'dB':
+            if value <= 0.0:
+                return '-inf dB'
+            return '{:.1f} dB'.format((value - 0.85) * 70.0)
+        return '{:.2f}{}'.format(value, self._unit)
+
+    def __str__(self):
+        return self.str_for_value(self._value)
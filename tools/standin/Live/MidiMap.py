@@ -0,0 +1,96 @@
+"""
+    Stand-in for Live.MidiMap. The handle passed to 'build_midi_map' is a
+    'MidiMapHandle' which records every mapping and forward the script asks
+    for, so the harness can check and count them (and send the feedback Live
+    would send, see ScriptHarness' 'live_feedback').
+"""
+
+
+class MapMode(object):
+    absolute = 0
+    absolute_14_bit = 1
+    relative_signed_bit = 2
+    relative_signed_bit2 = 3
+    relative_binary_offset = 4
+    relative_two_compliment = 5
+    relative_smooth_signed_bit = 6
+    relative_smooth_signed_bit2 = 7
+    relative_smooth_binary_offset = 8
+    relative_smooth_two_compliment = 9
+
+
+class CCFeedbackRule(object):
+
+    def __init__(self):
+        self.channel = 0
+        self.cc_no = 0
+        self.cc_value_map = ()
+        self.delay_in_ms = 0
+
+
+class PitchBendFeedbackRule(object):
+
+    def __init__(self):
+        self.channel = 0
+        self.value_pair_map = ()
+        self.delay_in_ms = 0
+
+
+class MidiMapHandle(object):
+
+    def __init__(self):
+        self.parameter_mappings = []
+        self.feedback_rules = []
+        self.note_forwards = []
+        self.cc_forwards = []
+        self.pitchbend_forwards = []
+        self.feedback_requests = []
+
+    def mapped_parameters(self):
+        return [m[0] for m in self.parameter_mappings]
+
+
+def _check_channel(channel):
+    if not 0 <= channel <= 15:
+        raise ValueError('MIDI channel out of range: {}'.format(channel))
+
+
+def map_midi_cc_with_feedback_map(midi_map_handle, parameter, channel, cc_no,
+                                  map_mode, feedback_rule, avoid_takeover,
+                                  sensitivity=1.0):
+    _check_channel(channel)
+    midi_map_handle.parameter_mappings.append(
+        (parameter, 'cc', channel, cc_no, map_mode, sensitivity))
+    midi_map_handle.feedback_rules.append((parameter, feedback_rule))
+    return True
+
+
+def map_midi_pitchbend_with_feedback_map(midi_map_handle, parameter, channel,
+                                         feedback_rule, avoid_takeover):
+    _check_channel(channel)
+    midi_map_handle.parameter_mappings.append(
+        (parameter, 'pitchbend', channel, None, MapMode.absolute_14_bit, 1.0))
+    midi_map_handle.feedback_rules.append((parameter, feedback_rule))
+    return True
+
+
+def forward_midi_note(script_handle, midi_map_handle, channel, note):
+    _check_channel(channel)
+    midi_map_handle.note_forwards.append((channel, note))
+    return True
+
+
+def forward_midi_cc(script_handle, midi_map_handle, channel, cc_no):
+    _check_channel(channel)
+    midi_map_handle.cc_forwards.append((channel, cc_no))
+    return True
+
+
+def forward_midi_pitchbend(script_handle, midi_map_handle, channel):
+    _check_channel(channel)
+    midi_map_handle.pitchbend_forwards.append(channel)
+    return True
+
+
+def send_feedback_for_parameter(midi_map_handle, parameter):
+    midi_map_handle.feedback_requests.append(parameter)
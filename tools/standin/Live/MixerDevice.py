@@ -0,0 +1,31 @@
+from .Base import LiveObject
+from .DeviceParameter import DeviceParameter
+
+
+class MixerDevice(LiveObject):
+    _listenable = ('sends', 'crossfade_assign')
+
+    def __init__(self, num_sends=0):
+        LiveObject.__init__(self)
+        self.canonical_parent = None
+        self.volume = DeviceParameter('Track Volume', 0.85, 0.0, 1.0, unit='dB')
+        self.panning = DeviceParameter('Track Panning', 0.0, -1.0, 1.0)
+        self.song_tempo = None
+        self.cue_volume = DeviceParameter('Cue Volume', 0.85, 0.0, 1.0, unit='dB')
+        self.crossfade_assign = 1
+        self.sends = [self._make_send(i) for i in range(num_sends)]
+        for parameter in (self.volume, self.panning, self.cue_volume):
+            parameter.canonical_parent = self
+
+    def _make_send(self, index):
+        send = DeviceParameter(chr(ord('A') + index % 26) + '-Send', 0.0, 0.0, 1.0)
+        send.canonical_parent = self
+        return send
+
+    def _set_num_sends(self, num_sends):
+        sends = list(self.sends)
+        while len(sends) < num_sends:
+            sends.append(self._make_send(len(sends)))
+        for send in sends[num_sends:]:
+            send._invalidate()
+        self.sends = sends[:num_sends]
@@ -0,0 +1,24 @@
+from .Base import LiveObject
+
+
+class Scene(LiveObject):
+    _listenable = ('name', 'color', 'is_triggered')
+
+    def __init__(self, song, name):
+        LiveObject.__init__(self)
+        self._song = song
+        self.name = name
+        self.color = 0
+        self.is_triggered = False
+
+    @property
+    def clip_slots(self):
+        index = self._song.scenes.index(self)
+        return [t.clip_slots[index] for t in self._song.tracks]
+
+    def fire(self):
+        for clip_slot in self.clip_slots:
+            clip_slot.fire()
+
+    def fire_as_selected(self, force_legato=False):
+        self.fire()
@@ -0,0 +1,330 @@
+from .Base import LiveObject
+from .ClipSlot import ClipSlot
+from .Scene import Scene
+from .Track import Track
+
+
+class TimeFormat(object):
+    ms_time = 0
+    smpte_24 = 1
+    smpte_25 = 2
+    smpte_29 = 3
+    smpte_30 = 4
+    smpte_30_drop = 5
+
+
+class BeatTime(object):
+
+    def __init__(self, beats, numerator=4):
+        beats = max(0.0, beats)
+        self.bars = int(beats // numerator) + 1
+        self.beats = int(beats % numerator) + 1
+        self.sub_division = int((beats % 1.0) * 4) + 1
+        self.ticks = int((beats % 0.25) * 240 * 4)
+
+    def __str__(self):
+        return '{:03d}.{:02d}.{:d}.{:03d}'.format(self.bars, self.beats,
+                                                   self.sub_division, self.ticks)
+
+
+class SmpteTime(object):
+
+    def __init__(self, seconds, frames_per_second=25):
+        seconds = max(0.0, seconds)
+        self.hours = int(seconds // 3600)
+        self.minutes = int(seconds // 60) % 60
+        self.seconds = int(seconds) % 60
+        self.frames = int((seconds % 1.0) * frames_per_second)
+
+    def __str__(self):
+        return '{:02d}:{:02d}:{:02d}:{:02d}'.format(self.hours, self.minutes,
+                                                    self.seconds, self.frames)
+
+
+class CuePoint(LiveObject):
+    _listenable = ('name', 'time')
+
+    def __init__(self, song, time, name=''):
+        LiveObject.__init__(self)
+        self._song = song
+        self.time = time
+        self.name = name
+
+    def jump(self):
+        self._song.current_song_time = self.time
+
+
+class SongView(LiveObject):
+    _listenable = ('selected_track', 'selected_scene', 'selected_parameter',
+                   'selected_chain', 'detail_clip', 'draw_mode', 'follow_song')
+
+    def __init__(self, song):
+        LiveObject.__init__(self)
+        self._song = song
+        self.selected_track = None
+        self.selected_scene = None
+        self.selected_parameter = None
+        self.selected_chain = None
+        self.detail_clip = None
+        self.draw_mode = True
+        self.follow_song = False
+
+    @property
+    def highlighted_clip_slot(self):
+        track = self.selected_track
+        scene = self.selected_scene
+        song = self._song
+        if track in song.tracks and scene in song.scenes:
+            return track.clip_slots[song.scenes.index(scene)]
+        return None
+
+    @highlighted_clip_slot.setter
+    def highlighted_clip_slot(self, clip_slot):
+        for track in self._song.tracks:
+            if clip_slot in track.clip_slots:
+                self.selected_track = track
+                self.selected_scene = self._song.scenes[
+                    track.clip_slots.index(clip_slot)]
+
+
+class Song(LiveObject):
+    """
+        The stand-in for Live.Song.Song. Build it with 'add_track',
+        'add_return_track' and 'add_scene' (or the generators in the tools), the
+        script only ever reads and writes properties and calls the usual methods.
+    """
+    _listenable = ('tracks', 'visible_tracks', 'return_tracks', 'scenes',
+                   'cue_points', 'is_playing', 'record_mode', 'session_record',
+                   'session_record_status', 'loop', 'punch_in', 'punch_out',
+                   'can_jump_to_prev_cue', 'can_jump_to_next_cue',
+                   'back_to_arranger', 'current_song_time', 'tempo',
+                   'signature_numerator', 'signature_denominator', 'loop_start',
+                   'loop_length', 'song_length', 'exclusive_arm', 'exclusive_solo',
+                   'metronome', 'overdub', 'nudge_down', 'nudge_up', 'data')
+
+    def __init__(self):
+        LiveObject.__init__(self)
+        self.tracks = []
+        self.visible_tracks = []
+        self.return_tracks = []
+        self.scenes = []
+        self.cue_points = []
+        self.master_track = Track(self, 'Master', can_be_armed=False)
+        self.view = SongView(self)
+        self.is_playing = False
+        self.record_mode = False
+        self.session_record = False
+        self.session_record_status = 0
+        self.loop = False
+        self.punch_in = False
+        self.punch_out = False
+        self.can_jump_to_prev_cue = False
+        self.can_jump_to_next_cue = False
+        self.back_to_arranger = False
+        self.current_song_time = 0.0
+        self.tempo = 120.0
+        self.signature_numerator = 4
+        self.signature_denominator = 4
+        self._song_length = 1024.0
+        self._loop_start = 0.0
+        self._loop_length = 16.0
+        self.last_event_time = 512.0
+        self.exclusive_arm = True
+        self.exclusive_solo = True
+        self.metronome = False
+        self.overdub = False
+        self.can_undo = False
+        self.can_redo = False
+        self.undo_count = 0
+        self.redo_count = 0
+
+    # --- building the set -------------------------------------------------------
+
+    def add_track(self, name=None, index=None, **kwargs):
+        if name is None:
+            name = '{}-Audio'.format(len(self.tracks) + 1)
+        kwargs.setdefault('num_sends', len(self.return_tracks))
+        kwargs.setdefault('num_scenes', len(self.scenes))
+        track = Track(self, name, **kwargs)
+        tracks = list(self.tracks)
+        tracks.insert(len(tracks) if index is None else index, track)
+        self.tracks = tracks
+        if self.view.selected_track is None:
+            self.view.selected_track = track
+        self._update_visible_tracks()
+        return track
+
+    def delete_track(self, index):
+        tracks = list(self.tracks)
+        track = tracks.pop(index)
+        self.tracks = tracks
+        if self.view.selected_track is track:
+            self.view.selected_track = tracks[min(index, len(tracks) - 1)] if tracks else self.master_track
+        self._update_visible_tracks()
+        track._invalidate()
+
+    def add_return_track(self, name=None):
+        if name is None:
+            name = '{}-Return'.format(chr(ord('A') + len(self.return_tracks) % 26))
+        track = Track(self, name, can_be_armed=False, num_sends=len(self.return_tracks) + 1)
+        self.return_tracks = list(self.return_tracks) + [track]
+        for t in self.tracks + self.return_tracks + [self.master_track]:
+            if t is not self.master_track:
+                t.mixer_device._set_num_sends(len(self.return_tracks))
+        return track
+
+    def delete_return_track(self, index):
+        returns = list(self.return_tracks)
+        track = returns.pop(index)
+        self.return_tracks = returns
+        for t in self.tracks + self.return_tracks:
+            t.mixer_device._set_num_sends(len(self.return_tracks))
+        track._invalidate()
+
+    def add_scene(self, name=None):
+        scene = Scene(self, name or str(len(self.scenes) + 1))
+        self.scenes = list(self.scenes) + [scene]
+        for t in self.tracks:
+            t.clip_slots = list(t.clip_slots) + [ClipSlot()]
+        if self.view.selected_scene is None:
+            self.view.selected_scene = scene
+        return scene
+
+    def _update_visible_tracks(self):
+        visible = []
+        for track in self.tracks:
+            group = track.group_track
+            is_visible = True
+            while group is not None:
+                if group.fold_state:
+                    is_visible = False
+                    break
+                group = group.group_track
+            track.is_visible = is_visible
+            if is_visible:
+                visible.append(track)
+        self.visible_tracks = visible
+
+    # --- transport ----------------------------------------------------------------
+
+    @property
+    def song_length(self):
+        return max(self._song_length, self.last_event_time)
+
+    @song_length.setter
+    def song_length(self, value):
+        self._song_length = value
+        self.notify('song_length')
+
+    @property
+    def loop_start(self):
+        return self._loop_start
+
+    @loop_start.setter
+    def loop_start(self, value):
+        value = min(max(0.0, value), self.song_length - self._loop_length)
+        if value != self._loop_start:
+            self._loop_start = value
+            self.notify('loop_start')
+
+    @property
+    def loop_length(self):
+        return self._loop_length
+
+    @loop_length.setter
+    def loop_length(self, value):
+        value = min(max(1.0, value), self.song_length - self._loop_start)
+        if value != self._loop_length:
+            self._loop_length = value
+            self.notify('loop_length')
+
+    def start_playing(self):
+        self.is_playing = True
+
+    def continue_playing(self):
+        self.is_playing = True
+
+    def play_selection(self):
+        self.is_playing = True
+
+    def stop_playing(self):
+        self.is_playing = False
+
+    def stop_all_clips(self, quantized=True):
+        for track in self.tracks:
+            track.stop_all_clips()
+
+    def jump_by(self, beats):
+        self.current_song_time = max(0.0, self.current_song_time + beats)
+
+    def scrub_by(self, beats):
+        self.current_song_time = max(0.0, self.current_song_time + beats)
+
+    def advance(self, seconds):
+        """ Harness helper: let the playback position run for 'seconds' """
+        if self.is_playing:
+            self.current_song_time += seconds * self.tempo / 60.0
+
+    def get_current_beats_song_time(self):
+        return BeatTime(self.current_song_time, self.signature_numerator)
+
+    def get_current_smpte_song_time(self, time_format):
+        return SmpteTime(self.current_song_time * 60.0 / self.tempo)
+
+    def get_beats_loop_start(self):
+        return BeatTime(self.loop_start, self.signature_numerator)
+
+    def get_beats_loop_length(self):
+        return BeatTime(self.loop_length, self.signature_numerator)
+
+    # --- cues and undo ------------------------------------------------------------
+
+    def set_or_delete_cue(self):
+        for cue in self.cue_points:
+            if cue.time == self.current_song_time:
+                self.cue_points = [c for c in self.cue_points if c is not cue]
+                cue._invalidate()
+                break
+        else:
+            cues = list(self.cue_points) + [CuePoint(self, self.current_song_time)]
+            self.cue_points = sorted(cues, key=lambda c: c.time)
+        self._update_cue_flags()
+
+    def jump_to_prev_cue(self):
+        earlier = [c for c in self.cue_points if c.time < self.current_song_time]
+        if earlier:
+            self.current_song_time = earlier[-1].time
+        self._update_cue_flags()
+
+    def jump_to_next_cue(self):
+        later = [c for c in self.cue_points if c.time > self.current_song_time]
+        if later:
+            self.current_song_time = later[0].time
+        self._update_cue_flags()
+
+    def _update_cue_flags(self):
+        time = self.current_song_time
+        self.can_jump_to_prev_cue = any(c.time < time for c in self.cue_points)
+        self.can_jump_to_next_cue = any(c.time > time for c in self.cue_points)
+
+    def undo(self):
+        self.undo_count += 1
+        self.can_redo = True
+
+    def redo(self):
+        self.redo_count += 1
+        self.can_redo = False
+
+    def create_audio_track(self, index=-1):
+        return self.add_track(index=None if index == -1 else index)
+
+    def create_midi_track(self, index=-1):
+        return self.add_track('{}-MIDI'.format(len(self.tracks) + 1),
+                              index=None if index == -1 else index,
+                              has_midi_input=True)
+
+    def create_return_track(self):
+        return self.add_return_track()
+
+    def create_scene(self, index=-1):
+        return self.add_scene()
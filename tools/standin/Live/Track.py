@@ -0,0 +1,142 @@
+from .Base import LiveObject
+from .ClipSlot import ClipSlot
+from .MixerDevice import MixerDevice
+
+
+class RoutingType(object):
+
+    def __init__(self, display_name, category=0):
+        self.display_name = display_name
+        self.category = category
+        self.attached_object = None
+
+    def __eq__(self, other):
+        return isinstance(other, RoutingType) and other.display_name == self.display_name
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.display_name)
+
+
+RoutingChannel = RoutingType
+
+INPUT_ROUTING_TYPES = (RoutingType('Ext. In'), RoutingType('Resampling'),
+                       RoutingType('No Input'))
+INPUT_ROUTING_CHANNELS = (RoutingType('1'), RoutingType('2'), RoutingType('1/2'))
+OUTPUT_ROUTING_TYPES = (RoutingType('Master'), RoutingType('Sends Only'),
+                        RoutingType('Ext. Out'))
+OUTPUT_ROUTING_CHANNELS = (RoutingType('Track In'), RoutingType('Post FX'))
+
+
+class TrackView(LiveObject):
+    _listenable = ('is_collapsed', 'selected_device')
+
+    def __init__(self, track):
+        LiveObject.__init__(self)
+        self._track = track
+        self.is_collapsed = False
+        self.selected_device = None
+
+
+class Track(LiveObject):
+    _listenable = ('name', 'color', 'color_index', 'solo', 'mute', 'arm',
+                   'implicit_arm', 'input_routing_type', 'input_routing_channel',
+                   'output_routing_type', 'output_routing_channel',
+                   'has_audio_output', 'has_audio_input', 'has_midi_input',
+                   'devices', 'output_meter_left', 'output_meter_right',
+                   'output_meter_level', 'input_meter_level', 'fold_state',
+                   'is_visible', 'clip_slots', 'playing_slot_index',
+                   'fired_slot_index', 'current_monitoring_state', 'muted_via_solo')
+
+    def __init__(self, song, name, can_be_armed=True, has_audio_output=True,
+                 has_midi_input=False, color=0x1a2b3c, is_foldable=False,
+                 group_track=None, num_sends=0, num_scenes=0):
+        LiveObject.__init__(self)
+        self._song = song
+        self.name = name
+        self.color = color
+        self.color_index = 0
+        self.solo = False
+        self.mute = False
+        self.arm = False
+        self.implicit_arm = False
+        self.muted_via_solo = False
+        self.can_be_armed = can_be_armed
+        self.has_audio_output = has_audio_output
+        self.has_audio_input = not has_midi_input
+        self.has_midi_input = has_midi_input
+        self.has_midi_output = False
+        self.is_foldable = is_foldable
+        self._fold_state = False
+        self.is_grouped = group_track is not None
+        self.group_track = group_track
+        self.is_visible = True
+        self.is_frozen = False
+        self.is_part_of_selection = False
+        self.current_monitoring_state = 1
+        self.playing_slot_index = -1
+        self.fired_slot_index = -1
+        self.available_input_routing_types = INPUT_ROUTING_TYPES
+        self.available_input_routing_channels = INPUT_ROUTING_CHANNELS
+        self.available_output_routing_types = OUTPUT_ROUTING_TYPES
+        self.available_output_routing_channels = OUTPUT_ROUTING_CHANNELS
+        self.input_routing_type = INPUT_ROUTING_TYPES[0]
+        self.input_routing_channel = INPUT_ROUTING_CHANNELS[2]
+        self.output_routing_type = OUTPUT_ROUTING_TYPES[0]
+        self.output_routing_channel = OUTPUT_ROUTING_CHANNELS[0]
+        self.output_meter_left = 0.0
+        self.output_meter_right = 0.0
+        self.output_meter_level = 0.0
+        self.input_meter_level = 0.0
+        self.mixer_device = MixerDevice(num_sends)
+        self.mixer_device.canonical_parent = self
+        self._devices = []
+        self.clip_slots = [ClipSlot() for _ in range(num_scenes)]
+        self.view = TrackView(self)
+
+    @property
+    def fold_state(self):
+        return self._fold_state
+
+    @fold_state.setter
+    def fold_state(self, value):
+        value = bool(value)
+        if value != self._fold_state:
+            self._fold_state = value
+            self.notify('fold_state')
+            self._song._update_visible_tracks()
+
+    @property
+    def devices(self):
+        return self._devices
+
+    @devices.setter
+    def devices(self, value):
+        for device in value:
+            device.canonical_parent = self
+        changed = value != self._devices
+        self._devices = value
+        if changed:
+            self.notify('devices')
+
+    def __repr__(self):
+        return '<Track {!r}>'.format(self.name)
+
+    def set_meter(self, level):
+        """ Harness helper: set all meters of the track at once """
+        self.output_meter_left = level
+        self.output_meter_right = level
+        self.output_meter_level = level
+        self.input_meter_level = level
+
+    def stop_all_clips(self, quantized=True):
+        for clip_slot in self.clip_slots:
+            clip_slot.stop()
+
+    def delete_device(self, index):
+        devices = list(self.devices)
+        device = devices.pop(index)
+        self.devices = devices
+        device._invalidate()
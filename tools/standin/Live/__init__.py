@@ -0,0 +1,16 @@
+"""
+    A pure Python stand-in for the 'Live' module that Ableton Live injects
+    into remote scripts. It only models what this script touches, closely
+    enough to run it headless for benchmarks, soak runs and golden checks.
+"""
+from . import Base
+from . import DeviceParameter
+from . import Device
+from . import MixerDevice
+from . import Clip
+from . import ClipSlot
+from . import Scene
+from . import Track
+from . import Song
+from . import MidiMap
+from . import Application
@@ -0,0 +1,103 @@
+"""
+    Stand-in for Live's MackieControlXT script, built from this script's own
+    ChannelStrip and MainDisplay classes. It offers what the main script and
+    its components use from an extension: 'set_mackie_control_main',
+    'channel_strips', 'main_display', 'song_snapshot' and the per script
+    entry points. Until the main script is set (the strips read the song when
+    they are built) the extension reads through a SongSnapshot of its own,
+    then through the one of the main script.
+"""
+import importlib
+
+NUM_CHANNEL_STRIPS = 8
+
+
+class MackieControlXT(object):
+
+    def __init__(self, c_instance, script_package):
+        def script_class(module_name):
+            module = importlib.import_module(script_package + '.' + module_name)
+            return getattr(module, module_name)
+
+        self.__c_instance = c_instance
+        self.__main_script = None
+        self.__tick_scheduler = script_class('TickScheduler')(8.0)
+        self.__song_snapshot = script_class('SongSnapshot')(c_instance.song())
+        self.__main_display = script_class('MainDisplay')(self)
+        channel_strip_class = script_class('ChannelStrip')
+        self.__channel_strips = [channel_strip_class(self, i)
+                                 for i in range(NUM_CHANNEL_STRIPS)]
+        self.__components = [self.__main_display] + self.__channel_strips
+
+    def disconnect(self):
+        for c in self.__components:
+            c.destroy()
+        self.__components = []
+        self.__song_snapshot.destroy()
+
+    def set_mackie_control_main(self, main_script):
+        self.__main_script = main_script
+
+    def channel_strips(self):
+        return self.__channel_strips
+
+    def main_display(self):
+        return self.__main_display
+
+    def tick_scheduler(self):
+        return self.__tick_scheduler
+
+    def song_snapshot(self):
+        if self.__main_script is None:
+            return self.__song_snapshot
+        return self.__main_script.song_snapshot()
+
+    def is_extension(self):
+        return True
+
+    def application(self):
+        return self.__main_script.application()
+
+    def song(self):
+        return self.__c_instance.song()
+
+    def handle(self):
+        return self.__c_instance.handle()
+
+    def send_midi(self, midi_event_bytes, sender=None):
+        self.__c_instance.send_midi(midi_event_bytes)
+
+    def request_rebuild_midi_map(self):
+        self.__c_instance.request_rebuild_midi_map()
+
+    def build_midi_map(self, midi_map_handle):
+        for s in self.__channel_strips:
+            s.build_midi_map(midi_map_handle)
+
+    def update_display(self):
+        self.__tick_scheduler.tick()
+
+    def refresh_state(self):
+        for c in self.__components:
+            c.refresh_state()
+
+    def receive_midi(self, midi_bytes):
+        pass
+
+    def shift_is_pressed(self):
+        return self.__main_script.shift_is_pressed()
+
+    def option_is_pressed(self):
+        return self.__main_script.option_is_pressed()
+
+    def control_is_pressed(self):
+        return self.__main_script.control_is_pressed()
+
+    def alt_is_pressed(self):
+        return self.__main_script.alt_is_pressed()
+
+    def get_is_master_strip_touched(self):
+        return False
+
+    def set_is_master_strip_touched(self, is_master_strip_touched):
+        pass
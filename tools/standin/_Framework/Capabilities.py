@@ -0,0 +1,39 @@
+"""
+    Stand-in for _Framework.Capabilities, only what 'get_capabilities' uses.
+"""
+CONTROLLER_ID_KEY = 'controller_id'
+PORTS_KEY = 'ports'
+TYPE_KEY = 'surface_type'
+FIRMWARE_KEY = 'firmware_version'
+AUTO_LOAD_KEY = 'auto_load'
+VENDORID = 'vendor_id'
+PRODUCTIDS = 'product_ids'
+MODEL_NAMES = 'model_names'
+DIRECTIONKEY = 'direction'
+PORTNAMEKEY = 'name'
+MACNAMEKEY = 'mac_name'
+PROPSKEY = 'props'
+HIDDEN = 'hidden'
+SYNC = 'sync'
+SCRIPT = 'script'
+NOTES_CC = 'notes_cc'
+REMOTE = 'remote'
+PLAIN_OLD_MIDI = 'plain_old_midi'
+
+
+def controller_id(vendor_id, product_ids, model_name):
+    if not isinstance(product_ids, list):
+        product_ids = [product_ids]
+    if not isinstance(model_name, list):
+        model_name = [model_name]
+    return {VENDORID: vendor_id, PRODUCTIDS: product_ids, MODEL_NAMES: model_name}
+
+
+def inport(port_name='', props=None, mac_name=None):
+    return {DIRECTIONKEY: 'in', PORTNAMEKEY: port_name, MACNAMEKEY: mac_name,
+            PROPSKEY: props or []}
+
+
+def outport(port_name='', props=None, mac_name=None):
+    return {DIRECTIONKEY: 'out', PORTNAMEKEY: port_name, MACNAMEKEY: mac_name,
+            PROPSKEY: props or []}
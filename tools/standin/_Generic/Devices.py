@@ -0,0 +1,24 @@
+"""
+    Stand-in for _Generic.Devices with a couple of the real parameter banks, so
+    plugin mode exercises the bank ordering path as well as the plain one.
+"""
+
+EQ8_BANK1 = ('1 Frequency A', '1 Gain A', '1 Resonance A', '1 Filter Type A',
+             '2 Frequency A', '2 Gain A', '2 Resonance A', '2 Filter Type A')
+EQ8_BANK2 = ('3 Frequency A', '3 Gain A', '3 Resonance A', '3 Filter Type A',
+             '4 Frequency A', '4 Gain A', '4 Resonance A', '4 Filter Type A')
+EQ8_BANKS = (EQ8_BANK1, EQ8_BANK2)
+
+CMP_BANK1 = ('Threshold', 'Ratio', 'Attack', 'Release', 'Auto Release On/Off',
+             'Output Gain', 'Dry/Wet', 'Knee')
+CMP_BANKS = (CMP_BANK1,)
+
+DEVICE_DICT = {'Eq8': EQ8_BANKS,
+               'Compressor2': CMP_BANKS}
+
+
+def get_parameter_by_name(device, name):
+    for parameter in device.parameters:
+        if parameter.original_name == name:
+            return parameter
+    return None
@@ -0,0 +1,16 @@
+"""
+    Stand-in for the two helpers this script imports from ableton.v2.base.
+"""
+
+
+def liveobj_valid(obj):
+    return obj is not None and bool(obj)
+
+
+def move_current_song_time(song, delta, truncate_to_beat=True):
+    new_time = max(0.0, song.current_song_time + delta)
+    if truncate_to_beat:
+        new_time = float(int(new_time))
+    song.current_song_time = new_time
+    if not song.is_playing:
+        song.start_time = new_time
@@ -0,0 +1,19 @@
+"""
+    Stand-in for the two helpers this script imports from ableton.v3.live.
+"""
+from ..v2.base import liveobj_valid
+
+
+def track_index(track, track_list_attr='tracks'):
+    if liveobj_valid(track):
+        tracks = getattr(track._song, track_list_attr)
+        if track in tracks:
+            return list(tracks).index(track)
+    return None
+
+
+def liveobj_color_to_midi_rgb_values(obj, default_values=(0, 0, 0)):
+    if liveobj_valid(obj) and obj.color is not None:
+        color = obj.color
+        return ((color >> 16 & 255) // 2, (color >> 8 & 255) // 2, (color & 255) // 2)
+    return default_values